@@ -0,0 +1,76 @@
+"""AgriNoteFormatter.formatのベンチマーク（従来の列ループ実装との比較）
+
+uv run python -m benchmarks.bench_format --rows 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.core.formatter import AgriNoteFormatter
+
+
+def legacy_format(df: pd.DataFrame) -> pd.DataFrame:
+    """変換パイプライン導入前のformat"""
+    df = df.dropna(how="all")
+    for col in df.columns:
+        if pd.api.types.is_timedelta64_dtype(df[col]):
+            df[col] = df[col].dt.total_seconds() / 3600
+            df[col] = df[col].round(2)
+    return df
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "作業ID": np.arange(rows).astype(str),
+            "日付": pd.Timestamp("2020-01-01")
+            + pd.to_timedelta(rng.integers(0, 2000, rows), unit="D"),
+            "作業時間": pd.to_timedelta(rng.integers(0, 600, rows), unit="min"),
+            "移動時間": pd.to_timedelta(rng.integers(0, 60, rows), unit="min"),
+            "作業者": pd.Categorical(rng.choice(["鈴木", "木下", "佐藤"], rows)),
+            "面積": rng.random(rows) * 100,
+        }
+    )
+
+
+def bench(func, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(df.copy())
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    formatter = AgriNoteFormatter()
+
+    # 日付の書式化は従来clean_for_sheets側で行っていたため、両方を通した時間も比較する
+    def legacy_pipeline(df):
+        return formatter.clean_for_sheets(legacy_format(df))
+
+    def pipeline(df):
+        return formatter.clean_for_sheets(formatter.format(df))
+
+    print(f"rows={args.rows}")
+    for name, func in [
+        ("legacy format          ", legacy_format),
+        ("pipeline format        ", formatter.format),
+        ("legacy format + clean  ", legacy_pipeline),
+        ("pipeline format + clean", pipeline),
+    ]:
+        print(f"{name}: {bench(func, df, args.repeat) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""読込→整形→書込payload作成のピークRSSのベンチマーク（通常 と MEMORY_MODE=lean の比較）
+
+uv run python -m benchmarks.bench_memory --rows 10000,50000,100000
+
+行数・モードごとに新しいプロセスで作業記録xlsxを読み込み、format_for_sheetsと
+write_all（Sheets APIはモック）まで通す。import直後からのピークRSSの増分を
+1万行あたりに換算して表示する（Lambdaのメモリ割り当ての目安）。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import make_work_records, write_xlsx
+
+MODES = ("default", "lean")
+
+
+def measure(xlsx_path: str, lean: bool) -> dict:
+    """このプロセスで1回処理し、ピークRSSの増分（MB）を返す（子プロセスで実行する）"""
+    from unittest.mock import MagicMock, patch
+
+    from src.core.formatter import AgriNoteFormatter
+    from src.core.reader import ExcelReader
+    from src.core.writer import SpreadSheetWriter
+    from src.utils.metrics import peak_rss_mb
+
+    baseline = peak_rss_mb()
+    with (
+        patch("gspread.service_account_from_dict"),
+        patch.dict(
+            os.environ, {"SPREADSHEET_ID": "bench", "SERVICE_ACCOUNT_JSON": "{}"}
+        ),
+    ):
+        df = ExcelReader(engine="openpyxl", lean=lean).read(xlsx_path)
+        cleaned = AgriNoteFormatter(lean=lean).format_for_sheets(df)
+        writer = SpreadSheetWriter()
+        writer._ws = MagicMock()
+        writer.staging = False
+        writer.write_all(cleaned)
+    return {
+        "rows": len(cleaned),
+        "frame_mb": round(cleaned.memory_usage(deep=True).sum() / 1024 / 1024, 1),
+        "peak_rss_growth_mb": round(peak_rss_mb() - baseline, 1),
+    }
+
+
+def run(rows_list, work_dir=None) -> dict:
+    """行数ごと・モードごとの計測結果（peak_rss_per_10k_rows_mbを含む）"""
+    work_dir = work_dir or tempfile.mkdtemp()
+    results = {}
+    for rows in rows_list:
+        path = os.path.join(work_dir, f"records_{rows}.xlsx")
+        write_xlsx(make_work_records(rows), path)
+        results[rows] = {}
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_memory", "--child", path]
+                + (["--lean"] if mode == "lean" else []),
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            result["peak_rss_per_10k_rows_mb"] = round(
+                result["peak_rss_growth_mb"] * 10000 / max(rows, 1), 1
+            )
+            results[rows][mode] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10000,50000,100000")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--lean", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.lean)))
+        return
+
+    results = run([int(r) for r in args.rows.split(",")])
+    for rows, modes in results.items():
+        print(f"rows={rows}")
+        for mode, r in modes.items():
+            print(
+                f"  {mode:<8}: peak +{r['peak_rss_growth_mb']:7.1f} MB"
+                f"  ({r['peak_rss_per_10k_rows_mb']:6.1f} MB / 1万行)"
+                f"  DataFrame {r['frame_mb']:6.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""SpreadSheetWriter.read_allのベンチマーク（get_all_records と 列単位の読込の比較）
+
+uv run python -m benchmarks.bench_read --rows 10000,50000,200000
+
+Sheets APIはbenchmarks.fake_sheetsで置き換え、レスポンス処理とDataFrame化の
+時間・ピークメモリ（tracemalloc）を計測する。通信時間は含まない。
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from benchmarks.fake_sheets import fake_worksheet
+from benchmarks.synthetic import make_work_records
+from src.core.formatter import AgriNoteFormatter
+from src.core.schema import KEY_COLUMN
+from src.core.writer import SpreadSheetWriter
+
+
+def sheet_values(rows: int) -> list:
+    """書込済みのシートと同じ文字列の2次元リスト"""
+    formatter = AgriNoteFormatter()
+    df = formatter.clean_for_sheets(formatter.format(make_work_records(rows)))
+    return [df.columns.tolist()] + df.to_numpy().tolist()
+
+
+def measure(func):
+    """所要時間（秒）とピークメモリ（MB）
+
+    tracemallocは計測対象を大きく遅くするため、時間とメモリは別々に実行して測る。
+    """
+    gc.collect()
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024, result
+
+
+def run(rows_list) -> dict:
+    results = {}
+    with patch.dict(
+        "os.environ", {"SPREADSHEET_ID": "bench", "SERVICE_ACCOUNT_JSON": "{}"}
+    ):
+        for rows in rows_list:
+            writer = SpreadSheetWriter()
+            writer._ws = fake_worksheet(sheet_values(rows))
+            results[rows] = {
+                "get_all_records": measure(lambda: writer.read_all(mode="records")),
+                "columnar": measure(lambda: writer.read_columns()),
+                "columnar_key": measure(lambda: writer.read_columns([KEY_COLUMN])),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10000,50000,200000")
+    args = parser.parse_args()
+
+    results = run([int(r) for r in args.rows.split(",")])
+    for rows, cases in results.items():
+        print(f"rows={rows}")
+        for name, (seconds, peak_mb, df) in cases.items():
+            print(
+                f"  {name:<16}: {seconds * 1000:8.1f} ms  peak {peak_mb:7.1f} MB"
+                f"  ({df.shape[1]} cols)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""代替サーバーに対してPlaywrightの取得処理全体を計測する
+
+uv run python -m benchmarks.e2e --rows 10000 --delay 3
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.fake_agrinote import FakeAgriNote
+from src.core.browser import BrowserManager, RequestFilter
+from src.core.scraper import AgriNoteScraper
+
+
+def run_e2e(rows=1000, generation_delay=1.0) -> dict:
+    """ブラウザ起動・ログイン・エクスポート取得の所要時間（秒）を返す"""
+    timings = {}
+    with FakeAgriNote(rows=rows, generation_delay=generation_delay) as app:
+        app.zip_path()  # zip生成時間は計測から除く
+        started = time.perf_counter()
+        with BrowserManager(headless=True) as browser:
+            timings["browser_launch"] = time.perf_counter() - started
+            context = browser.new_context()
+            RequestFilter().attach(context)
+            scraper = AgriNoteScraper(context.new_page(), base_url=app.base_url)
+
+            t = time.perf_counter()
+            scraper.login(app.user_id, app.password)
+            timings["login"] = time.perf_counter() - t
+
+            t = time.perf_counter()
+            scraper.download_report()
+            timings["download_report"] = time.perf_counter() - t
+            scraper.cleanup()
+        timings["total"] = time.perf_counter() - started
+    return {k: round(v, 3) for k, v in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+    print(json.dumps(run_e2e(args.rows, args.delay), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""オフライン計測用のアグリノート代替サーバー
+
+本物と同じセレクタ・文言を持つ最小限の画面を返す。
+- /b/login/       : ログインフォーム（失敗時は p._1n3hn89z を表示）
+- /b/             : ログイン後のトップ（#headerHamburgerMenu）
+- /b/export.html  : 作業記録 → 全期間/期間指定 → Excel → 生成（confirm）→ ダウンロード
+- /api/export     : 生成依頼（POST）、/api/export/status?id= で状態確認
+- /download/<id>.zip : 合成したエクスポートzip
+
+uv run python -m benchmarks.fake_agrinote --port 8080 --delay 3
+AGRI_NOTE_BASE_URL=http://127.0.0.1:8080 でスクレイパーを向ける。
+"""
+
+import argparse
+import json
+import os
+import secrets
+import tempfile
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import make_export_zip
+
+LOGIN_HTML = """<!doctype html><html><head><meta charset="utf-8"><title>ログイン</title></head>
+<body>
+<form id="login" onsubmit="return false">
+  <input type="text" name="id" placeholder="メールアドレスまたはアカウントID">
+  <input type="password" name="password">
+  <button type="button" id="submit">ログイン</button>
+</form>
+<p class="_1n3hn89z" hidden>メールアドレス、アカウントID、またはパスワードが一致しません。</p>
+<script>
+document.getElementById("submit").addEventListener("click", async () => {
+  const form = document.getElementById("login");
+  const res = await fetch("/api/login", {
+    method: "POST",
+    headers: {"Content-Type": "application/json"},
+    body: JSON.stringify({id: form.id.value, password: form.password.value}),
+  });
+  if (res.ok) { location.href = "/b/"; }
+  else { document.querySelector("p._1n3hn89z").hidden = false; }
+});
+</script>
+</body></html>"""
+
+TOP_HTML = """<!doctype html><html><head><meta charset="utf-8"><title>トップ</title></head>
+<body><header><div id="headerHamburgerMenu">≡</div></header><main>ホーム</main></body></html>"""
+
+EXPORT_HTML = """<!doctype html><html><head><meta charset="utf-8"><title>エクスポート</title></head>
+<body>
+<div id="headerHamburgerMenu">≡</div>
+<ul><li id="type-work">作業記録</li><li>圃場</li></ul>
+<label><input type="radio" name="period" value="all">全期間</label>
+<label><input type="radio" name="period" value="range">期間指定</label>
+<input type="date" id="since"><input type="date" id="until">
+<label><input type="radio" name="format" value="excel">Excel</label>
+<label><input type="radio" name="format" value="csv">CSV</label>
+<button type="button" id="generate">生成</button>
+<div id="result"></div>
+<script>
+let selected = null;
+const poll = async (id) => {
+  const status = await (await fetch("/api/export/status?id=" + id)).json();
+  if (status.status === "done") {
+    document.getElementById("result").innerHTML =
+      '<a href="' + status.url + '">ダウンロード</a>';
+  } else {
+    setTimeout(() => poll(id), 500);
+  }
+};
+// 再読込後も直前に依頼した生成物のリンクを表示する（実サイトの生成履歴の代わり）
+const last = localStorage.getItem("lastExport");
+if (last) { poll(last); }
+document.getElementById("type-work").addEventListener("click", () => { selected = "work"; });
+document.getElementById("generate").addEventListener("click", async () => {
+  if (!confirm("エクスポートファイルを生成します。よろしいですか？")) return;
+  const period = document.querySelector("input[name=period]:checked");
+  const res = await fetch("/api/export", {
+    method: "POST",
+    headers: {"Content-Type": "application/json"},
+    body: JSON.stringify({
+      type: selected,
+      period: period && period.value,
+      since: document.getElementById("since").value,
+      until: document.getElementById("until").value,
+    }),
+  });
+  const {id} = await res.json();
+  localStorage.setItem("lastExport", id);
+  poll(id);
+});
+</script>
+</body></html>"""
+
+
+class FakeAgriNote:
+    """スレッドで動く代替サーバー（with文で起動・停止）"""
+
+    def __init__(
+        self,
+        user_id="test-user",
+        password="test-pass",
+        rows=1000,
+        generation_delay=1.0,
+        port=0,
+        work_dir=None,
+    ):
+        self.user_id = user_id
+        self.password = password
+        self.rows = rows
+        self.generation_delay = generation_delay
+        self.work_dir = work_dir or tempfile.mkdtemp()
+        self.sessions = set()
+        # {生成ID: 生成依頼の時刻}
+        self.exports = {}
+        self._zip_path = None
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _handler(self))
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def zip_path(self):
+        """エクスポートzipは初回ダウンロード時に1回だけ作る"""
+        with self._lock:
+            if self._zip_path is None:
+                self._zip_path = make_export_zip(
+                    os.path.join(self.work_dir, "export.zip"),
+                    self.rows,
+                    tmp_dir=self.work_dir,
+                )
+            return self._zip_path
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def _handler(app: FakeAgriNote):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _logged_in(self):
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            return "sid" in cookie and cookie["sid"].value in app.sessions
+
+        def _send(
+            self,
+            status,
+            body=b"",
+            content_type="text/html; charset=utf-8",
+            headers=None,
+        ):
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, status, data, headers=None):
+            self._send(status, json.dumps(data), "application/json", headers)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/b/login/":
+                return self._send(200, LOGIN_HTML)
+            if url.path in ("/b/", "/b/export.html"):
+                if not self._logged_in():
+                    return self._send(302, headers={"Location": "/b/login/"})
+                return self._send(200, TOP_HTML if url.path == "/b/" else EXPORT_HTML)
+            if url.path == "/api/export/status":
+                export_id = parse_qs(url.query).get("id", [""])[0]
+                if export_id not in app.exports:
+                    return self._json(404, {"status": "error"})
+                elapsed = time.monotonic() - app.exports[export_id]
+                if elapsed < app.generation_delay:
+                    return self._json(200, {"status": "running"})
+                return self._json(
+                    200, {"status": "done", "url": f"/download/{export_id}.zip"}
+                )
+            if url.path.startswith("/download/") and self._logged_in():
+                with open(app.zip_path(), "rb") as f:
+                    data = f.read()
+                name = os.path.basename(url.path)
+                return self._send(
+                    200,
+                    data,
+                    "application/zip",
+                    {"Content-Disposition": f'attachment; filename="{name}"'},
+                )
+            return self._send(404, "not found")
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path == "/api/login":
+                body = self._body()
+                if (
+                    body.get("id") != app.user_id
+                    or body.get("password") != app.password
+                ):
+                    return self._json(401, {"error": "invalid"})
+                sid = secrets.token_hex(8)
+                app.sessions.add(sid)
+                return self._json(
+                    200, {"ok": True}, {"Set-Cookie": f"sid={sid}; Path=/; HttpOnly"}
+                )
+            if url.path == "/api/export":
+                if not self._logged_in():
+                    return self._json(401, {"error": "login required"})
+                export_id = secrets.token_hex(4)
+                app.exports[export_id] = time.monotonic()
+                return self._json(200, {"id": export_id})
+            return self._send(404, "not found")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--delay", type=float, default=3.0)
+    args = parser.parse_args()
+
+    app = FakeAgriNote(rows=args.rows, generation_delay=args.delay, port=args.port)
+    print(f"{app.base_url} (id={app.user_id}, password={app.password})")
+    app.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
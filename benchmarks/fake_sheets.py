@@ -0,0 +1,76 @@
+"""メモリ上の値を返すSheets API（values.get / values.batchGet）の代替
+
+gspreadのWorksheetにそのまま渡せるので、get_all_recordsやbatch_getの
+レスポンス処理はgspread本体のコードを通る（ネットワーク無し）。
+"""
+
+from gspread.http_client import HTTPClient
+from gspread.utils import a1_range_to_grid_range, get_a1_from_absolute_range
+from gspread.worksheet import Worksheet
+
+
+class FakeSheetsClient(HTTPClient):
+    def __init__(self, values):
+        # HTTPClient.__init__は認証情報を要求するので呼ばない
+        self.values = values
+        self.requests = []
+
+    def _value_range(self, range_name, major_dimension=None):
+        width = max((len(row) for row in self.values), default=0)
+        if "!" in range_name:
+            grid = a1_range_to_grid_range(get_a1_from_absolute_range(range_name))
+        else:
+            grid = {}
+        rows = self.values[grid.get("startRowIndex", 0) : grid.get("endRowIndex")]
+        start_col = grid.get("startColumnIndex", 0)
+        end_col = grid.get("endColumnIndex", width)
+        data = [
+            row[start_col:end_col] + [""] * (end_col - max(len(row), start_col))
+            if len(row) < end_col
+            else row[start_col:end_col]
+            for row in rows
+        ]
+
+        if major_dimension == "COLUMNS":
+            data = [list(col) for col in zip(*data)]
+        # APIと同じく末尾の空セル・空の行（列）は返さない
+        data = [_rstrip(line) for line in data]
+        while data and not data[-1]:
+            data.pop()
+
+        response = {"range": range_name, "majorDimension": major_dimension or "ROWS"}
+        if data:
+            response["values"] = data
+        return response
+
+    def values_get(self, id, range, params=None):
+        self.requests.append(range)
+        return self._value_range(range, (params or {}).get("majorDimension"))
+
+    def values_batch_get(self, id, ranges, params=None):
+        self.requests.append(tuple(ranges))
+        major = (params or {}).get("majorDimension")
+        return {"valueRanges": [self._value_range(r, major) for r in ranges]}
+
+
+def _rstrip(line):
+    end = len(line)
+    while end and line[end - 1] == "":
+        end -= 1
+    return line[:end]
+
+
+def fake_worksheet(values, title="作業記録") -> Worksheet:
+    """valuesを中身に持つWorksheet（client.requestsで呼び出し回数を確認できる）"""
+    properties = {
+        "sheetId": 0,
+        "title": title,
+        "index": 0,
+        "gridProperties": {
+            "rowCount": len(values),
+            "columnCount": max((len(row) for row in values), default=0),
+        },
+    }
+    return Worksheet(
+        None, properties, spreadsheet_id="fake", client=FakeSheetsClient(values)
+    )
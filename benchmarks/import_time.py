@@ -0,0 +1,69 @@
+"""Lambdaハンドラーのインポート時間（コールドスタート）を計測する
+
+uv run python -m benchmarks.import_time src.app_slack src.app_scraper
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_imports(module: str) -> list:
+    """python -X importtime の結果を、対象モジュール配下の辞書のリストで返す"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        entries.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+            }
+        )
+    # 対象モジュール（深さ0）とその配下だけを残す（siteなど起動時の読込は除く）
+    end = next(i for i, e in enumerate(entries) if e["module"] == module)
+    start = end
+    while start > 0 and entries[start - 1]["depth"] > 0:
+        start -= 1
+    return entries[start : end + 1]
+
+
+def cumulative_ms(entries: list, module: str) -> float:
+    """対象モジュール自身の累積インポート時間（ミリ秒）"""
+    for entry in entries:
+        if entry["module"] == module:
+            return entry["cumulative_us"] / 1000
+    raise ValueError(f"{module}のインポート記録がありません")
+
+
+def report(entries: list, module: str, top: int = 20) -> str:
+    """累積時間の大きい順にモジュールを並べたレポート"""
+    lines = [f"{module}: {cumulative_ms(entries, module):.1f} ms"]
+    for entry in sorted(entries, key=lambda e: -e["cumulative_us"])[:top]:
+        lines.append(
+            f"{entry['cumulative_us'] / 1000:8.1f} ms  "
+            f"{entry['self_us'] / 1000:8.1f} ms  {entry['module']}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    for module in sys.argv[1:] or ["src.app_slack", "src.app_scraper"]:
+        print(report(profile_imports(module), module))
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""データ処理経路のベンチマーク（合成データ・ブラウザ/Google Sheets不要）
+
+uv run python -m benchmarks.run --rows 1000,10000 --output bench_results/HEAD.json
+uv run python -m benchmarks.run --rows 10000 --baseline bench_results/main.json
+
+計測対象: _extract_excel / ExcelReader / format / clean_for_sheets / write_allのpayload作成
+--baselineを指定すると、許容率（--tolerance）を超えて遅くなった工程を表示し終了コード1を返す。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+from benchmarks.synthetic import make_export_zip
+from src.core.formatter import AgriNoteFormatter
+from src.core.reader import ExcelReader, _has_calamine
+from src.core.scraper import AgriNoteScraper
+from src.core.writer import SpreadSheetWriter
+from src.utils.metrics import MemorySink, metrics
+
+
+def _timed(func, repeat):
+    """repeat回実行した最短時間（秒）と最後の戻り値"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run_benchmarks(rows_list, repeat=3, work_dir=None) -> dict:
+    """行数ごとに各工程の所要時間（ミリ秒）を返す"""
+    work_dir = work_dir or tempfile.mkdtemp()
+    engines = ["openpyxl"] + (["calamine"] if _has_calamine() else [])
+    formatter = AgriNoteFormatter()
+    results = {}
+    # ベンチマーク中のEMF出力は捨てる
+    sink = metrics.sink
+    metrics.set_sink(MemorySink())
+    try:
+        for rows in rows_list:
+            results[str(rows)] = _run_rows(rows, repeat, work_dir, engines, formatter)
+    finally:
+        metrics.set_sink(sink)
+    return results
+
+
+def _run_rows(rows, repeat, work_dir, engines, formatter) -> dict:
+    """合成zipを1つ作り、抽出から書込payload作成までを順に計測する"""
+    zip_path = make_export_zip(
+        os.path.join(work_dir, f"export_{rows}.zip"), rows, tmp_dir=work_dir
+    )
+    timings = {}
+
+    with patch("src.core.scraper.EXTRACT_DIR", os.path.join(work_dir, "x")):
+        scraper = AgriNoteScraper(MagicMock())
+        seconds, excel_path = _timed(
+            lambda: scraper._extract_excel(zip_path, target_keyword="作業者"),
+            repeat,
+        )
+    timings["extract"] = seconds
+
+    for engine in engines:
+        reader = ExcelReader(engine=engine)
+        seconds, df = _timed(lambda: reader.read(excel_path), repeat)
+        timings[f"ingest_{engine}"] = seconds
+
+    seconds, formatted = _timed(lambda: formatter.format(df), repeat)
+    timings["format"] = seconds
+    seconds, cleaned = _timed(lambda: formatter.clean_for_sheets(formatted), repeat)
+    timings["clean_for_sheets"] = seconds
+
+    with (
+        patch("gspread.service_account_from_dict"),
+        patch.dict(
+            os.environ, {"SPREADSHEET_ID": "bench", "SERVICE_ACCOUNT_JSON": "{}"}
+        ),
+    ):
+        writer = SpreadSheetWriter()
+        writer._ws = MagicMock()
+        writer.staging = False
+        seconds, _ = _timed(lambda: writer.write_all(cleaned), repeat)
+    timings["write_all_payload"] = seconds
+
+    return {k: round(v * 1000, 1) for k, v in timings.items()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """baselineより(1 + tolerance)倍以上遅くなった工程を返す"""
+    regressions = []
+    for rows, timings in results.items():
+        for stage, ms in timings.items():
+            base = baseline.get("results", {}).get(rows, {}).get(stage)
+            if base and ms > base * (1 + tolerance):
+                regressions.append(f"{rows}行 {stage}: {base} ms -> {ms} ms")
+    return regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="1000,10000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    rows_list = [int(r) for r in args.rows.split(",")]
+    report = {
+        "revision": _git_revision(),
+        "results": run_benchmarks(rows_list, args.repeat),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report["results"], json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
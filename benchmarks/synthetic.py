@@ -0,0 +1,85 @@
+"""アグリノートのエクスポートzipを模したテストデータを生成する
+
+- zip内のファイル名はcp932のバイト列（UTF-8フラグなし）で格納し、
+  zipfileでは cp437 として文字化けした名前で読める（_fix_encodingの想定どおり）
+- 作業記録xlsxは日付・作業時間（timedelta）・カテゴリ列を含む
+"""
+
+import os
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+WORK_RECORD_MEMBER = "作業記録２ 作業者.xlsx"
+OTHER_MEMBERS = ["作業記録１ 圃場.xlsx", "作業記録３ 資材.xlsx"]
+
+WORKERS = ["鈴木", "木下", "佐藤", "田中", "高橋", "伊藤"]
+FIELDS = [f"第{i}圃場" for i in range(1, 41)]
+CROPS = ["ぶどう", "もも", "りんご", "なし"]
+VARIETIES = ["シャインマスカット", "巨峰", "白鳳", "ふじ", "幸水"]
+TASKS = ["剪定", "消毒", "収穫", "摘粒", "草刈り", "出荷", "施肥"]
+
+
+def make_work_records(rows: int, seed: int = 0) -> pd.DataFrame:
+    """作業記録エクスポートと同じ列構成のDataFrameを作る"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2018, 1, 1)
+    days = rng.integers(0, 365 * 8, rows)
+    minutes = rng.integers(5, 600, rows)
+    return pd.DataFrame(
+        {
+            "作業ID": [f"W{i:07d}" for i in range(rows)],
+            "日付": [start + timedelta(days=int(d)) for d in days],
+            "開始時刻": [f"{h:02d}:00" for h in rng.integers(5, 18, rows)],
+            "終了時刻": [f"{h:02d}:30" for h in rng.integers(6, 20, rows)],
+            "作業時間": [timedelta(minutes=int(m)) for m in minutes],
+            "作業者": rng.choice(WORKERS, rows),
+            "圃場": rng.choice(FIELDS, rows),
+            "作物": rng.choice(CROPS, rows),
+            "品種": rng.choice(VARIETIES, rows),
+            "作業名": rng.choice(TASKS, rows),
+            "面積": np.round(rng.random(rows) * 50, 2),
+            "数量": rng.integers(0, 200, rows),
+            "備考": np.where(rng.random(rows) < 0.8, None, "雨のため中断"),
+        }
+    )
+
+
+def write_xlsx(df: pd.DataFrame, path) -> None:
+    """write_onlyモードで高速にxlsxを書き出す（作業時間は[h]:mm:ss書式）"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("作業記録")
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        ws.append([None if isinstance(v, float) and np.isnan(v) else v for v in row])
+    wb.save(path)
+
+
+class _Cp932ZipInfo(zipfile.ZipInfo):
+    """ファイル名をcp932のバイト列のまま（UTF-8フラグなしで）格納する"""
+
+    def _encodeFilenameFlags(self):
+        return self.filename.encode("cp437"), self.flag_bits
+
+
+def make_export_zip(path, rows: int, seed: int = 0, tmp_dir=None) -> str:
+    """作業記録xlsx（＋他のブック）を含むエクスポートzipを作る"""
+    tmp_dir = tmp_dir or tempfile.mkdtemp()
+    xlsx_path = os.path.join(tmp_dir, "work_records.xlsx")
+    write_xlsx(make_work_records(rows, seed), xlsx_path)
+    small_path = os.path.join(tmp_dir, "other.xlsx")
+    write_xlsx(make_work_records(min(rows, 100), seed + 1), small_path)
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, src in [(WORK_RECORD_MEMBER, xlsx_path)] + [
+            (n, small_path) for n in OTHER_MEMBERS
+        ]:
+            info = _Cp932ZipInfo(name.encode("cp932").decode("cp437"))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(src, "rb") as f:
+                z.writestr(info, f.read())
+    return str(path)
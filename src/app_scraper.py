@@ -1,13 +1,20 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from datetime import date
 
 from dotenv import load_dotenv
 from src.utils.logger import logger
+from src.utils.metrics import RssGrowth, metrics
 
 # .envファイルから環境変数を読み込む
 load_dotenv()
 SLACK_BOT_TOKEN = os.getenv("BOT_TOKEN")
 
+# Sheets接続・書込などスクレイピングと並行するI/O用（ウォームコンテナ間で使い回す）
+_executor = ThreadPoolExecutor(max_workers=4)
+
 
 def send_slack_message(channel, text):
     import requests
@@ -41,66 +48,563 @@ def handler(event, context):
     source = event.get("source", "Lambda1-Trigger")
 
     logger.info(f"Source: {source} | User: {user_id}")
+    metrics.set_property("RequestId", context.aws_request_id)
+    metrics.set_property("Source", source)
 
-    # 同期ボタンから呼び出したとき
-    if source != "eventbridge-scheduled":
-        # user_idを使ってメッセージを送信
-        send_slack_message(user_id, "アグリノート同期ジョブを開始")
+    # Slackから呼び出したとき（定期実行以外）は結果を伝える相手がいる
+    requester = user_id if source != "eventbridge-scheduled" else None
 
-    try:
-        # call scraping logic
-        run_scraper_workflow()
+    # 二段階エクスポートの場合はevent["phase"]に"request"/"download"を指定する
+    phase = event.get("phase")
+    # 前回から変更が無くても書き込み直す場合はevent["force_refresh"]をtrueにする
+    force_refresh = bool(event.get("force_refresh"))
 
-        # Slack経由の時のみ通知
-        if source != "eventbridge-scheduled":
+    # 同じ同期が実行中なら待機者として登録し、その実行の完了時に一緒に通知する
+    from src.core.lock import JobLock
+
+    lock = JobLock.from_env(owner=context.aws_request_id)
+    if not lock.acquire(waiter=requester):
+        if requester:
             send_slack_message(
-                user_id, "アグリノートからスプレッドシートへの同期が完了しました！"
+                requester, "実行中の同期があるため、その完了時にお知らせします"
             )
+        body = {"status": "coalesced"}
+        return {"statusCode": 200, "body": json.dumps(body)}
+
+    # 同期ボタンから呼び出したとき
+    if requester:
+        # user_idを使ってメッセージを送信
+        send_slack_message(requester, "アグリノート同期ジョブを開始")
+
+    error = None
+    try:
+        # 複数アカウント（event["tenants"]または環境変数TENANTS）の場合はまとめて同期
+        from src.core.tenants import load_tenants
 
+        tenants = load_tenants(event.get("tenants"))
+        if tenants:
+            result, message = _run_tenants(tenants, phase, force_refresh)
+            # 定期実行の時は管理チャンネルに送る
+            notify = [requester or os.getenv("ADMIN_CHANNEL_ID")]
+        else:
+            # call scraping logic
+            result = run_scraper_workflow(phase=phase, force_refresh=force_refresh)
+            message = _result_message(result)
+            notify = [requester]
     except Exception as e:
         logger.error(f"ジョブ失敗: {e}", exc_info=True)
+        error = e
+    finally:
+        # 実行中に合流した待機者にも同じ結果を通知する
+        waiters = lock.release()
+
+    if error is not None:
+        _notify([user_id] + waiters, f"エラー発生！: {error}")
         if user_id:
-            send_slack_message(user_id, f"エラー発生！: {e}")
             return
-        raise e
+        raise error
+
+    _notify(notify + waiters, message)
+    return {"statusCode": 200, "body": json.dumps(result, ensure_ascii=False)}
+
+
+def _notify(channels, text):
+    """重複を除いてSlackに通知する"""
+    for channel in dict.fromkeys(c for c in channels if c):
+        send_slack_message(channel, text)
 
-    return {"statusCode": 200, "body": json.dumps("Test completed successfully")}
 
+def _result_message(result):
+    if result.get("noop"):
+        return "前回の同期から変更が無かったため、スプレッドシートの更新を省略しました"
+    if result["status"] == "completed":
+        return "アグリノートからスプレッドシートへの同期が完了しました！"
+    return f"アグリノート同期ジョブが終了しました（{result['status']}）"
 
-def run_scraper_workflow():
-    import pandas as pd
+
+def _run_tenants(tenants, phase, force_refresh=False):
+    """複数アカウントを同期し、結果と1通にまとめたSlackメッセージを返す"""
+    from src.core.tenants import summarize
+
+    if phase:
+        raise ValueError("複数アカウントの同期では二段階エクスポートは使えません")
+
+    report = run_tenants_workflow(tenants, force_refresh=force_refresh)
+    return {"status": "completed", "tenants": report}, summarize(report)
+
+
+PENDING_EXPORT_KEY = "pending_export"
+
+
+@metrics.timed("workflow")
+def run_scraper_workflow(phase=None, force_refresh=False):
+    """スクレイピングロジック
+
+    phase=None: 1回の実行でエクスポート生成〜書き込みまで行う
+    phase="request": ログインして生成ボタンを押し、セッションと参照情報を保存して終了
+    phase="download": 保存済みの参照情報から再開してダウンロード〜書き込みを行う
+    エクスポートが前回の同期から変わっていなければ読込・書込を省略する
+    （force_refresh=Trueで省略しない）。
+    """
     from src.core.browser import BrowserManager
-    from src.core.formatter import AgriNoteFormatter
-    from src.core.scraper import AgriNoteScraper
-    from src.core.writer import SpreadSheetWriter
+    from src.core.export_client import HttpExportClient
+    from src.core.fingerprint import LastSync
+    from src.core.history import HistorySnapshot
+    from src.core.session import StateSessionStore
+    from src.core.state import make_state_store
+    from src.utils.error import ExportNotReadyError
+
+    if phase not in (None, "request", "download"):
+        raise ValueError(f"不明なphaseです: {phase}")
 
-    """スクレイピングロジック"""
-    writer = SpreadSheetWriter()
-    formatter = AgriNoteFormatter()
+    # zip内のExcel（キーワード）ごとの書込先シート
+    workbooks = _workbook_map()
+    state = make_state_store()
+    history = HistorySnapshot(store=state)
+    # セッションも参照情報と同じ保存先に置き、phase="download"の別コンテナでも使う
+    sessions = StateSessionStore(state)
+
+    if phase == "download":
+        pending = state.get(PENDING_EXPORT_KEY)
+        if not pending:
+            logger.info("待機中のエクスポートが無いため終了します")
+            return {"phase": phase, "status": "no_pending_export"}
+        since = date.fromisoformat(pending["since"]) if pending["since"] else None
+    else:
+        # EXPORT_WINDOWが指定され、履歴スナップショットがあれば期間指定でエクスポート
+        # （force_refreshでは期間外の編集・削除も反映するため全期間）
+        since = None
+        if not force_refresh:
+            since = history.window_start(os.getenv("EXPORT_WINDOW", ""))
+
+    if phase != "request":
+        # Google Sheetsへの接続（認証・シート情報取得）をスクレイピングと並行して済ませる
+        writers, connecting = _connect_writers(workbooks)
+        last_sync = LastSync(state, os.getenv("SPREADSHEET_ID"), force=force_refresh)
 
     # 1. アグリノートから最新データ（.zip）をダウンロードし、（.xlsx）を抽出
     logger.info("1. アグリノートから最新データを取得中...")
-    with BrowserManager(headless=True) as browser:
-        context = browser.new_context()
-        page = context.new_page()
-        scraper = AgriNoteScraper(page)
-        scraper.login(os.getenv("AGRI_NOTE_ID"), os.getenv("AGRI_NOTE_PASS"))
+    # EXPORT_API_*が設定されていればブラウザを使わない取得を優先し、
+    # 保存済みセッションが有効ならChromiumを起動せずに済ませる
+    http_client = HttpExportClient.from_env()
+    fetched = None
+    if phase is None and http_client is not None:
+        fetched = _fetch_without_browser(
+            http_client, sessions, since, workbooks, last_sync
+        )
+    if fetched is not None:
+        frames, rss = fetched
+        logger.info("1. 完了（ブラウザ無し）")
+    else:
+        # BROWSER_POOL=1の場合はウォームコンテナ間でブラウザを使い回す
+        pooled = os.getenv("BROWSER_POOL") == "1"
+        with (
+            metrics.stage("scrape"),
+            BrowserManager(headless=True, pooled=pooled) as browser,
+        ):
+            context, scraper, request_filter = _new_scraper(browser)
+            # セッションは保存しておき、後続の実行（phase="download"）でも再利用する
+            scraper.ensure_login(
+                os.getenv("AGRI_NOTE_ID"),
+                os.getenv("AGRI_NOTE_PASS"),
+                store=sessions,
+            )
+
+            if phase == "request":
+                pending = scraper.request_export(since=since)
+                state.set(PENDING_EXPORT_KEY, pending)
+                logger.info(f"1. エクスポートを要求しました: {pending}")
+                return {"phase": phase, "status": "requested", "export": pending}
+
+            try:
+                if phase == "download":
+                    # 生成が終わっていなければ次回の実行に任せる
+                    try:
+                        excel_paths = scraper.fetch_export(
+                            deadline=float(os.getenv("EXPORT_FETCH_DEADLINE", "30")),
+                            keywords=tuple(workbooks),
+                            pending=pending,
+                        )
+                    except ExportNotReadyError as e:
+                        logger.info(f"1. エクスポートがまだ生成中です: {e}")
+                        return {"phase": phase, "status": "pending", "export": pending}
+                else:
+                    # EXPORT_API_*が設定されていればブラウザを使わない取得を優先
+                    excel_paths = scraper.download_report(
+                        since=since,
+                        http_client=http_client,
+                        keywords=tuple(workbooks),
+                    )
+                # 読込から書込までのメモリ増分を測る（複数アカウント時は並行するため測らない）
+                rss = RssGrowth()
+                frames = _parse_changed(scraper, excel_paths, workbooks, last_sync)
+            finally:
+                scraper.cleanup()
+            if request_filter:
+                logger.info(f"1. リクエスト遮断結果: {request_filter.stats}")
+            logger.info("1. 完了")
+
+    result = {"phase": phase, "status": "completed"}
+    if frames is None:
+        result.update(_unchanged("crc"))
+    else:
+        result.update(
+            _write_results(
+                writers, connecting, frames, history, since, last_sync, rss=rss
+            )
+        )
+
+    # 書き込みまで終わったら待機中のエクスポートを消す
+    if phase == "download":
+        state.delete(PENDING_EXPORT_KEY)
+
+    logger.info("all completed!!")
+    return result
+
+
+@metrics.timed("workflow")
+def run_tenants_workflow(tenants, force_refresh=False) -> list:
+    """複数アカウントの同期を1つのブラウザで行い、アカウントごとの結果を返す
+
+    アカウントごとに独立したBrowserContextを開く。同時に開くコンテキスト数は
+    メモリ量から決め（context_slots）、その単位で
+    1. 全アカウントでログインして生成を要求（生成待ちを重ねる）
+    2. 順にダウンロード・読込し、整形・書込は別スレッドで並行
+    を繰り返す。1つのアカウントの失敗は他に影響させず、結果にエラーとして残す。
+    変更検知・force_refreshの扱いはrun_scraper_workflowと同じ。
+    """
+    from src.core.browser import BrowserManager
+    from src.core.fingerprint import LastSync
+    from src.core.history import HistorySnapshot
+    from src.core.session import StateSessionStore
+    from src.core.state import make_state_store
+    from src.core.tenants import context_slots, tenant_key
+
+    workbooks = _workbook_map()
+    state = make_state_store()
+    slots = context_slots()
+    report = {t["name"]: {"name": t["name"], "status": "pending"} for t in tenants}
+    logger.info(f"{len(tenants)}アカウントを同時{slots}コンテキストで同期します")
+
+    def fail(tenant, stage, e):
+        logger.error(f"[{tenant['name']}] {stage}に失敗: {e}", exc_info=True)
+        report[tenant["name"]].update(status="failed", error=f"{stage}: {e}")
+
+    pooled = os.getenv("BROWSER_POOL") == "1"
+    with (
+        ThreadPoolExecutor(max_workers=slots) as loaders,
+        metrics.stage("scrape"),
+        BrowserManager(headless=True, pooled=pooled) as browser,
+    ):
+        loading = {}
+        for i in range(0, len(tenants), slots):
+            jobs = []
+            # 1. ログインと生成要求
+            for tenant in tenants[i : i + slots]:
+                context = None
+                try:
+                    history = HistorySnapshot(
+                        store=state, key=tenant_key(tenant, "history.pkl")
+                    )
+                    since = None
+                    if not force_refresh:
+                        since = history.window_start(os.getenv("EXPORT_WINDOW", ""))
+                    writers, connecting = _connect_writers(
+                        workbooks, tenant["spreadsheet_id"]
+                    )
+                    last_sync = LastSync(
+                        state, tenant["spreadsheet_id"], force=force_refresh
+                    )
+                    context, scraper, _ = _new_scraper(browser)
+                    scraper.ensure_login(
+                        tenant["user_id"],
+                        tenant["password"],
+                        store=StateSessionStore(
+                            state,
+                            tenant_key(tenant, "session.bin"),
+                            secret=os.getenv("SESSION_SECRET") or tenant["password"],
+                        ),
+                    )
+                    scraper.request_export(since=since)
+                    # 取得後に読み込んだframesを渡して書込む処理
+                    write = partial(
+                        _write_results,
+                        writers,
+                        connecting,
+                        history=history,
+                        since=since,
+                        last_sync=last_sync,
+                    )
+                    jobs.append((tenant, context, scraper, last_sync, write))
+                except Exception as e:
+                    fail(tenant, "生成要求", e)
+                    if context is not None:
+                        context.close()
+
+            # 2. ダウンロード・読込（抽出先を共有するため順に）、書込は並行
+            for tenant, context, scraper, last_sync, write in jobs:
+                try:
+                    excel_paths = scraper.fetch_export(keywords=tuple(workbooks))
+                    frames = _parse_changed(scraper, excel_paths, workbooks, last_sync)
+                except Exception as e:
+                    fail(tenant, "取得", e)
+                    continue
+                finally:
+                    scraper.cleanup()
+                    context.close()
+                if frames is None:
+                    report[tenant["name"]].update(
+                        status="completed", **_unchanged("crc")
+                    )
+                    continue
+                loading[tenant["name"]] = loaders.submit(write, frames)
+
+        for name, future in loading.items():
+            try:
+                report[name].update(status="completed", **future.result())
+            except Exception as e:
+                fail({"name": name}, "書込", e)
+
+    results = [report[t["name"]] for t in tenants]
+    logger.info(f"アカウントごとの結果: {results}")
+    return results
+
+
+def _connect_writers(workbooks, spreadsheet_id=None):
+    """ブックごとのwriterを作り、接続をバックグラウンドで始める"""
+    from src.core.writer import SpreadSheetWriter
+
+    writers = {
+        keyword: SpreadSheetWriter(worksheet_name=sheet, spreadsheet_id=spreadsheet_id)
+        for keyword, sheet in workbooks.items()
+    }
+    connecting = [_executor.submit(w.connect) for w in writers.values()]
+    return writers, connecting
 
-        excel_path = scraper.download_report()
-        new_df = pd.read_excel(excel_path)
-        logger.info("1. 完了")
+
+def _new_scraper(browser):
+    """新しいBrowserContextでスクレイパーを作る（コンテキスト・遮断設定も返す）"""
+    from src.core.browser import RequestFilter
+    from src.core.scraper import AgriNoteScraper
+
+    context = browser.new_context(service_workers="block")
+    # 画像・フォント・解析タグなど不要なリクエストを遮断（REQUEST_FILTER=0で無効）
+    request_filter = None
+    if os.getenv("REQUEST_FILTER", "1") != "0":
+        request_filter = RequestFilter(allow_patterns=_env_list("ROUTE_ALLOW"))
+        request_filter.attach(context)
+    page = context.new_page()
+    return context, AgriNoteScraper(page), request_filter
+
+
+def _parse(excel_paths: dict) -> dict:
+    """抽出したExcelを読み込む（作業記録が無ければScrapeError）"""
+    from src.core.schema import PRIMARY_WORKBOOK
+    from src.utils.error import ScrapeError
+
+    if PRIMARY_WORKBOOK not in excel_paths:
+        raise ScrapeError("エクスポートに作業記録のExcelが含まれていません")
+    with metrics.stage("parse") as m:
+        frames = _read_workbooks(excel_paths)
+        m.put("Rows", len(frames[PRIMARY_WORKBOOK]))
+        m.put("Columns", len(frames[PRIMARY_WORKBOOK].columns))
+        m.put("Workbooks", len(excel_paths))
+    return frames
+
+
+def _fetch_without_browser(http_client, sessions, since, workbooks, last_sync):
+    """保存済みセッションのCookieでエクスポートをHTTP取得して読み込む
+
+    Chromiumを起動しないため、そのメモリ・起動時間がかからない。
+    セッションが無い・期限切れなどで取得できない場合はNone（ブラウザで取得する）、
+    取得できた場合は(frames, RssGrowth)を返す（framesは_parse_changedと同じ）。
+    """
+    from src.core.scraper import AgriNoteScraper
+
+    session = sessions.load()
+    if not session:
+        return None
+    scraper = AgriNoteScraper(None)
+    try:
+        try:
+            with metrics.stage("scrape"):
+                excel_paths = scraper.download_http(
+                    http_client,
+                    session.get("cookies", []),
+                    since,
+                    keywords=tuple(workbooks),
+                )
+        except Exception as e:
+            logger.warning(f"保存済みセッションでのHTTP取得に失敗しました: {e}")
+            return None
+        rss = RssGrowth()
+        return _parse_changed(scraper, excel_paths, workbooks, last_sync), rss
+    finally:
+        scraper.cleanup()
+
+
+def _parse_changed(scraper, excel_paths, workbooks, last_sync):
+    """zip内のCRCが前回の同期と同じなら読み込まずNoneを返す"""
+    if last_sync.crc_unchanged(scraper.last_fingerprints, workbooks):
+        logger.info("1. エクスポートのCRCが前回と同じため読込を省略します")
+        return None
+    return _parse(excel_paths)
+
+
+def _unchanged(skipped) -> dict:
+    """変更が無く読込・書込を省略した場合の結果（NoOpメトリクスも出す）"""
+    with metrics.stage("fingerprint") as m:
+        m.put("NoOp", 1)
+    return {"noop": True, "skipped": skipped}
+
+
+def _write_results(
+    writers, connecting, frames, history, since, last_sync, rss=None
+) -> dict:
+    """履歴へのマージ・整形・書込を行い、書込件数を返す
+
+    マージ後の内容が前回の同期と同じなら整形・書込を省略する。
+    rss（読込前に作ったRssGrowth）を渡すと、書込までのピークRSSの増分を出力する。
+    """
+    from src.core.formatter import AgriNoteFormatter
+    from src.core.schema import PRIMARY_WORKBOOK
+
+    frames = dict(frames)
+    new_df = frames.pop(PRIMARY_WORKBOOK)
+    writer = writers[PRIMARY_WORKBOOK]
+    formatter = AgriNoteFormatter(lean=_lean())
+    # PARTITION_BYが指定されていれば年（作期）ごとのシートに分けて書き込む
+    partitioned = bool(os.getenv("PARTITION_BY"))
+    diff_mode = os.getenv("WRITE_MODE", "full") == "diff" and not partitioned
+
+    # 期間指定の場合は履歴スナップショットにマージ
+    if since is not None:
+        logger.info(f"1. {since}以降の{len(new_df)}行を履歴にマージ")
+        new_df = history.merge(new_df, since)
+
+    if last_sync.content_unchanged({**frames, PRIMARY_WORKBOOK: new_df}):
+        logger.info("2. 内容が前回と同じため整形・書込を省略します")
+        # 新しいCRCを覚えておき、次回は読込も省略できるようにする
+        last_sync.save()
+        return {"rows": len(new_df), **_unchanged("content")}
+
+    # 差分同期の場合は既存シートの読込をフォーマットと並行して行う
+    for future in connecting:
+        future.result()
+    current = _executor.submit(writer.read_values) if diff_mode else None
+
+    # 作業記録以外のブックは別スレッドで整形・書込し、作業記録の処理と並行させる
+    loading = {
+        writers[keyword].worksheet_name: _executor.submit(
+            _load_workbook, writers[keyword], df
+        )
+        for keyword, df in frames.items()
+    }
 
     # 2. LookerStudioで表示できるようformat、文字列変換
     logger.info("2. フォーマット")
-    formatted_df = formatter.format(new_df)
-    cleaned_df = formatter.clean_for_sheets(formatted_df)
+    with metrics.stage("format") as m:
+        cleaned_df = formatter.format_for_sheets(new_df)
+        m.put("Rows", len(cleaned_df))
+        m.put("Columns", len(cleaned_df.columns))
     logger.info("2. 完了")
 
-    # 3. Spreadsheetに保存
+    # 3. Spreadsheetに保存（WRITE_MODE=diffの場合は差分のみ、分割時は変わった年のみ）
     logger.info("3. Spreadsheetに保存")
+    result = {"rows": len(cleaned_df)}
+    result["sheets"] = {writer.worksheet_name: len(cleaned_df)}
+    if partitioned:
+        partitions = writer.write_partitioned(cleaned_df, force=last_sync.force)
+        result["sheets"] = dict(partitions["rows"])
+        result["rewritten"] = partitions["rewritten"]
+    elif diff_mode:
+        result["sync"] = writer.sync(cleaned_df, current=current.result())
+        logger.info(f"3. 差分同期結果: {result['sync']}")
+    else:
+        writer.write_all(cleaned_df)
+    for sheet, future in loading.items():
+        result["sheets"][sheet] = future.result()
+    logger.info(f"3. シートごとの書込行数: {result['sheets']}")
+
+    # 次回の期間指定エクスポート用に履歴を保存
+    if os.getenv("EXPORT_WINDOW"):
+        history.save(new_df)
+    last_sync.save()
+    with metrics.stage("fingerprint") as m:
+        m.put("NoOp", 0)
+    # メモリ割り当ての目安（読込前からのピークRSSの増分を作業記録1万行あたりに換算）
+    if rss is not None:
+        growth = rss.peak_mb()
+        rss.stop()
+        with metrics.stage("memory") as m:
+            m.put("Rows", len(cleaned_df))
+            m.put("PeakRSSGrowth", growth, "Megabytes")
+            m.put(
+                "PeakRSSGrowthPer10kRows",
+                _per_10k_rows(growth, len(cleaned_df)),
+                "Megabytes",
+            )
+    result["noop"] = False
+    return result
+
+
+def _workbook_map():
+    """zip内のExcel名のキーワード -> 書込先シート名
+
+    既定は作業記録のみ。EXPORT_WORKBOOKS（「キーワード:シート名」のカンマ区切り、
+    シート名省略時はキーワードと同名）で追加・変更できる。
+    """
+    from src.core.schema import DEFAULT_WORKBOOKS
+
+    workbooks = dict(DEFAULT_WORKBOOKS)
+    for item in _env_list("EXPORT_WORKBOOKS"):
+        keyword, _, sheet = item.partition(":")
+        workbooks[keyword.strip()] = sheet.strip() or keyword.strip()
+    return workbooks
+
+
+def _read_workbooks(paths: dict) -> dict:
+    """抽出したExcelをスレッドで並行して読み込む（作業記録以外は型定義なし）
+
+    Lambdaでは/dev/shmが無くプロセスプールが使えないためスレッドを使う。
+    """
+    from src.core.reader import ExcelReader
+    from src.core.schema import PRIMARY_WORKBOOK
+
+    engine = os.getenv("EXCEL_ENGINE", "auto")
+
+    def read(keyword):
+        schema = None if keyword == PRIMARY_WORKBOOK else {}
+        reader = ExcelReader(engine=engine, schema=schema, lean=_lean())
+        return reader.read(paths[keyword])
+
+    with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+        return dict(zip(paths, pool.map(read, paths)))
+
+
+def _load_workbook(writer, df) -> int:
+    """作業記録以外のブックを汎用ルールで整形してシートに全件書き込む"""
+    from src.core.formatter import AgriNoteFormatter
+
+    formatter = AgriNoteFormatter(rules={}, lean=_lean())
+    cleaned_df = formatter.format_for_sheets(df)
     writer.write_all(cleaned_df)
+    return len(cleaned_df)
 
-    logger.info("all completed!!")
+
+def _lean() -> bool:
+    """MEMORY_MODE=leanの場合は読込・整形で重複の多い列をカテゴリ型で持つ"""
+    return os.getenv("MEMORY_MODE", "") == "lean"
+
+
+def _per_10k_rows(mb, rows) -> float:
+    """メモリ量（MB）を1万行あたりに換算する"""
+    return round(mb * 10000 / max(rows, 1), 1)
+
+
+def _env_list(name):
+    """カンマ区切りの環境変数をタプルにする"""
+    return tuple(v.strip() for v in os.getenv(name, "").split(",") if v.strip())
 
 
 if __name__ == "__main__":
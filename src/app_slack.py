@@ -3,10 +3,7 @@ import hashlib
 import hmac
 import json
 import os
-
-import requests
-import boto3
-import urllib
+import urllib.parse
 
 from src.utils.logger import logger
 
@@ -15,6 +12,18 @@ SLACK_BOT_TOKEN = os.getenv("BOT_TOKEN")
 # Lambda2の関数名
 SCRAPER_NAME = "pgfarm-agrinote-data-sync"
 
+# boto3の読込とクライアント生成は重いため、初回のボタン押下時に作って使い回す
+_lambda_client = None
+
+
+def get_lambda_client():
+    global _lambda_client
+    if _lambda_client is None:
+        import boto3
+
+        _lambda_client = boto3.client("lambda")
+    return _lambda_client
+
 
 def verify_slack_signature(event):
     # 署名検証
@@ -25,11 +34,10 @@ def verify_slack_signature(event):
         return False
     body = event.get("body", "")
     base_string = f"v0:{timestamp}:{body}".encode("utf-8")
-    my_signature = f"v0={
-        hmac.new(
-            SLACK_SIGNING_SECRET.encode('utf-8'), base_string, hashlib.sha256
-        ).hexdigest()
-    }"
+    digest = hmac.new(
+        SLACK_SIGNING_SECRET.encode("utf-8"), base_string, hashlib.sha256
+    ).hexdigest()
+    my_signature = f"v0={digest}"
 
     return hmac.compare_digest(my_signature, signature)
 
@@ -69,7 +77,7 @@ def handler(event, context):
             logger.info(f"ボタン検知{user_id}のためにLambda2を起動")
 
             # Lambda2を起動（非同期）
-            lambda_client = boto3.client("lambda")
+            lambda_client = get_lambda_client()
             payload = {"user_id": user_id, "source": "slack_button"}
 
             lambda_client.invoke(
@@ -93,6 +101,8 @@ def handler(event, context):
 
 def publish_home_view(user_id):
     """Slackのホーム画面を描画する"""
+    import requests
+
     url = "https://slack.com/api/views.publish"
 
     # 画面のデザイン（Block Kit）
@@ -1,29 +1,170 @@
+import time
+
 from playwright.sync_api import sync_playwright
+from src.utils.logger import logger
+
+# Lambda環境で安定して動かすためのオプション
+LAUNCH_ARGS = [
+    "--single-process",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+]
+
+# スクレイパーが使わないため既定でブロックするリソース種別とURL
+BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+BLOCKED_URL_PATTERNS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "clarity.ms",
+)
+
+# プールモードの再起動ポリシー（メモリを抑えるため定期的に作り直す）
+DEFAULT_MAX_AGE = 30 * 60  # 秒
+DEFAULT_MAX_USES = 20
+
+# プールモードでウォームコンテナ間に使い回すPlaywrightとブラウザ
+_pool = {"playwright": None, "browser": None, "launched_at": 0.0, "uses": 0}
+
 
 class BrowserManager:
-    def __init__(self, headless=True):
+    def __init__(
+        self,
+        headless=True,
+        pooled=False,
+        max_age=DEFAULT_MAX_AGE,
+        max_uses=DEFAULT_MAX_USES,
+    ):
+        """pooled=Trueの場合はブラウザを閉じずにモジュールに保持し、次回の実行で再利用する"""
         self.headless = headless
+        self.pooled = pooled
+        self.max_age = max_age
+        self.max_uses = max_uses
         self.playwright = None
         self.browser = None
 
     def __enter__(self):
+        if self.pooled:
+            self.browser = self._acquire_pooled()
+            return self.browser
+
         self.playwright = sync_playwright().start()
-        # Lambda環境で安定して動かすためのオプション
-        self.browser = self.playwright.chromium.launch(
-            headless=self.headless,
-            args=[
-                "--single-process",
-                "--disable-dev-shm-usage",
-                "--no-sandbox",
-                "--disable-gpu",
-                "--disable-software-rasterizer",
-            ]
-        )
+        self.browser = _launch(self.playwright, self.headless)
         return self.browser
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.pooled:
+            # ブラウザは残し、今回の実行で作ったコンテキストだけ閉じる
+            for context in list(self.browser.contexts):
+                try:
+                    context.close()
+                except Exception as e:
+                    logger.warning(f"コンテキストのクローズに失敗: {e}")
+            return
+
         if self.browser:
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
 
+    def _acquire_pooled(self):
+        """プールのブラウザを返す。切断・期限切れなら起動し直す"""
+        browser = _pool["browser"]
+        if browser is not None:
+            age = time.monotonic() - _pool["launched_at"]
+            if not browser.is_connected():
+                logger.warning("プールのブラウザが切断されていたため再起動します")
+                shutdown_pool()
+            elif age > self.max_age or _pool["uses"] >= self.max_uses:
+                logger.info(
+                    f"プールのブラウザを再起動します（{age:.0f}秒, {_pool['uses']}回使用）"
+                )
+                shutdown_pool()
+
+        if _pool["browser"] is None:
+            if _pool["playwright"] is None:
+                _pool["playwright"] = sync_playwright().start()
+            _pool["browser"] = _launch(_pool["playwright"], self.headless)
+            _pool["launched_at"] = time.monotonic()
+            _pool["uses"] = 0
+        else:
+            logger.info("プールのブラウザを再利用します")
+
+        _pool["uses"] += 1
+        return _pool["browser"]
+
+
+class RequestFilter:
+    """コンテキストのリクエストをリソース種別・URLで遮断する
+
+    allow_patternsに一致するURLは種別に関わらず通す（エクスポート画面に必要なもの）。
+    statsに許可・遮断件数と、許可したレスポンスの合計バイト数を記録する。
+    遮断したリクエストは取得しないためバイト数は分からない。
+    """
+
+    def __init__(
+        self,
+        resource_types=BLOCKED_RESOURCE_TYPES,
+        url_patterns=BLOCKED_URL_PATTERNS,
+        allow_patterns=(),
+    ):
+        self.resource_types = set(resource_types)
+        self.url_patterns = tuple(url_patterns)
+        self.allow_patterns = tuple(allow_patterns)
+        self.stats = {"allowed": 0, "allowed_bytes": 0, "blocked": 0, "blocked_by": {}}
+
+    def attach(self, context):
+        context.route("**/*", self._handle)
+        context.on("requestfinished", self._on_finished)
+        return context
+
+    def should_block(self, resource_type: str, url: str) -> str:
+        """遮断理由（種別またはURLパターン）を返す。通す場合は空文字"""
+        if any(p in url for p in self.allow_patterns):
+            return ""
+        if resource_type in self.resource_types:
+            return resource_type
+        for pattern in self.url_patterns:
+            if pattern in url:
+                return pattern
+        return ""
+
+    def _handle(self, route):
+        request = route.request
+        reason = self.should_block(request.resource_type, request.url)
+        if reason:
+            self.stats["blocked"] += 1
+            self.stats["blocked_by"][reason] = (
+                self.stats["blocked_by"].get(reason, 0) + 1
+            )
+            route.abort()
+        else:
+            self.stats["allowed"] += 1
+            route.continue_()
+
+    def _on_finished(self, request):
+        try:
+            self.stats["allowed_bytes"] += request.sizes()["responseBodySize"]
+        except Exception:
+            # ページ遷移などでサイズが取れない場合は数えない
+            pass
+
+
+def shutdown_pool():
+    """プールしているブラウザとPlaywrightを終了する"""
+    browser, playwright = _pool["browser"], _pool["playwright"]
+    _pool.update(playwright=None, browser=None, launched_at=0.0, uses=0)
+    for close in (browser and browser.close, playwright and playwright.stop):
+        if not close:
+            continue
+        try:
+            close()
+        except Exception as e:
+            logger.warning(f"プールの終了処理に失敗: {e}")
+
+
+def _launch(playwright, headless):
+    return playwright.chromium.launch(headless=headless, args=LAUNCH_ARGS)
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.utils.logger import logger
+from src.utils.error import ScrapeError
+
+# ダウンロード時に一度に書き込むサイズ
+CHUNK_SIZE = 1024 * 1024
+
+# 接続プール付きのSession（ウォームコンテナの次回実行でも使い回す）
+_session = None
+_session_lock = threading.Lock()
+
+
+class HttpExportClient:
+    """ブラウザを使わずにエクスポートを生成・ダウンロードするクライアント
+
+    ブラウザのログイン済みセッション（または保存済みセッション）のCookieを使い、
+    生成依頼（POST request_url）→状態確認（GET status_url）→zipのストリーミング取得を行う。
+    - request_url のレスポンス: {"id": ...}
+    - status_url（"{id}"を置換）のレスポンス: {"status": "done", "url": ...}
+    URLは環境変数 EXPORT_API_REQUEST_URL / EXPORT_API_STATUS_URL で指定する。
+    """
+
+    def __init__(
+        self,
+        request_url,
+        status_url,
+        body=None,
+        poll_interval=2.0,
+        timeout=120.0,
+        session=None,
+    ):
+        self.request_url = request_url
+        self.status_url = status_url
+        self.body = body or {"type": "work_record", "format": "excel"}
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.session = session or shared_session()
+
+    @classmethod
+    def from_env(cls):
+        """環境変数が揃っていればクライアントを返す（無ければNone）"""
+        request_url = os.getenv("EXPORT_API_REQUEST_URL")
+        status_url = os.getenv("EXPORT_API_STATUS_URL")
+        if not request_url or not status_url:
+            return None
+        body = os.getenv("EXPORT_API_REQUEST_BODY")
+        return cls(request_url, status_url, body=json.loads(body) if body else None)
+
+    def download(self, cookies, dest_dir, since=None, until=None) -> str:
+        """エクスポートを生成してzipを保存し、そのパスを返す"""
+        # Sessionは使い回すため、Cookieを渡された場合は前回の実行のものを残さない
+        if cookies:
+            self.session.cookies.clear()
+        for c in cookies:
+            self.session.cookies.set(
+                c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/")
+            )
+
+        body = dict(self.body)
+        if since is not None:
+            body["since"] = since.isoformat()
+        if until is not None:
+            body["until"] = until.isoformat()
+
+        res = self.session.post(self.request_url, json=body, timeout=30)
+        res.raise_for_status()
+        export_id = res.json()["id"]
+        logger.info(f"エクスポート生成を依頼しました（HTTP）: {export_id}")
+
+        url = self._wait_ready(export_id)
+        return self._stream(url, dest_dir, f"{export_id}.zip")
+
+    def _wait_ready(self, export_id) -> str:
+        deadline = time.monotonic() + self.timeout
+        status_url = self.status_url.replace("{id}", str(export_id))
+        while time.monotonic() < deadline:
+            res = self.session.get(status_url, timeout=30)
+            res.raise_for_status()
+            status = res.json()
+            if status.get("status") == "done":
+                # 相対URLの場合は状態確認URLを基準にする
+                return urljoin(status_url, status["url"])
+            if status.get("status") == "error":
+                raise ScrapeError(f"エクスポート生成に失敗しました: {status}")
+            time.sleep(self.poll_interval)
+        raise ScrapeError(f"エクスポート生成が{self.timeout}秒以内に完了しませんでした")
+
+    def _stream(self, url, dest_dir, filename) -> str:
+        path = os.path.join(dest_dir, filename)
+        with self.session.get(url, stream=True, timeout=60) as res:
+            res.raise_for_status()
+            with open(path, "wb") as f:
+                for chunk in res.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+        return path
+
+
+def shared_session():
+    """モジュールで保持する接続プール付きのSession（無ければ作る）"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _pooled_session()
+        return _session
+
+
+def _pooled_session():
+    """接続を使い回し、一時的なエラーはリトライするSession"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
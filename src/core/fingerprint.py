@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+# 状態ストアに保存する前回成功時の指紋のキー（スプレッドシートIDごと）
+LAST_SYNC_KEY = "last_sync"
+
+
+def crc_fingerprint(crcs: dict, workbooks: dict) -> str:
+    """zip内メンバーのCRC・サイズと書込先シートから作る指紋（読込前に比較できる）"""
+    return "|".join(f"{k}>{workbooks.get(k)}:{crcs[k]}" for k in sorted(crcs))
+
+
+def content_fingerprint(frames: dict) -> str:
+    """読み込んだ行の内容（列名・値）から作る指紋
+
+    xlsxは作成日時などのメタデータでCRCが変わるため、CRCが違っても内容が同じなら一致する。
+    """
+    h = hashlib.sha256()
+    for key in sorted(frames):
+        df = frames[key]
+        h.update(key.encode("utf-8"))
+        h.update(json.dumps([str(c) for c in df.columns], ensure_ascii=False).encode())
+        h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def output_settings() -> str:
+    """書込結果に影響する設定（分割・書込方式・整形ルール）の指紋
+
+    設定を変えた場合はエクスポートが同じでも書き直す。
+    """
+    from src.core.schema import WORK_RECORD_TRANSFORMS
+
+    settings = {
+        "partition_by": os.getenv("PARTITION_BY", ""),
+        "season_start_month": os.getenv("SEASON_START_MONTH", "1"),
+        "write_mode": os.getenv("WRITE_MODE", "full"),
+        "transforms": WORK_RECORD_TRANSFORMS,
+    }
+    dumped = json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(dumped.encode("utf-8")).hexdigest()
+
+
+class LastSync:
+    """前回成功した同期の指紋（状態ストアに保存）と今回の指紋を比べる
+
+    force=Trueの場合、または出力設定（output_settings）が前回と違う場合は
+    常に「変更あり」として扱う（強制再同期）。
+    """
+
+    def __init__(self, store, spreadsheet_id, force=False, settings=None):
+        self.store = store
+        self.key = f"{LAST_SYNC_KEY}:{spreadsheet_id}"
+        self.previous = store.get(self.key) or {}
+        self.settings = output_settings() if settings is None else settings
+        # 前回の記録があり、出力設定が違う場合も強制再同期にする
+        changed = bool(self.previous) and self.previous.get("settings") != self.settings
+        self.force = force or changed
+        self.crc = None
+        self.content = None
+
+    def crc_unchanged(self, crcs: dict, workbooks: dict) -> bool:
+        self.crc = crc_fingerprint(crcs, workbooks)
+        return (
+            not self.force and bool(self.crc) and self.previous.get("crc") == self.crc
+        )
+
+    def content_unchanged(self, frames: dict) -> bool:
+        self.content = content_fingerprint(frames)
+        return not self.force and self.previous.get("content") == self.content
+
+    def save(self):
+        """書込まで成功した時に今回の指紋を保存する"""
+        self.previous = {
+            "crc": self.crc,
+            "content": self.content,
+            "settings": self.settings,
+            "synced_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.store.set(self.key, self.previous)
@@ -1,23 +1,98 @@
 import pandas as pd
 
+from src.core.schema import WORK_RECORD_TRANSFORMS
+from src.core.transform import compile_transforms
+
+# clean_for_sheets済みのDataFrameに付ける目印（df.attrs）
+SHEETS_CLEAN_ATTR = "sheets_clean"
+# 省メモリモードでカテゴリ型にする列（異なる値の数が行数のこの割合以下）
+LEAN_CATEGORY_RATIO = 0.5
+
 
 class AgriNoteFormatter:
+    def __init__(self, rules=None, types=None, lean=False):
+        """rulesを省略すると作業記録用の整形ルールを使う
+
+        lean=Trueの場合、clean_for_sheetsは重複の多い列をカテゴリ型で返す（省メモリ）。
+        """
+        if rules is None:
+            rules = WORK_RECORD_TRANSFORMS
+        self.pipeline = compile_transforms(rules, types)
+        self.lean = lean
+
     def format(self, df: pd.DataFrame) -> pd.DataFrame:
-        """ダウンロードしたエクセルデータを解析・整形する"""
-        df = df.dropna(how="all")
+        """ダウンロードしたエクセルデータを解析・整形する
+
+        timedelta列は時間（小数）に、日付・数値列はルールの書式・桁数に揃える。
+        """
+        return self.pipeline.apply(df)
+
+    def clean_for_sheets(self, df: pd.DataFrame, inplace=False) -> pd.DataFrame:
+        """Google Sheetsへの書き込み用にDataFrameの欠損値を空文字に変更
+
+        セルごとのstr()ではなく列単位で型に応じて文字列化する（結果はstr()と同じ）。
+        inplace=Trueの場合はdfの列を1列ずつ置き換え、変換前の列をすぐに手放す。
+        """
+        to_strings = _to_sheet_categories if self.lean else _to_sheet_strings
+        if inplace:
+            cleaned = df
+            for i in range(df.shape[1]):
+                cleaned.isetitem(i, to_strings(df.iloc[:, i]))
+        else:
+            cleaned = pd.DataFrame(
+                {i: to_strings(df.iloc[:, i]) for i in range(df.shape[1])},
+                index=df.index,
+            )
+            cleaned.columns = df.columns
+        cleaned.attrs[SHEETS_CLEAN_ATTR] = True
+
+        return cleaned
+
+    def format_for_sheets(self, df: pd.DataFrame) -> pd.DataFrame:
+        """formatとclean_for_sheetsを続けて行う（整形途中のDataFrameを残さない）"""
+        return self.clean_for_sheets(self.format(df), inplace=True)
+
+
+def is_sheets_clean(df: pd.DataFrame) -> bool:
+    """clean_for_sheets済み（全列が欠損なしの文字列）ならTrue"""
+    return bool(df.attrs.get(SHEETS_CLEAN_ATTR)) and all(
+        _is_sheet_string(dtype) for dtype in df.dtypes
+    )
+
+
+def _is_sheet_string(dtype) -> bool:
+    """文字列の列、またはカテゴリが文字列のカテゴリ型ならTrue"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return pd.api.types.is_string_dtype(dtype.categories.dtype)
+    return pd.api.types.is_string_dtype(dtype)
 
-        # timedelta型の列を探して、HH:MM 形式の文字列に変換
-        for col in df.columns:
-            if pd.api.types.is_timedelta64_dtype(df[col]):
-                df[col] = df[col].dt.total_seconds() / 3600
-                df[col] = df[col].round(2)
 
-        return df
+def _to_sheet_strings(col: pd.Series) -> pd.Series:
+    """1列をstr()相当の文字列に変換し、欠損値を空文字にする"""
+    mask = col.isna()
+    if isinstance(col.dtype, pd.DatetimeTZDtype):
+        strings = col.map(str, na_action="ignore")
+    elif pd.api.types.is_datetime64_dtype(col):
+        # astype(str)は時刻が全て0時の列で日付のみになるため書式を固定
+        strings = col.dt.strftime("%Y-%m-%d %H:%M:%S")
+    else:
+        strings = col.astype(str)
+    return strings.where(~mask, "").astype(str)
 
-    def clean_for_sheets(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Google Sheetsへの書き込み用にDataFrameの欠損値を空文字に変更"""
 
-        df = df.copy()
-        df = df.map(lambda x: "" if pd.isna(x) else str(x))
+def _to_sheet_categories(col: pd.Series) -> pd.Series:
+    """_to_sheet_stringsと同じ文字列を、重複の多い列はカテゴリ型で返す
 
-        return df
+    カテゴリ型の列はカテゴリの値だけを文字列化する。その他の列は文字列化した後、
+    異なる値の数が少なければカテゴリ型に、多ければstring型にする
+    （pyarrowがあればpandasの既定でpyarrowの文字列になる）。
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        categories = _to_sheet_strings(pd.Series(col.cat.categories))
+        if categories.is_unique and not (categories == "").any():
+            col = col.cat.rename_categories(categories.tolist())
+            return col.cat.add_categories([""]).fillna("")
+    strings = _to_sheet_strings(col)
+    if strings.nunique() <= len(strings) * LEAN_CATEGORY_RATIO:
+        return strings.astype("category")
+    return strings.astype("string")
@@ -0,0 +1,102 @@
+import io
+import os
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.core.schema import DATE_COLUMN, KEY_COLUMN
+from src.utils.logger import logger
+
+DEFAULT_HISTORY_PATH = "/tmp/agrinote/history.pkl"
+# 状態ストアに保存する場合のキー
+HISTORY_KEY = "history.pkl"
+
+
+class HistorySnapshot:
+    """期間指定エクスポートをマージするための履歴スナップショット
+
+    前回成功時のDataFrame（フォーマット前）と同期日をpickleで保存する。
+    storeに状態ストア（make_state_store）を渡すとそのkeyに保存し、
+    STATE_BUCKETを設定していれば別のLambdaコンテナとも共有する（無ければpathのファイル）。
+    スナップショットが無い場合（コールドスタート直後など）は全期間エクスポートに戻す。
+    """
+
+    def __init__(self, path=None, store=None, key=HISTORY_KEY):
+        self.path = path or os.getenv("HISTORY_PATH", DEFAULT_HISTORY_PATH)
+        self.store = store
+        self.key = key
+        self._loaded = False
+        self.df = None
+        self.synced_at = None
+
+    def load(self):
+        """スナップショットを読み込む（無ければdfはNoneのまま）"""
+        if self._loaded:
+            return self.df
+        self._loaded = True
+        if self.store is not None:
+            raw = self.store.get_bytes(self.key)
+            source = io.BytesIO(raw) if raw is not None else None
+        else:
+            source = self.path if os.path.exists(self.path) else None
+        if source is None:
+            return None
+        try:
+            data = pd.read_pickle(source)
+            self.df = data["df"]
+            self.synced_at = data["synced_at"]
+        except Exception as e:
+            logger.warning(f"履歴スナップショットを読めませんでした: {e}")
+            self.df, self.synced_at = None, None
+        return self.df
+
+    def save(self, df: pd.DataFrame, synced_at: date = None):
+        """同期成功後に最新の履歴を保存する"""
+        data = {"df": df, "synced_at": synced_at or date.today()}
+        if self.store is not None:
+            buf = io.BytesIO()
+            pd.to_pickle(data, buf)
+            self.store.set_bytes(self.key, buf.getvalue())
+        else:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            pd.to_pickle(data, tmp_path)
+            os.replace(tmp_path, self.path)
+        self.df, self.synced_at, self._loaded = df, synced_at or date.today(), True
+
+    def window_start(self, window: str, today: date = None):
+        """EXPORT_WINDOWの指定からエクスポート開始日を決める
+
+        - "" : 全期間（None）
+        - "7" など数値 : 直近N日（前回成功日がそれより前なら前回成功日から）
+        - "since_last" : 前回成功日から
+        スナップショットが無い場合は常に全期間。それ以外の指定はValueError。
+        前回成功日より後から取得すると、その間の行が履歴に無いまま書込で消えるため、
+        開始日は前回成功日より後にしない。
+        """
+        if window and window != "since_last" and not window.isdigit():
+            raise ValueError(
+                f"EXPORT_WINDOWが不正です: {window!r}（日数 または since_last）"
+            )
+        if not window or self.load() is None:
+            return None
+        if window == "since_last":
+            return self.synced_at
+        today = today or date.today()
+        return min(today - timedelta(days=int(window)), self.synced_at)
+
+    def merge(self, window_df: pd.DataFrame, since: date) -> pd.DataFrame:
+        """期間分のエクスポートを履歴にマージし、作業IDで重複排除する
+
+        期間内の行はエクスポート側を正とする（期間内で消えた行は削除扱い）。
+        """
+        history = self.load()
+        if history is None or since is None:
+            return window_df
+
+        dates = pd.to_datetime(history[DATE_COLUMN], errors="coerce", format="mixed")
+        kept = history[~(dates >= pd.Timestamp(since))]
+        merged = pd.concat([kept, window_df], ignore_index=True)
+        return merged.drop_duplicates(subset=KEY_COLUMN, keep="last").reset_index(
+            drop=True
+        )
@@ -0,0 +1,235 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.utils.error import AgriNoteError
+from src.utils.logger import logger
+
+DEFAULT_LOCK_PATH = "/tmp/agrinote/lock.db"
+DEFAULT_LOCK_NAME = "agrinote-sync"
+# リースの有効秒数（実行中はハートビートでttl/3ごとに延長する）
+DEFAULT_LOCK_TTL = 300
+
+
+class SQLiteLockBackend:
+    """リースロックをSQLiteに保存する（ローカル実行・テスト用）
+
+    バックエンドは acquire / renew / release を持てば差し替えられる。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("LOCK_PATH", DEFAULT_LOCK_PATH)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS locks ("
+                "name TEXT PRIMARY KEY, owner TEXT, expires_at REAL, waiters TEXT)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def acquire(self, name, owner, ttl, waiter=None) -> bool:
+        """ロックを取得する。実行中なら待機者として登録してFalseを返す（1トランザクション）"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT owner, expires_at, waiters FROM locks WHERE name = ?", (name,)
+            ).fetchone()
+            if row and row[0] != owner and row[1] > now:
+                if waiter is not None:
+                    waiters = json.loads(row[2])
+                    waiters.append(waiter)
+                    conn.execute(
+                        "UPDATE locks SET waiters = ? WHERE name = ?",
+                        (json.dumps(waiters), name),
+                    )
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO locks VALUES (?, ?, ?, ?)",
+                (name, owner, now + ttl, "[]"),
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def renew(self, name, owner, ttl) -> bool:
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE locks SET expires_at = ? WHERE name = ? AND owner = ?",
+                (time.time() + ttl, name, owner),
+            )
+            return cur.rowcount == 1
+
+    def release(self, name, owner) -> list:
+        """ロックを解放し、実行中に登録された待機者を返す"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT waiters FROM locks WHERE name = ? AND owner = ?", (name, owner)
+            ).fetchone()
+            conn.execute(
+                "DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else []
+
+
+class DynamoDBLockBackend:
+    """リースロックをDynamoDB（パーティションキー"name"）に保存する
+
+    条件付き書込で取得・待機者登録・解放を原子的に行う。
+    """
+
+    def __init__(self, table):
+        import boto3
+
+        self.table = table
+        self.client = boto3.client("dynamodb")
+
+    def acquire(self, name, owner, ttl, waiter=None) -> bool:
+        errors = self.client.exceptions.ConditionalCheckFailedException
+        while True:
+            now = time.time()
+            try:
+                self.client.put_item(
+                    TableName=self.table,
+                    Item={
+                        "name": {"S": name},
+                        "owner": {"S": owner},
+                        "expires_at": {"N": str(now + ttl)},
+                        "waiters": {"L": []},
+                    },
+                    ConditionExpression=(
+                        "attribute_not_exists(#n) OR expires_at < :now OR #o = :owner"
+                    ),
+                    ExpressionAttributeNames={"#n": "name", "#o": "owner"},
+                    ExpressionAttributeValues={
+                        ":now": {"N": str(now)},
+                        ":owner": {"S": owner},
+                    },
+                )
+                return True
+            except errors:
+                pass
+            if waiter is None:
+                return False
+            try:
+                self.client.update_item(
+                    TableName=self.table,
+                    Key={"name": {"S": name}},
+                    UpdateExpression="SET waiters = list_append(waiters, :w)",
+                    ConditionExpression="expires_at >= :now",
+                    ExpressionAttributeValues={
+                        ":w": {"L": [{"S": waiter}]},
+                        ":now": {"N": str(now)},
+                    },
+                )
+                return False
+            except errors:
+                # 登録の直前に解放・失効した場合は取得からやり直す
+                continue
+
+    def renew(self, name, owner, ttl) -> bool:
+        try:
+            self.client.update_item(
+                TableName=self.table,
+                Key={"name": {"S": name}},
+                UpdateExpression="SET expires_at = :exp",
+                ConditionExpression="#o = :owner",
+                ExpressionAttributeNames={"#o": "owner"},
+                ExpressionAttributeValues={
+                    ":exp": {"N": str(time.time() + ttl)},
+                    ":owner": {"S": owner},
+                },
+            )
+            return True
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+    def release(self, name, owner) -> list:
+        try:
+            res = self.client.delete_item(
+                TableName=self.table,
+                Key={"name": {"S": name}},
+                ConditionExpression="#o = :owner",
+                ExpressionAttributeNames={"#o": "owner"},
+                ExpressionAttributeValues={":owner": {"S": owner}},
+                ReturnValues="ALL_OLD",
+            )
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return []
+        waiters = res.get("Attributes", {}).get("waiters", {}).get("L", [])
+        return [w["S"] for w in waiters]
+
+
+class JobLock:
+    """同期ジョブを1つだけ実行するためのリースロック
+
+    lock = JobLock(backend, owner=request_id)
+    if lock.acquire(waiter=user_id):   # 実行中なら待機者として登録されFalse
+        try: ...
+        finally: waiters = lock.release()   # 完了を知らせる相手
+    """
+
+    def __init__(self, backend, name=DEFAULT_LOCK_NAME, owner=None, ttl=None):
+        self.backend = backend
+        self.name = name
+        self.owner = owner or f"{os.getpid()}-{time.time_ns()}"
+        self.ttl = float(ttl or os.getenv("LOCK_TTL", DEFAULT_LOCK_TTL))
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    @classmethod
+    def from_env(cls, owner=None):
+        """LOCK_TABLEが設定されていればDynamoDB、無ければSQLiteを使う
+
+        SQLiteはコンテナ内でしか効かず、Lambdaでは同時実行が別コンテナになるため、
+        Lambda上でLOCK_TABLEが無い場合はAgriNoteErrorを送出する。
+        """
+        table = os.getenv("LOCK_TABLE")
+        if not table and os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+            raise AgriNoteError(
+                "Lambdaでは同時実行を防げないため、LOCK_TABLE（DynamoDB）を設定してください"
+            )
+        backend = DynamoDBLockBackend(table) if table else SQLiteLockBackend()
+        return cls(backend, name=os.getenv("LOCK_NAME", DEFAULT_LOCK_NAME), owner=owner)
+
+    def acquire(self, waiter=None) -> bool:
+        if not self.backend.acquire(self.name, self.owner, self.ttl, waiter):
+            logger.info(f"ロック{self.name}は実行中のため待機者として登録: {waiter}")
+            return False
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._renew_loop, daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _renew_loop(self):
+        while not self._stop.wait(self.ttl / 3):
+            if not self.backend.renew(self.name, self.owner, self.ttl):
+                logger.warning(f"ロック{self.name}のリースを失いました")
+                return
+
+    def release(self) -> list:
+        """ロックを解放し、重複を除いた待機者を返す"""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+        waiters = self.backend.release(self.name, self.owner)
+        return list(dict.fromkeys(waiters))
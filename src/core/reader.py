@@ -0,0 +1,205 @@
+import importlib.util
+import time
+import tracemalloc
+from datetime import datetime, time as dt_time, timedelta
+from itertools import islice
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.core.formatter import LEAN_CATEGORY_RATIO
+from src.core.schema import WORK_RECORD_SCHEMA
+from src.utils.logger import logger
+from src.utils.error import ScrapeError
+
+ENGINES = ("auto", "calamine", "openpyxl")
+# 省メモリモードで1回に型変換する行数
+LEAN_CHUNK_ROWS = 10000
+
+
+class ExcelReader:
+    """列定義（スキーマ）に沿ってエクスポートExcelを読み込む
+
+    engine:
+        - "openpyxl": read_onlyモードでiter_rowsを逐次読み込み
+        - "calamine": python-calamineがインストールされている場合の高速エンジン
+        - "auto": calamineがあればcalamine、無ければopenpyxl
+    profile=Trueの場合はtracemallocでピークメモリも計測する（計測分遅くなる）。
+    lean=Trueの場合はスキーマに無い列も重複が多ければカテゴリ型にする（省メモリ）。
+    """
+
+    def __init__(self, engine="auto", schema=None, profile=False, lean=False):
+        if engine not in ENGINES:
+            raise ValueError(f"未対応のエンジンです: {engine}")
+        if engine == "auto":
+            engine = "calamine" if _has_calamine() else "openpyxl"
+        self.engine = engine
+        self.schema = WORK_RECORD_SCHEMA if schema is None else schema
+        self.profile = profile
+        self.lean = lean
+        self.stats = {}
+
+    def read(self, path) -> pd.DataFrame:
+        """先頭シートを読み込み、スキーマで型変換したDataFrameを返す"""
+        if self.profile:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            if self.engine == "calamine":
+                read_rows = self._rows_calamine
+            else:
+                read_rows = self._rows_openpyxl
+            # 行は_to_frameの中で変換が進むごとに手放す
+            df = self._to_frame(read_rows(path))
+        except Exception as e:
+            raise ScrapeError(f"Excelの読込に失敗しました: {e}")
+        finally:
+            peak = None
+            if self.profile:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+        seconds = time.perf_counter() - started
+        self.stats = {
+            "engine": self.engine,
+            "rows": len(df),
+            "columns": len(df.columns),
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(len(df) / seconds) if seconds else None,
+            "peak_memory_mb": round(peak / 1024 / 1024, 1) if peak else None,
+        }
+        logger.info(f"Excel読込: {self.stats}")
+        return df
+
+    def _rows_openpyxl(self, path):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            # 全行のリストを作らず1行ずつ返す
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
+
+    def _rows_calamine(self, path):
+        from python_calamine import CalamineWorkbook
+
+        wb = CalamineWorkbook.from_path(str(path))
+        rows = wb.get_sheet_by_index(0).to_python(skip_empty_area=False)
+        # calamineは数値を全てfloatで返すため、openpyxlと同じく整数はintに戻す
+        return ([_calamine_cell(v) for v in row] for row in rows)
+
+    def _to_frame(self, rows) -> pd.DataFrame:
+        """行を列ごとにまとめ、スキーマの型で一括変換する
+
+        lean=Trueの場合はLEAN_CHUNK_ROWS行ずつ変換して繋ぐ（変換前のセルの値を
+        全行分持たない）。カテゴリ型の列はカテゴリを合わせて繋ぐ。
+        """
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return pd.DataFrame()
+        header = _dedupe([str(c) if c is not None else "" for c in first])
+        width = len(header)
+        chunk_rows = LEAN_CHUNK_ROWS if self.lean else None
+
+        frames = []
+        while True:
+            body = [
+                tuple(r[:width]) + (None,) * (width - len(r))
+                for r in islice(rows, chunk_rows)
+            ]
+            if not body and frames:
+                break
+            columns = list(zip(*body)) if body else [()] * width
+            del body
+
+            # 変換した列から元の値を手放す
+            columns.reverse()
+            data = {}
+            for name in header:
+                data[name] = _convert(columns.pop(), self.schema.get(name), self.lean)
+            frames.append(pd.DataFrame(data))
+            if chunk_rows is None or len(frames[-1]) < chunk_rows:
+                break
+        return frames[0] if len(frames) == 1 else _concat(frames)
+
+
+def _convert(values, kind, lean=False):
+    """1列分の値をスキーマの型に変換する"""
+    if kind == "string":
+        return pd.array(
+            [None if v is None or v == "" else str(v) for v in values], dtype="string"
+        )
+    if kind == "date":
+        return pd.to_datetime(
+            pd.Series(values, dtype=object), errors="coerce", format="mixed"
+        )
+    if kind == "duration":
+        return pd.to_timedelta([_as_timedelta(v) for v in values], errors="coerce")
+    if kind == "number":
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+    if kind == "category":
+        return pd.Categorical([None if v == "" else v for v in values])
+    # スキーマに無い列はpandasの通常の推論に任せる
+    series = pd.Series(list(values))
+    if lean and pd.api.types.is_string_dtype(series.dtype):
+        if series.nunique() <= len(series) * LEAN_CATEGORY_RATIO:
+            return series.astype("category")
+    return series
+
+
+def _concat(frames) -> pd.DataFrame:
+    """チャンクごとのDataFrameを縦に繋ぐ（全チャンクがカテゴリ型の列はカテゴリ型のまま）"""
+    data = {}
+    for name in frames[0].columns:
+        parts = [df[name] for df in frames]
+        try:
+            if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+                data[name] = union_categoricals(parts, ignore_order=True)
+                continue
+        except TypeError:
+            pass
+        data[name] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(data)
+
+
+def _calamine_cell(value):
+    """整数値のfloatをintにする（pandasのcalamine読込と同じ扱い）"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _as_timedelta(value):
+    """Excelの時間表現（time / timedelta / 日数の小数）をtimedeltaに揃える"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, timedelta):
+        return value
+    if isinstance(value, datetime):
+        # 1900-01-01基準で日付付きになった経過時間
+        return value - datetime(1899, 12, 31)
+    if isinstance(value, dt_time):
+        return timedelta(hours=value.hour, minutes=value.minute, seconds=value.second)
+    if isinstance(value, (int, float)):
+        return timedelta(days=value)
+    return value
+
+
+def _dedupe(header):
+    """重複した列名はpd.read_excelと同様に「列名.1」の形式にする"""
+    seen = {}
+    result = []
+    for name in header:
+        if name in seen:
+            seen[name] += 1
+            result.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            result.append(name)
+    return result
+
+
+def _has_calamine():
+    return importlib.util.find_spec("python_calamine") is not None
@@ -0,0 +1,37 @@
+"""アグリノート「作業記録」エクスポートの列定義"""
+
+# 重複排除・差分同期のキー列
+KEY_COLUMN = "作業ID"
+# 期間判定に使う作業日の列
+DATE_COLUMN = "日付"
+
+# 列名 -> 型（string / date / duration / number / category）
+# ここに無い列は読み込んだ値をそのまま（型推論なし）で保持する
+WORK_RECORD_SCHEMA = {
+    "作業ID": "string",
+    "日付": "date",
+    "開始時刻": "string",
+    "終了時刻": "string",
+    "作業時間": "duration",
+    "作業者": "category",
+    "圃場": "category",
+    "作物": "category",
+    "品種": "category",
+    "作業名": "category",
+    "面積": "number",
+    "数量": "number",
+    "備考": "string",
+}
+
+# 作業記録の整形ルール（src/core/transform.pyのcompile_transforms参照）
+WORK_RECORD_TRANSFORMS = {
+    "日付": {"format": "%Y-%m-%d"},
+    "作業時間": {"to": "hours", "round": 2},
+    "面積": {"round": 2},
+    "数量": {},
+}
+
+# エクスポートzip内のExcel名に含まれるキーワード -> 書き込み先のワークシート名
+# PRIMARY_WORKBOOKは作業記録（上記の列定義・履歴・差分同期の対象）
+PRIMARY_WORKBOOK = "作業者"
+DEFAULT_WORKBOOKS = {PRIMARY_WORKBOOK: "作業記録"}
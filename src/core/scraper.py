@@ -1,16 +1,58 @@
+import json
 import os
+import shutil
+import time
 import zipfile
+from datetime import date, datetime
+from urllib.parse import urlparse
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from src.utils.logger import logger
-from src.utils.error import AgriNoteError, LoginError
+from src.utils.error import (
+    AgriNoteError,
+    ExportNotReadyError,
+    LoginError,
+    ScrapeError,
+)
+from src.utils.metrics import metrics
+
+DEFAULT_BASE_URL = "https://agri-note.jp"
+
+# ダウンロード・解凍先（Lambdaで書き込めるのは/tmpのみ）
+DOWNLOAD_DIR = "/tmp"
+EXTRACT_DIR = "/tmp/extracted"
+# ZIP解凍時に一度に読み込むサイズ
+CHUNK_SIZE = 1024 * 1024
+# エクスポート生成状況の確認APIのパスと、生成完了を表すstatusの値
+# （EXPORT_STATUS_PATTERNS / EXPORT_READY_STATUSESで変更できる）
+EXPORT_STATUS_PATH = "/api/export/status"
+EXPORT_READY_STATUSES = ("done",)
 
 
 class AgriNoteScraper:
-    def __init__(self, page):
+    def __init__(self, page, base_url=None):
+        """base_urlを変えるとローカルの代替サーバーなどに向けられる"""
         self.page = page
+        self.base_url = (
+            base_url or os.getenv("AGRI_NOTE_BASE_URL", DEFAULT_BASE_URL)
+        ).rstrip("/")
+        # エクスポート生成待ちの設定（秒）
+        self.export_deadline = float(os.getenv("EXPORT_DEADLINE", "120"))
+        self.export_stall_timeout = float(os.getenv("EXPORT_STALL_TIMEOUT", "45"))
+        self.export_status_patterns = tuple(
+            os.getenv("EXPORT_STATUS_PATTERNS", EXPORT_STATUS_PATH).split(",")
+        )
+        ready = os.getenv("EXPORT_READY_STATUSES", ",".join(EXPORT_READY_STATUSES))
+        self.export_ready_statuses = tuple(ready.split(","))
+        self.last_generation_seconds = None
+        self._watcher = None
+        # 生成ボタンを押す前から表示されていたダウンロードリンク（以前のエクスポート）
+        self._stale_links = []
+        # 最後に抽出したExcelのzip内CRC・サイズ（変更検知用）
+        self.last_fingerprints = {}
 
+    @metrics.timed("login")
     def login(self, user_id, password):
-        self.page.goto("https://agri-note.jp/b/login/")
+        self.page.goto(f"{self.base_url}/b/login/")
         self.page.locator('input[type="text"]').first.fill(user_id)
         self.page.locator('input[type="password"]').fill(password)
         self.page.get_by_role("button", name="ログイン").click()
@@ -29,30 +71,162 @@ class AgriNoteScraper:
                     "ログインに失敗し、予期しない画面が表示されました。"
                 )
 
-    def download_report(self):
+    def ensure_login(self, user_id, password, store=None) -> bool:
+        """保存済みセッションが有効ならログインを省略する
+
+        storeにはStateSessionStoreなど（load / save / clear）を渡す。
+        フルログインした場合はTrueを返す。
+        """
+        state = store.load() if store is not None else None
+        if state:
+            self._apply_storage_state(state)
+            if self.is_logged_in():
+                logger.info("保存済みセッションでログインを省略しました")
+                return False
+            logger.info("保存済みセッションが期限切れのため再ログインします")
+            store.clear()
+
+        self.login(user_id, password)
+        if store is not None:
+            store.save(self.page.context.storage_state())
+        return True
+
+    def is_logged_in(self) -> bool:
+        """トップページでログイン後のメニューが出るかで認証状態を確認する"""
+        self.page.goto(f"{self.base_url}/b/")
+        try:
+            self.page.wait_for_selector("#headerHamburgerMenu", timeout=5000)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    def _apply_storage_state(self, state: dict):
+        """既存コンテキストにCookieとlocalStorageを復元する"""
+        context = self.page.context
+        context.add_cookies(state.get("cookies", []))
+        for origin in state.get("origins", []):
+            items = {i["name"]: i["value"] for i in origin.get("localStorage", [])}
+            if not items:
+                continue
+            # 未設定のキーだけ復元（ページ側で更新された値は上書きしない）
+            context.add_init_script(
+                f"if (location.origin === {json.dumps(origin['origin'])}) "
+                f"for (const [k, v] of Object.entries({json.dumps(items)})) "
+                "if (localStorage.getItem(k) === null) localStorage.setItem(k, v);"
+            )
+
+    @metrics.timed("export")
+    def download_report(self, since=None, until=None, http_client=None, keywords=None):
+        """作業記録をエクスポートし、抽出したExcelのパスを返す
+
+        sinceを指定すると期間指定（since〜until、untilの既定は今日）でエクスポートする。
+        http_client（HttpExportClient）を渡すとまずブラウザ無しで取得し、
+        失敗した場合は画面操作にフォールバックする。
+        keywordsを指定するとzip内の一致するExcelをすべて抽出し、
+        {キーワード: パス}を返す。
+        """
+        if http_client is not None:
+            try:
+                return self.download_http(
+                    http_client, self.page.context.cookies(), since, until, keywords
+                )
+            except Exception as e:
+                logger.warning(f"HTTPでの取得に失敗したため画面操作で取得します: {e}")
+
+        self.request_export(since, until)
+        return self.fetch_export(keywords=keywords)
+
+    def download_http(
+        self, http_client, cookies, since=None, until=None, keywords=None
+    ):
+        """Cookieを使ってHTTPのみでエクスポートを取得し、抽出したExcelのパスを返す
+
+        ページを使わないため、保存済みセッションのCookieがあればブラウザ無しで呼べる。
+        """
+        zip_path = http_client.download(cookies, DOWNLOAD_DIR, since, until)
+        try:
+            return self._extract(zip_path, keywords)
+        finally:
+            os.remove(zip_path)
+
+    def request_export(self, since=None, until=None) -> dict:
+        """エクスポート画面で生成ボタンを押すところまで行い、エクスポートの参照情報を返す
+
+        生成完了を待たずに返るので、ダウンロードは同じ実行内のfetch_export、
+        または後続の実行でのfetch_exportで行う。
+        """
+
         def handle_dialog(dialog):
             logger.info(f"標準アラート出現: {dialog.message}")
             dialog.accept()  # OKボタンを押下
 
+        until = until or date.today()
+
         # 1. ページ移動
-        self.page.goto("https://agri-note.jp/b/export.html#/top")
+        self.page.goto(f"{self.base_url}/b/export.html#/top")
 
         # 2. 「作業記録」を選択
         self.page.locator("li").get_by_text("作業記録").click()
 
         # 3. 期間指定とエクセル形式を選択
-        self.page.get_by_label("全期間").check()
+        if since is None:
+            self.page.get_by_label("全期間").check()
+        else:
+            self._select_period(since, until)
         self.page.get_by_label("Excel").check()
 
         # 4. ページに対してリスナーをセット
         self.page.on("dialog", handle_dialog)
 
-        # 5. 生成ボタンを押下
+        # 以前の生成物のリンクを覚えておき、今回の生成物と取り違えないようにする
+        self._stale_links = self._download_hrefs()
+
+        # 5. 生成ボタンを押下（押下前から生成状況の通信を監視）
+        self._watcher = ExportWatcher(
+            self.page,
+            deadline=self.export_deadline,
+            stall_timeout=self.export_stall_timeout,
+            patterns=self.export_status_patterns,
+            ready_statuses=self.export_ready_statuses,
+        )
+        self._watcher.start()
         self.page.get_by_role("button", name="生成").click()
 
-        # 6. ダウンロードリンクが出現するのを待つ
-        download_link = self.page.get_by_role("link", name="ダウンロード")
-        download_link.wait_for(state="visible", timeout=120000)
+        return {
+            "requested_at": datetime.now().isoformat(timespec="seconds"),
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat(),
+            "stale_links": self._stale_links,
+        }
+
+    def fetch_export(self, deadline=None, keywords=None, pending=None):
+        """生成済みのエクスポートをダウンロードし、抽出したExcelのパスを返す
+
+        request_exportを同じページで呼んでいない場合（後続の実行で再開する場合）は
+        エクスポート画面を開き直し、生成済みのダウンロードリンクを待つ。
+        生成ボタンを押す前から表示されていたリンク（pendingのstale_links、
+        同じ実行ではrequest_exportで記録したもの）は以前の生成物なので対象にしない。
+        deadline内にリンクが出なければExportNotReadyErrorを送出する。
+        keywordsの扱いはdownload_reportと同じ。
+        """
+        stale = pending.get("stale_links", []) if pending else self._stale_links
+        watcher = self._watcher
+        if watcher is None:
+            self.page.goto(f"{self.base_url}/b/export.html#/top")
+            self.page.locator("li").get_by_text("作業記録").click()
+            watcher = ExportWatcher(
+                self.page,
+                deadline=self.export_deadline if deadline is None else deadline,
+                stall_timeout=self.export_stall_timeout,
+                patterns=self.export_status_patterns,
+                ready_statuses=self.export_ready_statuses,
+            )
+            watcher.start()
+        self._watcher = None
+
+        # 6. 今回の生成物のダウンロードリンクが出現するのを待つ
+        download_link = self._download_link(stale)
+        self.last_generation_seconds = watcher.wait(download_link)
 
         # 7. ファイルのダウンロードを実行
         with self.page.expect_download(timeout=120000) as download_info:
@@ -61,36 +235,104 @@ class AgriNoteScraper:
         download = download_info.value
 
         # 8. zip保存先
-        download_path = os.path.join("/tmp", download.suggested_filename)
+        download_path = os.path.join(DOWNLOAD_DIR, download.suggested_filename)
         download.save_as(download_path)
 
-        return self._extract_excel(download_path, target_keyword="作業者")
+        try:
+            return self._extract(download_path, keywords)
+        finally:
+            # 解凍後のzipは不要なので即削除（ウォームコンテナに溜めない）
+            os.remove(download_path)
+
+    def _download_hrefs(self) -> list:
+        """表示中のダウンロードリンクのhref"""
+        hrefs = self.page.get_by_role("link", name="ダウンロード").evaluate_all(
+            "links => links.map(a => a.getAttribute('href'))"
+        )
+        return [str(h) for h in hrefs if h]
+
+    def _download_link(self, stale):
+        """staleのhrefを除いたダウンロードリンク"""
+        if not stale:
+            return self.page.get_by_role("link", name="ダウンロード")
+        excluded = "".join(
+            f":not([href={json.dumps(h, ensure_ascii=False)}])" for h in stale
+        )
+        return self.page.locator(f'a{excluded}:has-text("ダウンロード")').first
+
+    def _select_period(self, since: date, until: date):
+        """エクスポート画面で期間（開始日〜終了日）を指定する"""
+        self.page.get_by_label("期間指定").check()
+        date_inputs = self.page.locator('input[type="date"]')
+        date_inputs.nth(0).fill(since.isoformat())
+        date_inputs.nth(1).fill(until.isoformat())
+        logger.info(f"エクスポート期間: {since} 〜 {until}")
 
     def _extract_excel(self, zip_path: str, target_keyword: str) -> str:
         """ZIPを解凍して特定のエクセルを抽出"""
+        return self._extract_workbooks(zip_path, (target_keyword,))[target_keyword]
+
+    def _extract_workbooks(self, zip_path: str, keywords) -> dict:
+        """ZIPを解凍し、キーワードごとに最初に一致したエクセルを抽出する
+
+        {キーワード: 抽出したパス}を返す。一致しないキーワードは警告のみで除外し、
+        1つも一致しない場合はAgriNoteErrorを送出する。
+        """
         # 解凍先
-        extract_dir = "/tmp/extracted"
+        extract_dir = EXTRACT_DIR
         os.makedirs(extract_dir, exist_ok=True)
 
-        # ファイル名指定
-        target_keyword = "作業者"
-
+        found = {}
+        self.last_fingerprints = {}
         # 7. Zipを開いて中身をチェック
-        with zipfile.ZipFile(zip_path, "r") as z:
+        with metrics.stage("extract") as m, zipfile.ZipFile(zip_path, "r") as z:
+            m.put("ZipBytes", os.path.getsize(zip_path), "Bytes")
+            xlsx_bytes = 0
             # Excelファイル（.xlsx）を探して抽出
             for file_info in z.infolist():
                 # 文字化けを直して名前を確認
                 filename = self._fix_encoding(file_info.filename)
+                if not filename.endswith(".xlsx"):
+                    continue
 
-                if target_keyword in filename and filename.endswith(".xlsx"):
-                    excel_path = os.path.join(extract_dir, filename)
-                    with z.open(file_info) as src, open(excel_path, "wb") as dst:
-                        dst.write(src.read())
+                keyword = next(
+                    (k for k in keywords if k in filename and k not in found), None
+                )
+                if keyword is None:
+                    continue
+                excel_path = os.path.join(extract_dir, filename)
+                # メモリに全体を載せないようチャンク単位でコピー
+                with z.open(file_info) as src, open(excel_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+                xlsx_bytes += file_info.file_size
+                found[keyword] = excel_path
+                self.last_fingerprints[keyword] = (
+                    f"{file_info.CRC:08x}-{file_info.file_size}"
+                )
+                if len(found) == len(keywords):
+                    break
+            m.put("XlsxBytes", xlsx_bytes, "Bytes")
+            m.put("Workbooks", len(found))
 
-                    return excel_path  # Excelが見つかったらそのパスを返す
-        raise AgriNoteError(
-            f"ZIP内にキーワード'{target_keyword}'を含むExcelがみつかりませんでした"
-        )
+        if not found:
+            names = "', '".join(keywords)
+            raise AgriNoteError(
+                f"ZIP内にキーワード'{names}'を含むExcelがみつかりませんでした"
+            )
+        missing = [k for k in keywords if k not in found]
+        if missing:
+            logger.warning(f"ZIP内に見つからなかったキーワード: {missing}")
+        return found
+
+    def _extract(self, zip_path: str, keywords):
+        """keywordsを指定した場合は複数抽出（dict）、省略時は作業記録のみ（パス）"""
+        if keywords is None:
+            return self._extract_excel(zip_path, target_keyword="作業者")
+        return self._extract_workbooks(zip_path, keywords)
+
+    def cleanup(self):
+        """解凍したExcelを削除する（ウォームコンテナで/tmpを圧迫しないように）"""
+        shutil.rmtree(EXTRACT_DIR, ignore_errors=True)
 
     def _fix_encoding(self, raw_name):
         try:
@@ -98,3 +340,110 @@ class AgriNoteScraper:
         except (UnicodeDecodeError, UnicodeEncodeError):
             # テスト時やUTF-8で保存されている場合はそのまま返す
             return raw_name
+
+
+class ExportWatcher:
+    """エクスポート生成中のSPAの状況確認の通信を監視し、生成完了を待つ
+
+    - URLのパスにpatternsを含むレスポンスのうち、JSONの"status"を持つものを状況確認とみなし、
+      statusがready_statusesのいずれかになったら完了としてダウンロードリンクを待つ
+      （状況確認が取れない画面でも、リンクが表示されれば完了とする）
+    - リンクの確認は短い待機を繰り返し、待機時間は徐々に延ばす（最大max_interval）
+    - 状況確認を2回以上観測した後、stall_timeout秒途絶えたら停止とみなす
+      （生成依頼や画像などが1回patternsに一致しただけでは停止判定をしない）
+    - 全体でdeadline秒を超えたら打ち切る
+    """
+
+    def __init__(
+        self,
+        page,
+        deadline=120.0,
+        stall_timeout=45.0,
+        patterns=(EXPORT_STATUS_PATH,),
+        initial_interval=0.5,
+        max_interval=5.0,
+        ready_statuses=EXPORT_READY_STATUSES,
+    ):
+        self.page = page
+        self.deadline = deadline
+        self.stall_timeout = stall_timeout
+        self.patterns = patterns
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.ready_statuses = ready_statuses
+        self.started_at = None
+        self.last_activity = None
+        # patternsに一致したレスポンス数と、そのうち状況確認（statusを持つJSON）の数
+        self.status_responses = 0
+        self.status_polls = 0
+        self.ready = False
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        # ページ自体や静的ファイル・解析タグに一致しないよう、パスだけを見る
+        path = urlparse(response.url).path
+        if not any(p in path for p in self.patterns):
+            return
+        self.status_responses += 1
+        # zipや画像などの本文は読まない
+        if "json" not in response.headers.get("content-type", ""):
+            return
+        try:
+            body = response.json()
+        except Exception:
+            return
+        if not isinstance(body, dict) or "status" not in body:
+            return
+        self.status_polls += 1
+        self.last_activity = time.monotonic()
+        if body["status"] in self.ready_statuses:
+            self.ready = True
+
+    def wait(self, link) -> float:
+        """生成が完了してリンクが表示されるまで待ち、生成にかかった秒数を返す"""
+        interval = self.initial_interval
+        try:
+            with metrics.stage("generation") as m:
+                while True:
+                    # 状況確認で完了が分かったら、リンクの表示は期限まで待つ
+                    timeout = interval
+                    if self.ready:
+                        timeout = max(
+                            self.deadline - (time.monotonic() - self.started_at),
+                            interval,
+                        )
+                    try:
+                        link.wait_for(state="visible", timeout=timeout * 1000)
+                        break
+                    except PlaywrightTimeoutError:
+                        pass
+
+                    now = time.monotonic()
+                    elapsed = now - self.started_at
+                    if elapsed > self.deadline:
+                        raise ExportNotReadyError(
+                            f"エクスポート生成が{self.deadline:.0f}秒以内に完了しませんでした"
+                        )
+                    if (
+                        not self.ready
+                        and self.status_polls >= 2
+                        and now - self.last_activity > self.stall_timeout
+                    ):
+                        raise ScrapeError(
+                            f"エクスポート生成の通信が{self.stall_timeout:.0f}秒途絶えました"
+                        )
+                    interval = min(interval * 1.5, self.max_interval)
+
+                seconds = time.monotonic() - self.started_at
+                m.put("StatusResponses", self.status_responses)
+                m.put("StatusPolls", self.status_polls)
+        finally:
+            self.page.remove_listener("response", self._on_response)
+
+        logger.info(
+            f"エクスポート生成完了: {seconds:.1f}秒（状況確認{self.status_responses}回）"
+        )
+        return seconds
@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import json
+import os
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from src.utils.logger import logger
+
+DEFAULT_SESSION_PATH = "/tmp/agrinote/session.bin"
+# 状態ストアに保存する場合のキー
+SESSION_KEY = "session.bin"
+
+
+class LocalSessionStore:
+    """ログイン済みコンテキストのstorage_state（Cookie・localStorage）を暗号化して保存する
+
+    load / save / clear を持つオブジェクトであれば他の保存先に差し替えられる。
+    鍵はSESSION_SECRET（未設定ならAGRI_NOTE_PASS）から作る。どちらも無ければ保存しない。
+    """
+
+    def __init__(self, path=None, secret=None):
+        self.path = path or os.getenv("SESSION_PATH", DEFAULT_SESSION_PATH)
+        self._fernet = _fernet(secret)
+
+    def load(self):
+        """保存済みのstorage_stateを返す（無い・復号できない場合はNone）"""
+        if self._fernet is None or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                return json.loads(self._fernet.decrypt(f.read()))
+        except (InvalidToken, ValueError) as e:
+            logger.warning(f"保存済みセッションを読めませんでした: {e}")
+            self.clear()
+            return None
+
+    def save(self, state: dict):
+        if self._fernet is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._fernet.encrypt(json.dumps(state).encode()))
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class StateSessionStore:
+    """storage_stateを暗号化して状態ストア（make_state_store）に保存する
+
+    STATE_BUCKETを設定していれば別のLambdaコンテナ（phase="download"の実行など）とも
+    同じセッションを使う。鍵の扱いはLocalSessionStoreと同じ。
+    """
+
+    def __init__(self, state, key=SESSION_KEY, secret=None):
+        self.state = state
+        self.key = key
+        self._fernet = _fernet(secret)
+
+    def load(self):
+        """保存済みのstorage_stateを返す（無い・復号できない場合はNone）"""
+        if self._fernet is None:
+            return None
+        token = self.state.get_bytes(self.key)
+        if token is None:
+            return None
+        try:
+            return json.loads(self._fernet.decrypt(token))
+        except (InvalidToken, ValueError) as e:
+            logger.warning(f"保存済みセッションを読めませんでした: {e}")
+            self.clear()
+            return None
+
+    def save(self, state: dict):
+        if self._fernet is None:
+            return
+        self.state.set_bytes(self.key, self._fernet.encrypt(json.dumps(state).encode()))
+
+    def clear(self):
+        self.state.delete_bytes(self.key)
+
+
+def _fernet(secret=None):
+    """SESSION_SECRET（未設定ならAGRI_NOTE_PASS）から暗号化の鍵を作る（無ければNone）"""
+    secret = secret or os.getenv("SESSION_SECRET") or os.getenv("AGRI_NOTE_PASS")
+    if not secret:
+        return None
+    key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest())
+    return Fernet(key)
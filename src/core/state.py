@@ -0,0 +1,117 @@
+import json
+import os
+
+from src.utils.logger import logger
+
+DEFAULT_STATE_PATH = "/tmp/agrinote/state.json"
+
+
+class LocalStateStore:
+    """実行をまたいで引き継ぐ小さな状態（JSON）をローカルファイルに保存する
+
+    get / set / delete を持つオブジェクトであれば他の保存先に差し替えられる。
+    履歴スナップショットなどJSONにしない大きな値は get_bytes / set_bytes で
+    状態ファイルと同じディレクトリのファイル（keyがファイル名）に保存する。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("STATE_PATH", DEFAULT_STATE_PATH)
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError as e:
+            logger.warning(f"状態ファイルを読めませんでした: {e}")
+            return {}
+
+    def get(self, key, default=None):
+        return self._load().get(key, default)
+
+    def set(self, key, value):
+        data = self._load()
+        data[key] = value
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def delete(self, key):
+        data = self._load()
+        if key in data:
+            del data[key]
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+
+    def get_bytes(self, key):
+        path = os.path.join(os.path.dirname(self.path), key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def set_bytes(self, key, data: bytes):
+        path = os.path.join(os.path.dirname(self.path), key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+
+    def delete_bytes(self, key):
+        path = os.path.join(os.path.dirname(self.path), key)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class S3StateStore:
+    """別のLambdaコンテナとも状態を共有するためのS3保存先（キーごとに1オブジェクト）"""
+
+    def __init__(self, bucket, prefix="agrinote-state/"):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3")
+
+    def get(self, key, default=None):
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.NoSuchKey:
+            return default
+        return json.loads(obj["Body"].read())
+
+    def set(self, key, value):
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            Body=json.dumps(value, ensure_ascii=False).encode("utf-8"),
+        )
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def get_bytes(self, key):
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return obj["Body"].read()
+
+    def set_bytes(self, key, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def delete_bytes(self, key):
+        self.delete(key)
+
+
+def make_state_store():
+    """STATE_BUCKETが設定されていればS3、無ければローカルファイルを使う"""
+    bucket = os.getenv("STATE_BUCKET")
+    if bucket:
+        return S3StateStore(bucket)
+    return LocalStateStore()
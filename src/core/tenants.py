@@ -0,0 +1,82 @@
+import json
+import os
+
+from src.utils.error import AgriNoteError
+
+# ブラウザ本体とPython側（pandas等）の常駐分、コンテキスト1つあたりの目安（MB）
+DEFAULT_BASE_MEMORY_MB = 600
+DEFAULT_CONTEXT_MEMORY_MB = 250
+
+REQUIRED_KEYS = ("user_id", "password", "spreadsheet_id")
+
+
+def load_tenants(value=None) -> list:
+    """複数アカウントのジョブ定義を読み込む
+
+    valueはリスト、JSON文字列のいずれか。省略時は環境変数TENANTS（JSON）を使う。
+    各要素は{"name", "user_id", "password", "spreadsheet_id"}で、nameの既定はuser_id。
+    passwordの代わりにpassword_env（パスワードを持つ環境変数名）も指定できる。
+    """
+    if value is None:
+        value = os.getenv("TENANTS", "")
+    if isinstance(value, str):
+        if not value.strip():
+            return []
+        try:
+            value = json.loads(value)
+        except ValueError as e:
+            raise AgriNoteError(f"TENANTSの形式が不正です: {e}")
+
+    tenants = []
+    for i, item in enumerate(value):
+        tenant = dict(item)
+        if "password" not in tenant and tenant.get("password_env"):
+            tenant["password"] = os.getenv(tenant["password_env"])
+        missing = [k for k in REQUIRED_KEYS if not tenant.get(k)]
+        if missing:
+            raise AgriNoteError(f"{i + 1}件目のアカウント設定に{missing}がありません")
+        tenant.setdefault("name", tenant["user_id"])
+        tenants.append(tenant)
+
+    names = [t["name"] for t in tenants]
+    if len(set(names)) != len(names):
+        raise AgriNoteError(f"アカウント名が重複しています: {names}")
+    return tenants
+
+
+def context_slots(memory_mb=None) -> int:
+    """メモリ量から同時に開けるブラウザコンテキスト数を決める
+
+    memory_mbの既定はLambdaの割り当て（AWS_LAMBDA_FUNCTION_MEMORY_SIZE）。
+    MAX_CONTEXTSが指定されていればそれを上限にする。
+    """
+    if memory_mb is None:
+        memory_mb = int(os.getenv("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "2048"))
+    base = int(os.getenv("BASE_MEMORY_MB", DEFAULT_BASE_MEMORY_MB))
+    per_context = int(os.getenv("CONTEXT_MEMORY_MB", DEFAULT_CONTEXT_MEMORY_MB))
+
+    slots = max(1, (memory_mb - base) // per_context)
+    limit = os.getenv("MAX_CONTEXTS")
+    if limit:
+        slots = min(slots, max(1, int(limit)))
+    return slots
+
+
+def tenant_key(tenant: dict, filename: str) -> str:
+    """アカウントごとのセッション・履歴の状態ストアでのキー"""
+    return f"tenants/{tenant['name']}/{filename}"
+
+
+def summarize(report: list) -> str:
+    """アカウントごとの結果をSlack向けの1通にまとめる"""
+    ok = sum(1 for r in report if r["status"] == "completed")
+    lines = [f"アグリノート同期結果（成功 {ok}/{len(report)}）"]
+    for r in report:
+        if r["status"] == "completed" and r.get("noop"):
+            lines.append(f"✅ {r['name']}: 変更なし")
+        elif r["status"] == "completed":
+            sheets = "、".join(f"{s} {n}行" for s, n in r.get("sheets", {}).items())
+            lines.append(f"✅ {r['name']}: {sheets}")
+        else:
+            lines.append(f"❌ {r['name']}: {r.get('error', r['status'])}")
+    return "\n".join(lines)
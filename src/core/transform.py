@@ -0,0 +1,105 @@
+"""列定義から組み立てるベクトル化された変換パイプライン"""
+
+import pandas as pd
+
+from src.core.schema import WORK_RECORD_SCHEMA
+
+# 作業時間などのtimedeltaを時間（小数）に変換する既定の丸め桁数
+DEFAULT_HOURS_DECIMALS = 2
+
+
+class TransformPipeline:
+    """compile_transformsで作る変換手順
+
+    同じ種類の変換を列のまとまり（ブロック）ごとに一括で適用する。
+    ルールに無いtimedelta列は従来通り時間（小数2桁）に変換する。
+    """
+
+    def __init__(self, drop, hours, dates, numbers, renames):
+        self.drop = drop
+        # {丸め桁数: [列名, ...]}
+        self.hours = hours
+        # {書式: [列名, ...]}
+        self.dates = dates
+        # {丸め桁数: [列名, ...]}
+        self.numbers = numbers
+        self.renames = renames
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.dropna(how="all")
+        df = df.drop(columns=[c for c in self.drop if c in df.columns])
+
+        # ルールに無いtimedelta列を既定のhours変換に加える
+        hours = {k: list(v) for k, v in self.hours.items()}
+        ruled = {c for cols in self.hours.values() for c in cols}
+        extra = [c for c in df.select_dtypes("timedelta").columns if c not in ruled]
+        hours.setdefault(DEFAULT_HOURS_DECIMALS, []).extend(extra)
+
+        updates = {}
+        for decimals, cols in hours.items():
+            block = _block(df, cols, "timedelta", pd.to_timedelta)
+            if block is not None:
+                updates.update((block / pd.Timedelta(hours=1)).round(decimals))
+        for fmt, cols in self.dates.items():
+            block = _block(df, cols, "datetime", pd.to_datetime, format="mixed")
+            if block is not None:
+                updates.update(block.apply(lambda s: s.dt.strftime(fmt)))
+        for decimals, cols in self.numbers.items():
+            block = _block(df, cols, "number", pd.to_numeric)
+            if block is not None:
+                updates.update(block if decimals is None else block.round(decimals))
+
+        if updates:
+            df = df.assign(**updates)
+        if self.renames:
+            df = df.rename(columns=self.renames)
+        return df
+
+
+def compile_transforms(rules: dict, types: dict = None) -> TransformPipeline:
+    """列ごとのルールを変換パイプラインに変換する
+
+    rules: {列名: {"type", "to", "round", "format", "rename", "drop"}}
+        - type: 省略時はtypes（既定はWORK_RECORD_SCHEMA）の型
+        - duration: to="hours"で時間（小数）に変換、roundで丸め
+        - date: formatの書式で文字列化
+        - number: roundで丸め
+        - rename: 出力時の列名、drop: Trueで列を削除
+    """
+    types = WORK_RECORD_SCHEMA if types is None else types
+    drop, renames = [], {}
+    hours, dates, numbers = {}, {}, {}
+
+    for col, rule in rules.items():
+        if rule.get("drop"):
+            drop.append(col)
+            continue
+        if rule.get("rename"):
+            renames[col] = rule["rename"]
+
+        kind = rule.get("type", types.get(col))
+        if kind == "duration" and rule.get("to", "hours") == "hours":
+            decimals = rule.get("round", DEFAULT_HOURS_DECIMALS)
+            hours.setdefault(decimals, []).append(col)
+        elif kind == "date" and rule.get("format"):
+            dates.setdefault(rule["format"], []).append(col)
+        elif kind == "number":
+            numbers.setdefault(rule.get("round"), []).append(col)
+        elif kind is None:
+            raise ValueError(f"列'{col}'の型が決められません")
+
+    return TransformPipeline(drop, hours, dates, numbers, renames)
+
+
+def _block(df, cols, dtype, convert, **kwargs):
+    """対象列をまとめて取り出し、型が違う列だけ変換する（列が無ければNone）"""
+    cols = [c for c in cols if c in df.columns]
+    if not cols:
+        return None
+    block = df[cols]
+    wrong = block.columns.difference(block.select_dtypes(dtype).columns)
+    if len(wrong):
+        block = block.copy()
+        for col in wrong:
+            block[col] = convert(block[col], errors="coerce", **kwargs)
+    return block
@@ -1,46 +1,208 @@
 import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
 
 from dotenv import load_dotenv
 import gspread
+from gspread.utils import rowcol_to_a1
 import pandas as pd
 
+from src.core.fingerprint import content_fingerprint
+from src.core.formatter import AgriNoteFormatter, is_sheets_clean
+from src.core.schema import DATE_COLUMN, KEY_COLUMN
 from src.utils.logger import logger
 from src.utils.error import WriteError
+from src.utils.metrics import metrics
 
 # .envファイルから環境変数を読み込む
 load_dotenv()
 
+WORKSHEET_NAME = "作業記録"
+# 列単位の読込で1回に取得する行数
+READ_CHUNK_ROWS = 20000
+# 書込1リクエストあたりのセル数の上限と同時リクエスト数（環境変数で変更可）
+WRITE_BATCH_CELLS = 50000
+WRITE_CONCURRENCY = 2
+# 再試行するステータス（クォータ超過・サーバーエラー）と回数、初回の待ち秒数
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+RETRY_BASE_SECONDS = 1.0
+# ステージング用シート名の接尾辞
+STAGING_SUFFIX = "__staging"
+# 分割書込の目次シート名の接尾辞・列、日付の無い行の分割先
+INDEX_SUFFIX = "_index"
+INDEX_COLUMNS = ["シート", "期間", "行数", "指紋", "更新日時"]
+UNDATED_PARTITION = "日付なし"
+# PARTITION_BYに指定できる値（""は分割しない）
+PARTITION_MODES = ("", "year")
+
+# 接続済みスプレッドシート・ワークシート（ウォームコンテナ間で再利用）
+_spreadsheets = {}
+_worksheets = {}
+_connect_lock = threading.Lock()
+
 
 class SpreadSheetWriter:
-    def __init__(self):
-        self.spreadsheet_id = os.getenv("SPREADSHEET_ID")
+    def __init__(self, worksheet_name=WORKSHEET_NAME, spreadsheet_id=None):
+        """worksheet_nameで書き込み先のシートを変えられる（既定は「作業記録」）
+
+        spreadsheet_idの既定は環境変数SPREADSHEET_ID（複数アカウント時は個別に指定）。
+        """
+        self.spreadsheet_id = spreadsheet_id or os.getenv("SPREADSHEET_ID")
         self.sa_json = os.getenv("SERVICE_ACCOUNT_JSON")
         if not self.spreadsheet_id or not self.sa_json:
             raise WriteError("環境変数の取得に失敗しました")
 
+        self.worksheet_name = worksheet_name
         self._ws = None
+        # 書込の設定（WRITE_STAGING=0でステージングを使わず直接書き込む）
+        self.staging = os.getenv("WRITE_STAGING", "1") != "0"
+        self.batch_cells = int(os.getenv("WRITE_BATCH_CELLS", WRITE_BATCH_CELLS))
+        self.concurrency = int(os.getenv("WRITE_CONCURRENCY", WRITE_CONCURRENCY))
+        # 直近のwrite_allで再試行した回数（並行する書込スレッドから数える）
+        self.retries = 0
+        self._retries_lock = threading.Lock()
+        # 年（作期）ごとのシートに分けて書き込む場合は"year"
+        # SEASON_START_MONTHを指定するとその月から始まる1年（作期）で分ける
+        self.partition_by = os.getenv("PARTITION_BY", "")
+        if self.partition_by not in PARTITION_MODES:
+            raise WriteError(
+                f"PARTITION_BYが不正です: {self.partition_by!r}（指定できるのはyearのみ）"
+            )
+        self.season_start = int(os.getenv("SEASON_START_MONTH", "1"))
 
     def _get_worksheet(self):
-        """必要になった時だけ接続、2回目はキャッシュを返す"""
+        """必要になった時だけ接続、2回目はキャッシュを返す
+
+        接続済みのワークシートはモジュールに保持し、ウォームコンテナの次回実行でも使い回す。
+        同じスプレッドシートの別シートは認証済みの接続を共有し、無ければ作成する。
+        """
         if self._ws is not None:
             return self._ws
 
+        cache_key = (self.spreadsheet_id, self.worksheet_name)
+        with _connect_lock:
+            if cache_key in _worksheets:
+                self._ws = _worksheets[cache_key]
+                return self._ws
+            try:
+                # 1回目だけの処理
+                sh = _spreadsheets.get(self.spreadsheet_id)
+                if sh is None:
+                    gc = gspread.service_account_from_dict(json.loads(self.sa_json))
+                    sh = gc.open_by_key(self.spreadsheet_id)
+                    _spreadsheets[self.spreadsheet_id] = sh
+                try:
+                    self._ws = sh.worksheet(self.worksheet_name)
+                except gspread.exceptions.WorksheetNotFound:
+                    logger.info(f"ワークシート「{self.worksheet_name}」を作成します")
+                    self._ws = sh.add_worksheet(self.worksheet_name, rows=1, cols=1)
+                _worksheets[cache_key] = self._ws
+
+                return self._ws
+            except Exception as e:
+                raise WriteError(f"GoogleSpreadsheetへの接続に失敗しました: {e}")
+
+    def connect(self):
+        """認証とシート情報の取得を先に済ませる（スクレイピングと並行して呼ぶ用）"""
+        self._get_worksheet()
+        return self
+
+    def read_values(self) -> list:
+        """シートの全セルを文字列のリストで取得する（差分同期用）"""
+        ws = self._get_worksheet()
         try:
-            # 1回目だけの処理
-            gc = gspread.service_account_from_dict(json.loads(self.sa_json))
-            sh = gc.open_by_key(self.spreadsheet_id)
-            # シート名は「作業記録」
-            self.ws = sh.worksheet("作業記録")
+            return ws.get_all_values()
+        except Exception as e:
+            raise WriteError(f"差分同期用の読込に失敗しました: {e}")
+
+    def read_columns(self, columns=None, chunk_rows=READ_CHUNK_ROWS) -> pd.DataFrame:
+        """シートの値を列単位で取得し、文字列型（string）のDataFrameで返す
 
-            return self.ws
+        get_all_recordsのような行ごとのdict化・数値の推定をせず、列のリストから直接組み立てる。
+        columnsを指定するとその列（キー列・ハッシュ列など）だけを取得する。
+        ヘッダー行を取得した後、chunk_rows行ずつ1回のbatch_getで取得する。空のセルは""になる。
+        選んだ列が空の行も数えるため、行数はキー列（指定が無くても一緒に取得する）で測り、
+        それが短くなったら終了する。キー列が無いシートではシートの行数まで読む。
+        """
+        ws = self._get_worksheet()
+        try:
+            header = ws.row_values(1)
+            if columns is None:
+                picked = list(range(len(header)))
+            else:
+                missing = [c for c in columns if c not in header]
+                if missing:
+                    raise WriteError(f"シートに列がありません: {missing}")
+                picked = sorted(header.index(c) for c in columns)
+            anchor = header.index(KEY_COLUMN) if KEY_COLUMN in header else None
+            fetched = sorted(set(picked) | ({anchor} if anchor is not None else set()))
+            runs = _runs(fetched)
+            data = [[] for _ in fetched]
+
+            start = 2
+            while runs:
+                end = start + chunk_rows - 1
+                ranges = [
+                    f"{rowcol_to_a1(start, lo + 1)}:{rowcol_to_a1(end, hi + 1)}"
+                    for lo, hi in runs
+                ]
+                blocks = ws.batch_get(ranges, major_dimension="COLUMNS")
+                # 末尾が空の列・セルは返らないので、列数・行数を揃える
+                cols = []
+                for (lo, hi), block in zip(runs, blocks):
+                    cols.extend(list(block) + [[]] * (hi - lo + 1 - len(block)))
+                height = max((len(col) for col in cols), default=0)
+                last = height < chunk_rows and (
+                    anchor is not None or end >= ws.row_count
+                )
+                if not last:
+                    # 選んだ列がこの範囲で空でも、次の範囲と行がずれないよう揃える
+                    height = chunk_rows
+                for values, col in zip(data, cols):
+                    values.extend(col)
+                    values.extend([""] * (height - len(col)))
+                if last:
+                    break
+                start = end + 1
+            if anchor is None:
+                # シートの行数まで揃えた末尾の空行は除く
+                rows = len(data[0]) if data else 0
+                while rows and not any(values[rows - 1] for values in data):
+                    rows -= 1
+                data = [values[:rows] for values in data]
+        except WriteError:
+            raise
         except Exception as e:
-            raise WriteError(f"GoogleSpreadsheetへの接続に失敗しました: {e}")
+            raise WriteError(f"列単位の読込に失敗しました: {e}")
+
+        data = dict(zip(fetched, data))
+        df = pd.DataFrame(
+            {i: pd.array(data[c], dtype="string") for i, c in enumerate(picked)}
+        )
+        df.columns = [header[i] for i in picked]
+        return df
 
-    def read_all(self) -> pd.DataFrame:
+    def read_all(self, mode=None, columns=None) -> pd.DataFrame:
         """キャッシュされたワークシートを使う"""
+        if self.partition_by:
+            return self._read_partitions(mode, columns)
         ws = self._get_worksheet()
-        """既存スプレッドシートをDataFrameとして読み込む"""
+        """既存スプレッドシートをDataFrameとして読み込む
+
+        mode（既定は環境変数READ_MODE、未設定なら"records"）が"columnar"の場合は
+        read_columnsで列単位に読む（値はすべて文字列、columnsで列を絞れる）。
+        """
+        if (mode or os.getenv("READ_MODE", "records")) == "columnar":
+            try:
+                return self.read_columns(columns)
+            except Exception as e:
+                logger.error(f"読込に失敗しました: {e}")
+                return pd.DataFrame()
         try:
             logger.info("スプレッドシートからデータ取得中...")
             data = ws.get_all_records()
@@ -52,19 +214,402 @@ class SpreadSheetWriter:
     def write_all(self, df: pd.DataFrame):
         """キャッシュされたワークシートを使う"""
         ws = self._get_worksheet()
-        """シートを空にしてDataFrameの内容を書き込む"""
-        try:
-            logger.info(f"スプレッドシートを更新中...（{len(df)}行）")
+        """シートの内容をDataFrameで置き換える
 
-            # 1. シートをクリア
-            ws.clear()
+        既定（WRITE_STAGING=1）では非表示のステージング用シートに分割して書き込み、
+        書き終わってから1回のbatchUpdateで本番シートに反映する（途中で失敗しても
+        本番シートは前回の内容のまま）。WRITE_STAGING=0ではシートを空にして直接書き込む。
+        """
+        try:
+            with metrics.stage("write") as m:
+                logger.info(f"スプレッドシートを更新中...（{len(df)}行）")
+                self.retries = 0
 
-            # 2. DataFrameを作成
-            df = df.map(lambda x: "" if pd.isna(x) else str(x))
-            values = [df.columns.values.tolist()] + df.values.tolist()
+                # 1. DataFrameを作成（clean_for_sheets済みなら変換不要）
+                df = _clean(df)
 
-            # 2. 一括アップデート
-            ws.update(values)
-            logger.info("書込が完了しました")
+                # 2. 書込（値のリストはリクエスト単位で作る）
+                if self.staging:
+                    batches = self._write_staged(ws, df)
+                else:
+                    self._call(ws.clear)
+                    batches = self._send_batches(ws, df)
+                m.put("Rows", len(df))
+                m.put("CellsWritten", (len(df) + 1) * len(df.columns))
+                m.put("Batches", batches)
+                m.put("Retries", self.retries)
+                logger.info("書込が完了しました")
         except Exception as e:
             raise WriteError(f"書込に失敗しました: {e}")
+
+    def _send_batches(self, ws, df) -> int:
+        """セル数の上限ごとに分けて書き込み、送ったリクエスト数を返す
+
+        1回で収まる場合はupdate、それ以外はbatch_updateを同時WRITE_CONCURRENCY件まで送る。
+        値のリストは送る直前に作り、送信待ちは同時数までに抑える（全行のリストを持たない）。
+        """
+        rows = max(1, self.batch_cells // max(len(df.columns), 1))
+        chunks = _row_chunks(df, rows)
+        if len(df) + 1 <= rows:
+            self._call(ws.update, next(chunks)[1])
+            return 1
+
+        batches = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending = set()
+            for start, values in chunks:
+                if len(pending) >= self.concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                batch = [{"range": f"A{start}", "values": values}]
+                pending.add(pool.submit(self._call, ws.batch_update, batch))
+                batches += 1
+            for future in pending:
+                future.result()
+        return batches
+
+    def _write_staged(self, ws, df) -> int:
+        """ステージング用シートに書き込んでから本番シートに一括で反映する"""
+        sh = ws.spreadsheet
+        staging = self._get_staging(sh)
+        rows, cols = len(df) + 1, max(len(df.columns), 1)
+
+        self._call(staging.clear)
+        self._call(staging.resize, rows=rows, cols=cols)
+        batches = self._send_batches(staging, df)
+
+        # 行数を揃え、値を消してステージングの値を貼り付ける（1リクエストで原子的に反映）
+        cols = max(cols, ws.col_count)
+        live = {"sheetId": ws.id}
+        grid = {"startRowIndex": 0, "endRowIndex": rows}
+        grid.update(startColumnIndex=0, endColumnIndex=len(df.columns))
+        body = {
+            "requests": [
+                {
+                    "updateSheetProperties": {
+                        "properties": {
+                            **live,
+                            "gridProperties": {"rowCount": rows, "columnCount": cols},
+                        },
+                        "fields": "gridProperties(rowCount,columnCount)",
+                    }
+                },
+                {"updateCells": {"range": live, "fields": "userEnteredValue"}},
+                {
+                    "copyPaste": {
+                        "source": {"sheetId": staging.id, **grid},
+                        "destination": {**live, **grid},
+                        "pasteType": "PASTE_VALUES",
+                    }
+                },
+                # 貼り付け後はステージングを空にして1x1に戻す（セル数を2倍にしない）
+                {
+                    "updateCells": {
+                        "range": {"sheetId": staging.id},
+                        "fields": "userEnteredValue",
+                    }
+                },
+                {
+                    "updateSheetProperties": {
+                        "properties": {
+                            "sheetId": staging.id,
+                            "gridProperties": {"rowCount": 1, "columnCount": 1},
+                        },
+                        "fields": "gridProperties(rowCount,columnCount)",
+                    }
+                },
+            ]
+        }
+        self._call(sh.batch_update, body)
+        # 差分同期で使う行数が変わったため、シート情報を取り直す
+        self._refetch_worksheet(sh)
+        return batches + 1
+
+    def _refetch_worksheet(self, sh):
+        """batchUpdateでサイズを変えたシートを取り直し、キャッシュを置き換える"""
+        ws = self._call(sh.worksheet, self.worksheet_name)
+        with _connect_lock:
+            _worksheets[(self.spreadsheet_id, self.worksheet_name)] = ws
+        self._ws = ws
+        return ws
+
+    def _get_staging(self, sh):
+        """ステージング用の非表示シート（無ければ作成）"""
+        name = f"{self.worksheet_name}{STAGING_SUFFIX}"
+        cache_key = (self.spreadsheet_id, name)
+        with _connect_lock:
+            if cache_key not in _worksheets:
+                try:
+                    staging = sh.worksheet(name)
+                except gspread.exceptions.WorksheetNotFound:
+                    logger.info(f"ステージング用シート「{name}」を作成します")
+                    staging = sh.add_worksheet(name, rows=1, cols=1)
+                    staging.hide()
+                _worksheets[cache_key] = staging
+            return _worksheets[cache_key]
+
+    def _call(self, func, *args, **kwargs):
+        """Sheets APIを呼び、429/5xxの場合は指数バックオフ（ジッター付き）で再試行する"""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                if e.code not in RETRY_STATUS or attempt == MAX_RETRIES:
+                    raise
+                delay = RETRY_BASE_SECONDS * 2**attempt
+                delay += random.uniform(0, delay)
+                with self._retries_lock:
+                    self.retries += 1
+                logger.warning(
+                    f"Sheets APIエラー（{e.code}）のため{delay:.1f}秒後に再試行します"
+                )
+                time.sleep(delay)
+
+    def write_partitioned(
+        self, df: pd.DataFrame, date_column=DATE_COLUMN, force=False
+    ) -> dict:
+        """日付の年（作期）ごとに「<シート名>_<年>」へ分けて書き込む
+
+        分割ごとの内容の指紋を目次シート（「<シート名>_index」）に保存し、
+        指紋が変わった分割だけをwrite_allで書き直す（締まった年は再送しない）。
+        行が無くなった分割はヘッダーのみにする。force=Trueの場合は全分割を書き直す。
+        戻り値は分割ごとの行数（rows）と書き直したシート（rewritten）。
+        """
+        df = _clean(df)
+        labels = _partition_labels(df[date_column], self.season_start)
+        index = self._partition_writer(f"{self.worksheet_name}{INDEX_SUFFIX}")
+        previous = {row[0]: row for row in index.read_values()[1:] if row and row[0]}
+        if not previous:
+            logger.warning(
+                f"分割書込を始めます。「{self.worksheet_name}」シートは今後更新されないため、"
+                f"LookerStudioのデータソースを「{index.worksheet_name}」と各分割に切り替えてください"
+            )
+
+        parts = {
+            f"{self.worksheet_name}_{label}": (label, df[labels == label])
+            for label in sorted(labels.unique())
+        }
+        # 今回の行が無い分割は空にする
+        for sheet in previous:
+            if sheet not in parts:
+                parts[sheet] = (sheet.removeprefix(f"{self.worksheet_name}_"), df[:0])
+
+        rows, rewritten, index_rows = {}, [], []
+        now = datetime.now().isoformat(timespec="seconds")
+        with metrics.stage("partition") as m:
+            for sheet in sorted(parts):
+                label, part = parts[sheet]
+                fingerprint = content_fingerprint({sheet: part})
+                old = previous.get(sheet, []) + [""] * len(INDEX_COLUMNS)
+                updated_at = old[4]
+                if force or old[3] != fingerprint:
+                    logger.info(f"分割「{sheet}」を書き直します（{len(part)}行）")
+                    self._partition_writer(sheet).write_all(part)
+                    rewritten.append(sheet)
+                    updated_at = now
+                rows[sheet] = len(part)
+                index_rows.append(
+                    [
+                        sheet,
+                        self._partition_period(label),
+                        str(len(part)),
+                        fingerprint,
+                        updated_at,
+                    ]
+                )
+            if rewritten:
+                frame = pd.DataFrame(index_rows, columns=INDEX_COLUMNS)
+                index.write_all(frame)
+            m.put("Partitions", len(parts))
+            m.put("Rewritten", len(rewritten))
+        logger.info(f"分割書込: {len(rewritten)}/{len(parts)}シートを書き直しました")
+        return {"rows": rows, "rewritten": rewritten}
+
+    def _read_partitions(self, mode=None, columns=None) -> pd.DataFrame:
+        """目次シートに載っている分割を読み込んで1つのDataFrameにする"""
+        try:
+            index = self._partition_writer(f"{self.worksheet_name}{INDEX_SUFFIX}")
+            sheets = [row[0] for row in index.read_values()[1:] if row and row[0]]
+            frames = [
+                self._partition_writer(sheet).read_all(mode, columns)
+                for sheet in sheets
+            ]
+            frames = [f for f in frames if not f.empty]
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        except Exception as e:
+            logger.error(f"読込に失敗しました: {e}")
+            return pd.DataFrame()
+
+    def _partition_writer(self, worksheet_name):
+        """同じスプレッドシート・書込設定で別シートに書き込むWriter"""
+        writer = SpreadSheetWriter(worksheet_name, spreadsheet_id=self.spreadsheet_id)
+        writer.staging = self.staging
+        writer.batch_cells = self.batch_cells
+        writer.concurrency = self.concurrency
+        writer.partition_by = ""
+        return writer
+
+    def _partition_period(self, label) -> str:
+        """分割の期間（例 2024-04-01〜2025-03-31）"""
+        if not label.isdigit():
+            return ""
+        start = date(int(label), self.season_start, 1)
+        end = date(int(label) + 1, self.season_start, 1) - timedelta(days=1)
+        return f"{start}〜{end}"
+
+    def sync(self, df: pd.DataFrame, key: str = KEY_COLUMN, current=None) -> dict:
+        """既存シートとの差分（追加・変更・削除行）だけを書き込む
+
+        削除で空いた行には追加行を詰め、余った穴は末尾の行を移動して埋める。
+        そのため行の並びはエクスポート順と一致しない場合がある。
+        戻り値は件数の内訳と、実際に書き込み・クリアした行数（rows_touched）。
+        currentにはread_valuesの結果を渡せる（フォーマットと並行して先読みする場合）。
+        """
+        ws = self._get_worksheet()
+        df = _clean(df)
+        header = df.columns.values.tolist()
+        new_rows = df.to_numpy().tolist()
+
+        # currentを渡された場合（先読み済み）はシートを読み直さない
+        if current is None:
+            current = self.read_values()
+
+        width = len(header)
+        old_rows = [(row + [""] * width)[:width] for row in current[1:]]
+        positions = {}
+        if current and current[0][:width] == header and key in header:
+            key_idx = header.index(key)
+            positions = {row[key_idx]: i for i, row in enumerate(old_rows)}
+            incoming = {row[key_idx]: row for row in new_rows}
+
+        # ヘッダー不一致やキーの重複・欠損がある場合は差分が取れないので全件書込
+        if (
+            not positions
+            or len(positions) != len(old_rows)
+            or len(incoming) != len(new_rows)
+            or "" in positions
+            or "" in incoming
+        ):
+            logger.info("差分が取れないため全件書込に切り替えます")
+            self.write_all(df)
+            return {
+                "inserted": len(new_rows),
+                "updated": 0,
+                "deleted": len(old_rows),
+                "rows_touched": max(len(new_rows), len(old_rows)),
+            }
+
+        rows = list(old_rows)
+        dirty = set()
+
+        # 1. 変更行はその場で上書き
+        for k, i in positions.items():
+            if k in incoming and rows[i] != incoming[k]:
+                rows[i] = incoming[k]
+                dirty.add(i)
+        updated = len(dirty)
+
+        # 2. 削除行を穴にして追加行を詰め、入りきらない分は末尾に追加
+        holes = sorted(i for k, i in positions.items() if k not in incoming)
+        for i in holes:
+            rows[i] = None
+        inserts = [row for k, row in incoming.items() if k not in positions]
+        deleted, inserted = len(holes), len(inserts)
+        for row in inserts:
+            if holes:
+                i = holes.pop(0)
+                rows[i] = row
+            else:
+                rows.append(row)
+                i = len(rows) - 1
+            dirty.add(i)
+
+        # 3. 穴が余った場合は末尾の行を移動して詰める
+        while holes:
+            while rows and rows[-1] is None:
+                rows.pop()
+            holes = [i for i in holes if i < len(rows)]
+            if not holes:
+                break
+            i = holes.pop(0)
+            rows[i] = rows.pop()
+            dirty.add(i)
+        dirty = sorted(i for i in dirty if i < len(rows))
+
+        # 4. 連続する行をまとめて範囲更新、余った末尾はクリア
+        data = []
+        for start, end in _runs(dirty):
+            data.append(
+                {
+                    "range": f"{rowcol_to_a1(start + 2, 1)}:{rowcol_to_a1(end + 2, width)}",
+                    "values": rows[start : end + 1],
+                }
+            )
+        clear_ranges = []
+        if len(rows) < len(old_rows):
+            clear_ranges.append(
+                f"{rowcol_to_a1(len(rows) + 2, 1)}:"
+                f"{rowcol_to_a1(len(old_rows) + 1, width)}"
+            )
+
+        touched = len(dirty) + max(len(old_rows) - len(rows), 0)
+        try:
+            with metrics.stage("sync") as m:
+                logger.info(
+                    f"差分同期中...（追加{inserted}行、変更{updated}行、削除{deleted}行）"
+                )
+                if len(rows) + 1 > ws.row_count:
+                    self._call(ws.add_rows, len(rows) + 1 - ws.row_count)
+                if data:
+                    self._call(ws.batch_update, data)
+                if clear_ranges:
+                    self._call(ws.batch_clear, clear_ranges)
+                m.put("RowsTouched", touched)
+                m.put("CellsWritten", touched * width)
+                logger.info("差分同期が完了しました")
+        except Exception as e:
+            raise WriteError(f"差分同期に失敗しました: {e}")
+
+        return {
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": deleted,
+            "rows_touched": touched,
+        }
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    """未変換のDataFrameだけ文字列化する（二重変換を避ける）"""
+    if is_sheets_clean(df):
+        return df
+    return AgriNoteFormatter().clean_for_sheets(df)
+
+
+def _row_chunks(df: pd.DataFrame, rows: int):
+    """ヘッダー行を含めてrows行ずつ（開始行, 値のリスト）を順に返す"""
+    header = df.columns.values.tolist()
+    first = [header] + df.iloc[: rows - 1].to_numpy().tolist()
+    yield 1, first
+    del first
+    for i in range(rows - 1, len(df), rows):
+        yield i + 2, df.iloc[i : i + rows].to_numpy().tolist()
+
+
+def _partition_labels(dates: pd.Series, season_start=1) -> pd.Series:
+    """日付の列を分割名（作期の始まる年、日付が無ければ「日付なし」）にする"""
+    parsed = pd.to_datetime(dates, errors="coerce", format="mixed")
+    years = parsed.dt.year - (parsed.dt.month < season_start)
+    labels = years.astype("Int64").astype("string")
+    return labels.fillna(UNDATED_PARTITION).astype(str)
+
+
+def _runs(indices):
+    """ソート済みの行インデックスを連続区間（start, end）にまとめる"""
+    runs = []
+    for i in indices:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return [tuple(r) for r in runs]
@@ -10,6 +10,10 @@ class ScrapeError(Exception):
     """スクレイピング中に発生する例外"""
     pass
 
+class ExportNotReadyError(ScrapeError):
+    """エクスポートの生成が期限内に終わらなかった時の例外"""
+    pass
+
 class WriteError(Exception):
     """書き込み中に発生する例外"""
     pass
\ No newline at end of file
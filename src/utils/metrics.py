@@ -0,0 +1,188 @@
+import json
+import resource
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from functools import wraps
+
+# CloudWatchのメトリクス名前空間
+NAMESPACE = "AgriNoteSync"
+
+
+class StdoutSink:
+    """Embedded Metric Format（EMF）のJSONを1行ずつ標準出力に出す"""
+
+    def emit(self, record: dict):
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+class MemorySink:
+    """テスト用: 出力したEMFレコードを保持する"""
+
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record: dict):
+        self.records.append(record)
+
+    def values(self, stage: str) -> dict:
+        """指定した工程の最後のレコードから値だけを取り出す"""
+        for record in reversed(self.records):
+            if record.get("Stage") == stage:
+                names = record["_aws"]["CloudWatchMetrics"][0]["Metrics"]
+                return {m["Name"]: record[m["Name"]] for m in names}
+        return {}
+
+
+class StageMetrics:
+    """1工程分のメトリクス（stage()のwithブロック内で値を追加する）"""
+
+    def __init__(self, name):
+        self.name = name
+        self.values = {}
+
+    def put(self, name, value, unit="Count"):
+        self.values[name] = (value, unit)
+
+
+class Metrics:
+    """工程ごとの所要時間・サイズ・件数・ピークRSSの増分をEMFで出力する
+
+    with metrics.stage("download") as m:
+        m.put("ZipBytes", size, "Bytes")
+    """
+
+    def __init__(self, namespace=NAMESPACE, sink=None):
+        self.namespace = namespace
+        self.sink = sink or StdoutSink()
+        self.properties = {}
+
+    def set_sink(self, sink):
+        self.sink = sink
+
+    def set_property(self, name, value):
+        """全レコードに付ける検索用の値（RequestIdなど）"""
+        self.properties[name] = value
+
+    @contextmanager
+    def stage(self, name):
+        stage = StageMetrics(name)
+        # プロセス全体のピークでは前の工程の値が残るため、工程の開始からの増分を出す
+        rss = RssGrowth()
+        started = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.put(
+                "Duration",
+                round((time.perf_counter() - started) * 1000, 1),
+                "Milliseconds",
+            )
+            stage.put("StagePeakRSSGrowth", rss.peak_mb(), "Megabytes")
+            rss.stop()
+            self.emit(stage)
+
+    def timed(self, name):
+        """関数全体をstage(name)で計測するデコレーター"""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def emit(self, stage: StageMetrics):
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": self.namespace,
+                        "Dimensions": [["Stage"]],
+                        "Metrics": [
+                            {"Name": n, "Unit": unit}
+                            for n, (_, unit) in stage.values.items()
+                        ],
+                    }
+                ],
+            },
+            "Stage": stage.name,
+            **self.properties,
+        }
+        record.update({n: value for n, (value, _) in stage.values.items()})
+        self.sink.emit(record)
+
+
+def peak_rss_mb() -> float:
+    """このプロセスのピークRSS（MB、Linuxのru_maxrssはKB単位）"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class RssGrowth:
+    """作成した時点からのピークRSSの増分（MB）を測る
+
+    Linuxでは/proc/self/clear_refsでピーク（VmHWM）を現在のRSSに戻してから測るため、
+    インタープリターの常駐分やウォームコンテナの過去の実行のピークを含まない。
+    入れ子の工程などで後からピークを戻す場合も、戻す前の値は計測中のものに引き継ぐ。
+    戻せない環境ではプロセス全体のピークRSSから作成時のRSSを引く（過大になりうる）。
+    """
+
+    def __init__(self):
+        self._peak = 0.0
+        self.reset = _reset_peak_rss()
+        self.baseline = _proc_status_mb("VmRSS") or peak_rss_mb()
+        _active.add(self)
+
+    def peak_mb(self) -> float:
+        peak = _proc_status_mb("VmHWM") if self.reset else None
+        peak = max(peak or peak_rss_mb(), self._peak)
+        return round(max(peak - self.baseline, 0.0), 1)
+
+    def stop(self):
+        """計測を終える（以降のピークのリセットで値を引き継がない）"""
+        _active.discard(self)
+
+
+# 計測中のRssGrowth（ピークを戻す前にその時点のピークを渡す）
+_active = weakref.WeakSet()
+_reset_lock = threading.Lock()
+
+
+def _reset_peak_rss() -> bool:
+    with _reset_lock:
+        peak = _proc_status_mb("VmHWM")
+        if peak is not None:
+            for growth in list(_active):
+                growth._peak = max(growth._peak, peak)
+        return _clear_peak_rss()
+
+
+def _clear_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _proc_status_mb(field):
+    """/proc/self/statusの値（MB）、取れなければNone"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+metrics = Metrics()
@@ -0,0 +1,67 @@
+import zipfile
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from benchmarks.run import compare, run_benchmarks
+from benchmarks.synthetic import WORK_RECORD_MEMBER, make_export_zip
+from src.core.reader import ExcelReader
+from src.core.scraper import AgriNoteScraper
+
+
+def test_synthetic_export_matches_agrinote_zip(tmp_path, monkeypatch):
+    """合成zipはファイル名が文字化けした状態で格納され、抽出・読込できる"""
+    monkeypatch.setattr("src.core.scraper.EXTRACT_DIR", str(tmp_path / "x"))
+    zip_path = make_export_zip(tmp_path / "export.zip", 30, tmp_dir=str(tmp_path))
+
+    with zipfile.ZipFile(zip_path) as z:
+        names = [info.filename for info in z.infolist()]
+    assert WORK_RECORD_MEMBER not in names
+
+    excel_path = AgriNoteScraper(MagicMock())._extract_excel(
+        zip_path, target_keyword="作業者"
+    )
+    df = ExcelReader(engine="openpyxl").read(excel_path)
+
+    assert excel_path.endswith(WORK_RECORD_MEMBER)
+    assert len(df) == 30
+    assert pd.api.types.is_timedelta64_dtype(df["作業時間"])
+    assert pd.api.types.is_datetime64_any_dtype(df["日付"])
+
+
+def test_run_benchmarks_reports_each_stage(tmp_path):
+    results = run_benchmarks([20], repeat=1, work_dir=str(tmp_path))
+
+    assert {"extract", "ingest_openpyxl", "format", "write_all_payload"} <= set(
+        results["20"]
+    )
+
+
+def test_compare_detects_regression():
+    baseline = {"results": {"1000": {"format": 10.0, "extract": 1.0}}}
+    results = {"1000": {"format": 13.0, "extract": 1.1}}
+
+    assert compare(results, baseline, tolerance=0.2) == [
+        "1000行 format: 10.0 ms -> 13.0 ms"
+    ]
+
+
+def test_bench_read_compares_read_paths():
+    from benchmarks.bench_read import run
+
+    cases = run([50])[50]
+
+    records, columnar = cases["get_all_records"][2], cases["columnar"][2]
+    assert records.shape == columnar.shape == (50, 13)
+    assert cases["columnar_key"][2].columns.tolist() == ["作業ID"]
+
+
+def test_bench_memory_reports_per_10k_rows(tmp_path):
+    from benchmarks.bench_memory import run
+
+    results = run([200], work_dir=str(tmp_path))[200]
+
+    assert set(results) == {"default", "lean"}
+    assert results["lean"]["rows"] == results["default"]["rows"] == 200
+    assert results["lean"]["frame_mb"] <= results["default"]["frame_mb"]
+    assert "peak_rss_per_10k_rows_mb" in results["lean"]
@@ -1,4 +1,8 @@
-from src.core.browser import BrowserManager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.browser import BrowserManager, RequestFilter, shutdown_pool
 
 def test_browser_can_open_page():
     # ブラウザを起動（ローカルで確認必要な場合はheadless=Trueにすること）
@@ -11,3 +15,93 @@ def test_browser_can_open_page():
 
         # タイトルが取得できればブラウザの動きは正常
         assert "Google" in page.title()
+
+
+@pytest.fixture
+def mock_playwright():
+    """sync_playwrightをモックに差し替え、プールを空にする"""
+    shutdown_pool()
+    with patch("src.core.browser.sync_playwright") as mock_sync:
+        yield mock_sync
+    shutdown_pool()
+
+
+def test_pooled_browser_is_reused(mock_playwright):
+    """プールモードでは2回目の実行でブラウザを起動しない"""
+    launch = mock_playwright.return_value.start.return_value.chromium.launch
+    context = MagicMock()
+    launch.return_value.contexts = [context]
+
+    with BrowserManager(pooled=True) as first:
+        pass
+    with BrowserManager(pooled=True) as second:
+        pass
+
+    assert first is second
+    assert launch.call_count == 1
+    # 実行ごとにコンテキストは閉じ、ブラウザは閉じない
+    assert context.close.call_count == 2
+    assert not first.close.called
+
+
+def test_pooled_browser_relaunches_when_disconnected(mock_playwright):
+    launch = mock_playwright.return_value.start.return_value.chromium.launch
+    launch.side_effect = [MagicMock(contexts=[]), MagicMock(contexts=[])]
+
+    with BrowserManager(pooled=True) as first:
+        first.is_connected.return_value = False
+    with BrowserManager(pooled=True) as second:
+        pass
+
+    assert first is not second
+    assert first.close.called
+
+
+def test_pooled_browser_recycles_after_max_uses(mock_playwright):
+    launch = mock_playwright.return_value.start.return_value.chromium.launch
+    launch.side_effect = [MagicMock(contexts=[]) for _ in range(3)]
+
+    for _ in range(3):
+        with BrowserManager(pooled=True, max_uses=2):
+            pass
+
+    assert launch.call_count == 2
+
+
+def _route(resource_type, url):
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.url = url
+    return route
+
+
+def test_request_filter_blocks_by_type_and_url():
+    request_filter = RequestFilter(allow_patterns=("agri-note.jp/b/img/needed",))
+    image = _route("image", "https://agri-note.jp/b/img/logo.png")
+    needed = _route("image", "https://agri-note.jp/b/img/needed.png")
+    analytics = _route("script", "https://www.googletagmanager.com/gtag/js")
+    api = _route("xhr", "https://agri-note.jp/an-api/v1/export")
+
+    for route in (image, needed, analytics, api):
+        request_filter._handle(route)
+
+    assert image.abort.called
+    assert analytics.abort.called
+    assert needed.continue_.called
+    assert api.continue_.called
+    assert request_filter.stats["blocked"] == 2
+    assert request_filter.stats["allowed"] == 2
+    assert request_filter.stats["blocked_by"] == {
+        "image": 1,
+        "googletagmanager.com": 1,
+    }
+
+
+def test_request_filter_counts_allowed_bytes():
+    request_filter = RequestFilter()
+    request = MagicMock()
+    request.sizes.return_value = {"responseBodySize": 1200}
+
+    request_filter._on_finished(request)
+
+    assert request_filter.stats["allowed_bytes"] == 1200
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from benchmarks.import_time import cumulative_ms, profile_imports, report
+
+# ハンドラーのインポート時間の上限（ミリ秒）。Slackは3秒以内の応答が必要
+# 実時間は負荷の高いCIでぶれるため、COLD_START_BUDGET=1の時だけ検査する
+CHECK_BUDGET = os.getenv("COLD_START_BUDGET") == "1"
+BUDGETS_MS = {
+    "src.app_slack": float(os.getenv("COLD_START_BUDGET_SLACK_MS", "100")),
+    "src.app_scraper": float(os.getenv("COLD_START_BUDGET_SCRAPER_MS", "100")),
+}
+
+# モジュール読込時には読み込まず、必要になってから読み込むもの
+DEFERRED = {
+    "src.app_slack": ["boto3", "requests"],
+    "src.app_scraper": ["pandas", "playwright", "gspread", "requests"],
+}
+
+# 計測結果の出力先（テストの成果物）
+PROFILE_DIR = os.getenv("IMPORT_PROFILE_DIR", ".import_profile")
+
+
+@pytest.mark.parametrize("module", list(DEFERRED))
+def test_handler_defers_heavy_imports(module):
+    entries = profile_imports(module)
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, f"{module}.txt"), "w") as f:
+        f.write(report(entries, module))
+
+    imported = {entry["module"] for entry in entries}
+    for heavy in DEFERRED[module]:
+        assert heavy not in imported, f"{module}が{heavy}を読み込んでいます"
+
+
+@pytest.mark.skipif(not CHECK_BUDGET, reason="COLD_START_BUDGET=1の時だけ検査する")
+@pytest.mark.parametrize("module", list(BUDGETS_MS))
+def test_handler_import_time_within_budget(module):
+    entries = profile_imports(module)
+
+    assert cumulative_ms(entries, module) < BUDGETS_MS[module]
@@ -0,0 +1,104 @@
+import zipfile
+from unittest.mock import MagicMock
+
+import requests
+
+from src.core.export_client import HttpExportClient, shared_session
+from src.core.scraper import AgriNoteScraper
+
+
+def _response(json_data=None, content=b""):
+    res = MagicMock()
+    res.json.return_value = json_data
+    res.iter_content.return_value = [content]
+    res.__enter__.return_value = res
+    return res
+
+
+def _fake_session(zip_bytes):
+    session = MagicMock()
+    session.cookies = requests.cookies.RequestsCookieJar()
+    session.post.return_value = _response({"id": "42"})
+    session.get.side_effect = [
+        _response({"status": "running"}),
+        _response({"status": "done", "url": "https://example.com/42.zip"}),
+        _response(content=zip_bytes),
+    ]
+    return session
+
+
+def test_http_client_requests_polls_and_streams(tmp_path):
+    session = _fake_session(b"zip-bytes")
+    client = HttpExportClient(
+        "https://example.com/export",
+        "https://example.com/export/{id}",
+        poll_interval=0,
+        session=session,
+    )
+
+    path = client.download(
+        [{"name": "sid", "value": "abc", "domain": "example.com"}], str(tmp_path)
+    )
+
+    assert open(path, "rb").read() == b"zip-bytes"
+    assert session.cookies.get("sid") == "abc"
+    assert session.get.call_args_list[0].args[0] == "https://example.com/export/42"
+
+
+def test_download_report_uses_http_client(tmp_path, monkeypatch):
+    """HTTPで取得できた場合は画面操作をしない"""
+    import src.core.scraper as scraper_module
+
+    monkeypatch.setattr(scraper_module, "DOWNLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(scraper_module, "EXTRACT_DIR", str(tmp_path / "extracted"))
+    zip_path = tmp_path / "42.zip"
+    with zipfile.ZipFile(zip_path, "w") as z:
+        z.writestr("作業記録２ 作業者.xlsx", b"dummy")
+    client = MagicMock()
+    client.download.return_value = str(zip_path)
+    page = MagicMock()
+
+    excel_path = AgriNoteScraper(page).download_report(http_client=client)
+
+    assert excel_path.endswith("作業者.xlsx")
+    assert not page.goto.called
+    assert not zip_path.exists()
+
+
+def test_download_report_falls_back_to_browser(tmp_path, monkeypatch):
+    """HTTPで失敗した場合は画面操作で取得する"""
+    import src.core.scraper as scraper_module
+
+    monkeypatch.setattr(scraper_module, "DOWNLOAD_DIR", str(tmp_path))
+    client = MagicMock()
+    client.download.side_effect = requests.HTTPError("404")
+    page = MagicMock()
+    download = page.expect_download.return_value.__enter__.return_value.value
+    download.suggested_filename = "export.zip"
+    download.save_as.side_effect = lambda path: open(path, "wb").close()
+    scraper = AgriNoteScraper(page)
+    scraper._extract_excel = MagicMock(return_value="/tmp/extracted/x.xlsx")
+
+    assert scraper.download_report(http_client=client) == "/tmp/extracted/x.xlsx"
+    page.goto.assert_called_with("https://agri-note.jp/b/export.html#/top")
+
+
+def test_clients_share_session_and_drop_previous_cookies(tmp_path):
+    """Sessionはモジュールで使い回し、前回の実行のCookieは持ち越さない"""
+    first = HttpExportClient("https://example.com/export", "https://example.com/{id}")
+    second = HttpExportClient("https://example.com/export", "https://example.com/{id}")
+    assert first.session is second.session is shared_session()
+
+    session = _fake_session(b"zip-bytes")
+    session.cookies.set("old", "stale", domain="example.com")
+    client = HttpExportClient(
+        "https://example.com/export",
+        "https://example.com/export/{id}",
+        poll_interval=0,
+        session=session,
+    )
+    client.download(
+        [{"name": "sid", "value": "abc", "domain": "example.com"}], str(tmp_path)
+    )
+
+    assert session.cookies.get_dict() == {"sid": "abc"}
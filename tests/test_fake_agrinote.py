@@ -0,0 +1,67 @@
+import urllib.request
+import zipfile
+
+import pytest
+
+from benchmarks.fake_agrinote import FakeAgriNote
+from src.core.export_client import HttpExportClient
+
+
+@pytest.fixture
+def fake_agrinote(tmp_path):
+    with FakeAgriNote(rows=20, generation_delay=0.2, work_dir=str(tmp_path)) as app:
+        yield app
+
+
+def test_fake_pages_have_scraper_selectors(fake_agrinote):
+    html = urllib.request.urlopen(f"{fake_agrinote.base_url}/b/login/").read()
+    html = html.decode("utf-8")
+
+    assert 'type="password"' in html
+    assert "_1n3hn89z" in html
+    assert "ログイン" in html
+
+
+def test_fake_export_flow_over_http(fake_agrinote, tmp_path):
+    """ログイン→生成→状態確認→zip取得がブラウザ無しで通る"""
+    client = HttpExportClient(
+        f"{fake_agrinote.base_url}/api/export",
+        f"{fake_agrinote.base_url}/api/export/status?id={{id}}",
+        poll_interval=0.05,
+    )
+    res = client.session.post(
+        f"{fake_agrinote.base_url}/api/login",
+        json={"id": fake_agrinote.user_id, "password": fake_agrinote.password},
+    )
+    res.raise_for_status()
+
+    zip_path = client.download([], str(tmp_path))
+
+    with zipfile.ZipFile(zip_path) as z:
+        assert len(z.infolist()) == 3
+
+
+def test_scraper_end_to_end_against_fake(fake_agrinote, tmp_path, monkeypatch):
+    """代替サーバーに対してPlaywrightでログインからExcel抽出まで行う"""
+    from src.core.browser import BrowserManager
+    from src.core.scraper import AgriNoteScraper
+
+    monkeypatch.setattr("src.core.scraper.DOWNLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr("src.core.scraper.EXTRACT_DIR", str(tmp_path / "x"))
+    try:
+        manager = BrowserManager(headless=True)
+        browser = manager.__enter__()
+    except Exception as e:
+        manager.__exit__(None, None, None)
+        pytest.skip(f"Chromiumを起動できません: {e}")
+
+    try:
+        page = browser.new_context().new_page()
+        scraper = AgriNoteScraper(page, base_url=fake_agrinote.base_url)
+        scraper.login(fake_agrinote.user_id, fake_agrinote.password)
+
+        excel_path = scraper.download_report()
+
+        assert excel_path.endswith("作業者.xlsx")
+    finally:
+        manager.__exit__(None, None, None)
@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.core.fingerprint import LastSync, content_fingerprint
+from src.core.scraper import AgriNoteScraper
+from src.core.state import LocalStateStore
+
+WORKBOOKS = {"作業者": "作業記録"}
+
+
+def _frame(worker="鈴木"):
+    return pd.DataFrame(
+        {
+            "作業ID": ["001", "002"],
+            "作業者": [worker, "木下"],
+            "作業時間": pd.to_timedelta([1.5, 2], unit="h"),
+        }
+    )
+
+
+def test_content_fingerprint_follows_values():
+    assert content_fingerprint({"作業者": _frame()}) == content_fingerprint(
+        {"作業者": _frame()}
+    )
+    assert content_fingerprint({"作業者": _frame()}) != content_fingerprint(
+        {"作業者": _frame("佐藤")}
+    )
+    # 列名が変わった場合も別物とみなす
+    renamed = _frame().rename(columns={"作業者": "担当者"})
+    assert content_fingerprint({"作業者": _frame()}) != content_fingerprint(
+        {"作業者": renamed}
+    )
+
+
+def test_extracted_member_crc_is_stable(tmp_path, monkeypatch):
+    import src.core.scraper as scraper_module
+    from benchmarks.synthetic import make_export_zip
+
+    monkeypatch.setattr(scraper_module, "EXTRACT_DIR", str(tmp_path / "extracted"))
+    zip_path = make_export_zip(tmp_path / "export.zip", rows=5, tmp_dir=tmp_path)
+    scraper = AgriNoteScraper(MagicMock())
+
+    scraper._extract_workbooks(zip_path, ("作業者", "圃場"))
+    first = dict(scraper.last_fingerprints)
+    scraper._extract_workbooks(zip_path, ("作業者", "圃場"))
+
+    assert set(first) == {"作業者", "圃場"}
+    assert scraper.last_fingerprints == first
+
+
+def test_last_sync_roundtrip_and_force(tmp_path):
+    store = LocalStateStore(str(tmp_path / "state.json"))
+    crcs = {"作業者": "0badcafe-100"}
+
+    first = LastSync(store, "sheet-1")
+    assert not first.crc_unchanged(crcs, WORKBOOKS)
+    assert not first.content_unchanged({"作業者": _frame()})
+    first.save()
+
+    second = LastSync(store, "sheet-1")
+    assert second.crc_unchanged(crcs, WORKBOOKS)
+    assert second.content_unchanged({"作業者": _frame()})
+    # 書込先のシートが変わった場合・強制指定の場合は変更ありとする
+    assert not second.crc_unchanged(crcs, {"作業者": "別シート"})
+    assert not LastSync(store, "sheet-1", force=True).crc_unchanged(crcs, WORKBOOKS)
+    # スプレッドシートごとに別々に記録する
+    assert not LastSync(store, "sheet-2").crc_unchanged(crcs, WORKBOOKS)
+
+
+def test_last_sync_changed_output_settings_forces_write(tmp_path, monkeypatch):
+    """エクスポートが同じでも分割などの出力設定を変えたら書き直す"""
+    store = LocalStateStore(str(tmp_path / "state.json"))
+    crcs = {"作業者": "0badcafe-100"}
+    monkeypatch.delenv("PARTITION_BY", raising=False)
+
+    first = LastSync(store, "sheet-1")
+    first.crc_unchanged(crcs, WORKBOOKS)
+    first.content_unchanged({"作業者": _frame()})
+    first.save()
+    assert LastSync(store, "sheet-1").crc_unchanged(crcs, WORKBOOKS)
+
+    monkeypatch.setenv("PARTITION_BY", "year")
+    changed = LastSync(store, "sheet-1")
+
+    assert changed.force
+    assert not changed.crc_unchanged(crcs, WORKBOOKS)
+    assert not changed.content_unchanged({"作業者": _frame()})
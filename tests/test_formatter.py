@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from src.core.formatter import AgriNoteFormatter
+from src.core.formatter import AgriNoteFormatter, is_sheets_clean
 
 def test_formatter_cleans_data_for_sheets():
     # 1. 準備:timedeltaを含むダミーのDataFrameを作る
@@ -20,3 +20,94 @@ def test_formatter_cleans_data_for_sheets():
     assert result["作業時間"].iloc[0] == "1.5"
     assert result["作業時間"].iloc[1] == "2.25"
     assert result["備考"].iloc[0] == ""
+
+
+def test_clean_for_sheets_matches_str_per_cell():
+    """列単位の変換結果がセルごとのstr()と一致する"""
+    df = pd.DataFrame(
+        {
+            "小数": [1.5, np.nan, 0.1 + 0.2],
+            "整数": [1, 2, 3],
+            "日付": pd.to_datetime(["2026-02-01", None, "2026-02-03"]),
+            "作業者": pd.Categorical(["鈴木", None, "木下"]),
+            "混在": [1, "a", None],
+        }
+    )
+    expected = df.map(lambda x: "" if pd.isna(x) else str(x))
+
+    result = AgriNoteFormatter().clean_for_sheets(df)
+
+    assert result.values.tolist() == expected.values.tolist()
+    assert is_sheets_clean(result)
+    assert not is_sheets_clean(df)
+
+
+def test_format_applies_declared_rules():
+    """ルールに沿って変換・列名変更・削除が行われる"""
+    df = pd.DataFrame(
+        {
+            "日付": pd.to_datetime(["2026-02-01", "2026-02-02"]),
+            "作業時間": pd.to_timedelta(["01:20:00", "00:10:00"]),
+            "移動時間": pd.to_timedelta(["00:30:00", None]),
+            "面積": [10.126, 3.0],
+            "社内メモ": ["x", "y"],
+        }
+    )
+    formatter = AgriNoteFormatter(
+        rules={
+            "日付": {"format": "%Y/%m/%d"},
+            "作業時間": {"to": "hours", "round": 1, "rename": "作業時間(h)"},
+            "面積": {"round": 1},
+            "社内メモ": {"type": "string", "drop": True},
+        }
+    )
+
+    result = formatter.format(df)
+
+    assert result.columns.tolist() == ["日付", "作業時間(h)", "移動時間", "面積"]
+    assert result["日付"].tolist() == ["2026/02/01", "2026/02/02"]
+    assert result["作業時間(h)"].tolist() == [1.3, 0.2]
+    # ルールに無いtimedelta列は従来通り時間（小数2桁）
+    assert result["移動時間"].iloc[0] == 0.5
+    assert result["面積"].tolist() == [10.1, 3.0]
+
+
+def test_lean_clean_for_sheets_keeps_values_as_categories():
+    """省メモリモードでも書き込む文字列は同じで、重複の多い列はカテゴリ型になる"""
+    df = pd.DataFrame(
+        {
+            "作業ID": ["1", "2", "3", "4"],
+            "作業者": pd.Categorical(["鈴木", None, "鈴木", "木下"]),
+            "面積": [1.5, np.nan, 1.5, 1.5],
+        }
+    )
+
+    lean = AgriNoteFormatter(lean=True).clean_for_sheets(df)
+    expected = AgriNoteFormatter().clean_for_sheets(df)
+
+    assert lean.to_numpy().tolist() == expected.to_numpy().tolist()
+    assert isinstance(lean["作業者"].dtype, pd.CategoricalDtype)
+    assert isinstance(lean["面積"].dtype, pd.CategoricalDtype)
+    assert not isinstance(lean["作業ID"].dtype, pd.CategoricalDtype)
+    assert is_sheets_clean(lean)
+
+
+def test_format_for_sheets_matches_format_then_clean():
+    """整形と文字列化を続けて行っても結果は同じで、元のDataFrameは変わらない"""
+    df = pd.DataFrame(
+        {
+            "日付": pd.to_datetime(["2026-02-01", None]),
+            "作業時間": pd.to_timedelta(["01:30:00", "00:10:00"]),
+            "作業者": ["鈴木", "木下"],
+        }
+    )
+    formatter = AgriNoteFormatter()
+    original = df.copy()
+
+    result = formatter.format_for_sheets(df)
+
+    pd.testing.assert_frame_equal(
+        result, formatter.clean_for_sheets(formatter.format(df))
+    )
+    pd.testing.assert_frame_equal(df, original)
+    assert is_sheets_clean(result)
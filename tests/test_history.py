@@ -0,0 +1,80 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.core.history import HistorySnapshot
+from src.core.state import LocalStateStore
+
+
+def test_window_start_requires_snapshot(tmp_path):
+    """スナップショットが無い場合は全期間（None）になる"""
+    history = HistorySnapshot(str(tmp_path / "history.pkl"))
+
+    assert history.window_start("7") is None
+    assert history.window_start("") is None
+
+
+def test_window_start_from_snapshot(tmp_path):
+    path = str(tmp_path / "history.pkl")
+    HistorySnapshot(path).save(pd.DataFrame({"作業ID": ["001"]}), date(2026, 2, 9))
+
+    history = HistorySnapshot(path)
+
+    assert history.window_start("7", today=date(2026, 2, 10)) == date(2026, 2, 3)
+    assert history.window_start("since_last") == date(2026, 2, 9)
+
+
+def test_window_start_does_not_skip_days_after_old_snapshot(tmp_path):
+    """前回成功日が期間より前なら、その間の行を落とさないよう前回成功日から取得する"""
+    path = str(tmp_path / "history.pkl")
+    HistorySnapshot(path).save(pd.DataFrame({"作業ID": ["001"]}), date(2026, 10, 5))
+
+    history = HistorySnapshot(path)
+
+    assert history.window_start("3", today=date(2026, 10, 18)) == date(2026, 10, 5)
+
+
+def test_window_start_rejects_invalid_window(tmp_path):
+    history = HistorySnapshot(str(tmp_path / "history.pkl"))
+
+    with pytest.raises(ValueError, match="EXPORT_WINDOW"):
+        history.window_start("7d")
+
+
+def test_snapshot_roundtrip_through_state_store(tmp_path):
+    """状態ストアを渡すとそのkeyに保存する（S3なら別のコンテナからも読める）"""
+    store = LocalStateStore(str(tmp_path / "state.json"))
+    df = pd.DataFrame({"作業ID": ["001"]})
+    HistorySnapshot(store=store, key="tenants/a/history.pkl").save(df, date(2026, 2, 1))
+
+    history = HistorySnapshot(store=store, key="tenants/a/history.pkl")
+
+    assert history.load()["作業ID"].tolist() == ["001"]
+    assert history.synced_at == date(2026, 2, 1)
+    assert (tmp_path / "tenants" / "a" / "history.pkl").exists()
+    assert HistorySnapshot(store=store).load() is None
+
+
+def test_merge_replaces_rows_in_window(tmp_path):
+    """期間内の行はエクスポート側を正とし、作業IDで重複排除される"""
+    path = str(tmp_path / "history.pkl")
+    old = pd.DataFrame(
+        [
+            {"作業ID": "001", "日付": "2026-01-10", "作業名": "剪定"},
+            {"作業ID": "002", "日付": "2026-02-02", "作業名": "消毒"},
+            {"作業ID": "003", "日付": "2026-02-03", "作業名": "削除された作業"},
+        ]
+    )
+    HistorySnapshot(path).save(old, date(2026, 2, 3))
+    window_df = pd.DataFrame(
+        [
+            {"作業ID": "002", "日付": "2026-02-02", "作業名": "防除"},
+            {"作業ID": "004", "日付": "2026-02-04", "作業名": "収穫"},
+        ]
+    )
+
+    merged = HistorySnapshot(path).merge(window_df, date(2026, 2, 1))
+
+    assert merged["作業ID"].tolist() == ["001", "002", "004"]
+    assert merged.loc[merged["作業ID"] == "002", "作業名"].item() == "防除"
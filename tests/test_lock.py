@@ -0,0 +1,119 @@
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.lock import JobLock, SQLiteLockBackend
+from src.utils.error import AgriNoteError
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCK_PATH", str(tmp_path / "lock.db"))
+    monkeypatch.delenv("LOCK_TABLE", raising=False)
+    monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+    return SQLiteLockBackend()
+
+
+def test_from_env_requires_lock_table_on_lambda(backend, monkeypatch):
+    """Lambdaではコンテナごとに別のSQLiteになり排他にならないため、設定を必須にする"""
+    assert isinstance(JobLock.from_env().backend, SQLiteLockBackend)
+
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "agrinote-scraper")
+    with pytest.raises(AgriNoteError, match="LOCK_TABLE"):
+        JobLock.from_env()
+
+
+def test_second_requester_waits_and_is_returned_on_release(backend):
+    first = JobLock(backend, owner="run-1", ttl=60)
+    second = JobLock(backend, owner="run-2", ttl=60)
+
+    assert first.acquire(waiter="U1")
+    assert not second.acquire(waiter="U2")
+    assert not second.acquire(waiter="U2")
+    assert not second.acquire()
+
+    # 待機者は重複なしで返り、解放後は次の実行が取得できる
+    assert first.release() == ["U2"]
+    assert second.acquire()
+    assert second.release() == []
+
+
+def test_expired_lease_can_be_taken_over(backend, monkeypatch):
+    import src.core.lock as lock_module
+
+    now = [1000.0]
+    monkeypatch.setattr(lock_module.time, "time", lambda: now[0])
+
+    assert backend.acquire("job", "crashed-run", ttl=60)
+    now[0] += 61
+    assert backend.acquire("job", "run-2", ttl=60, waiter="U1")
+    # 失効したリースの持ち主は延長も解放もできない
+    assert not backend.renew("job", "crashed-run", ttl=60)
+    assert backend.release("job", "crashed-run") == []
+    assert backend.renew("job", "run-2", ttl=60)
+
+
+def test_heartbeat_renews_lease(backend):
+    renewed = []
+    done = threading.Event()
+    backend.renew = lambda *args: renewed.append(args) or done.set() or True
+    lock = JobLock(backend, owner="run-1", ttl=0.06)
+
+    assert lock.acquire()
+    assert done.wait(5)
+    lock.release()
+
+    assert renewed[0] == ("agrinote-sync", "run-1", 0.06)
+
+
+def _context(request_id):
+    return MagicMock(aws_request_id=request_id)
+
+
+def test_handler_coalesces_runs_and_notifies_all(backend, monkeypatch):
+    """実行中に届いた依頼は合流し、完了時に全員に通知される"""
+    from src.app_scraper import handler
+
+    monkeypatch.delenv("TENANTS", raising=False)
+    runs = []
+
+    def workflow(phase=None, force_refresh=False):
+        runs.append(phase)
+        # 実行中に別のユーザーが同期ボタンを押す（ダブルクリックも含む）
+        for user in ("U2", "U2"):
+            response = handler(
+                {"user_id": user, "source": "slack_button"}, _context("req-2")
+            )
+            assert json.loads(response["body"]) == {"status": "coalesced"}
+        return {"phase": phase, "status": "completed"}
+
+    with (
+        patch("src.app_scraper.run_scraper_workflow", side_effect=workflow),
+        patch("src.app_scraper.send_slack_message") as mock_send,
+    ):
+        response = handler(
+            {"user_id": "U1", "source": "slack_button"}, _context("req-1")
+        )
+
+    assert runs == [None]
+    assert json.loads(response["body"])["status"] == "completed"
+    done = [c.args[0] for c in mock_send.call_args_list if "完了しました" in c.args[1]]
+    assert done == ["U1", "U2"]
+    # ロックは解放され、次の実行は取得できる
+    assert JobLock(backend, owner="req-3").acquire()
+
+
+def test_handler_releases_lock_on_failure(backend, monkeypatch):
+    from src.app_scraper import handler
+
+    monkeypatch.delenv("TENANTS", raising=False)
+    with (
+        patch("src.app_scraper.run_scraper_workflow", side_effect=RuntimeError("boom")),
+        patch("src.app_scraper.send_slack_message") as mock_send,
+    ):
+        handler({"user_id": "U1", "source": "slack_button"}, _context("req-1"))
+
+    assert mock_send.call_args.args == ("U1", "エラー発生！: boom")
+    assert JobLock(backend, owner="req-2").acquire()
@@ -0,0 +1,81 @@
+import pytest
+
+from src.utils.metrics import MemorySink, Metrics
+
+
+def test_stage_emits_emf_record():
+    sink = MemorySink()
+    metrics = Metrics(sink=sink)
+    metrics.set_property("RequestId", "req-1")
+
+    with metrics.stage("download") as m:
+        m.put("ZipBytes", 2048, "Bytes")
+
+    record = sink.records[0]
+    definition = record["_aws"]["CloudWatchMetrics"][0]
+    assert definition["Namespace"] == "AgriNoteSync"
+    assert definition["Dimensions"] == [["Stage"]]
+    assert {"Name": "ZipBytes", "Unit": "Bytes"} in definition["Metrics"]
+    assert record["Stage"] == "download"
+    assert record["RequestId"] == "req-1"
+    values = sink.values("download")
+    assert values["ZipBytes"] == 2048
+    assert values["Duration"] >= 0
+    assert values["StagePeakRSSGrowth"] >= 0
+    assert "PeakRSS" not in values
+
+
+def test_timed_records_even_when_failed():
+    """失敗した工程も所要時間を出力する"""
+    sink = MemorySink()
+    metrics = Metrics(sink=sink)
+
+    @metrics.timed("login")
+    def login():
+        raise RuntimeError("failed")
+
+    with pytest.raises(RuntimeError):
+        login()
+
+    assert "Duration" in sink.values("login")
+
+
+def test_rss_growth_excludes_earlier_peaks():
+    """作成前のピークは含めず、作成後に確保した分だけを数える"""
+    from src.utils.metrics import RssGrowth
+
+    earlier = bytearray(100 * 1024 * 1024)
+    earlier[::4096] = b"x" * len(earlier[::4096])
+    del earlier
+
+    growth = RssGrowth()
+    assert growth.peak_mb() < 50
+
+    buf = bytearray(30 * 1024 * 1024)
+    buf[::4096] = b"x" * len(buf[::4096])
+    assert growth.peak_mb() >= 25
+    del buf
+
+
+def _allocate(mb):
+    buf = bytearray(mb * 1024 * 1024)
+    buf[::4096] = b"x" * len(buf[::4096])
+    return buf
+
+
+def test_stage_reports_growth_of_its_own_stage():
+    """前の工程のピークは後の工程の値に残らず、入れ子の外側の工程には含まれる"""
+    sink = MemorySink()
+    metrics = Metrics(sink=sink)
+
+    with metrics.stage("workflow"):
+        with metrics.stage("parse"):
+            buf = _allocate(60)
+            del buf
+        with metrics.stage("write"):
+            pass
+
+    values = {r["Stage"]: r["StagePeakRSSGrowth"] for r in sink.records}
+    assert values["parse"] >= 50
+    assert values["write"] < 30
+    assert values["workflow"] >= 50
@@ -0,0 +1,91 @@
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from src.core.reader import ExcelReader
+
+
+@pytest.fixture
+def work_record_xlsx(tmp_path):
+    """作業記録エクスポートを模したExcelを作る"""
+    path = tmp_path / "作業記録.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["作業ID", "日付", "作業時間", "作業者", "面積", "メモ"])
+    ws.append([1, datetime(2026, 2, 1), time(1, 30), "鈴木", 10.5, "a"])
+    ws.append([2, datetime(2026, 2, 2), timedelta(hours=26), "木下", None, None])
+    ws.append([3, datetime(2026, 2, 3), None, "鈴木", 3, "c"])
+    wb.save(path)
+    return path
+
+
+def test_read_applies_schema_types(work_record_xlsx):
+    reader = ExcelReader(engine="openpyxl")
+
+    df = reader.read(work_record_xlsx)
+
+    assert df["作業ID"].tolist() == ["1", "2", "3"]
+    assert pd.api.types.is_datetime64_any_dtype(df["日付"])
+    assert pd.api.types.is_timedelta64_dtype(df["作業時間"])
+    assert df["作業時間"].iloc[0] == pd.Timedelta(minutes=90)
+    assert df["作業時間"].iloc[1] == pd.Timedelta(hours=26)
+    assert pd.isna(df["作業時間"].iloc[2])
+    assert isinstance(df["作業者"].dtype, pd.CategoricalDtype)
+    assert pd.isna(df["面積"].iloc[1])
+    # スキーマに無い列もそのまま残る
+    assert df["メモ"].tolist()[0] == "a"
+
+
+def test_read_reports_stats(work_record_xlsx):
+    reader = ExcelReader(engine="openpyxl", profile=True)
+
+    reader.read(work_record_xlsx)
+
+    assert reader.stats["engine"] == "openpyxl"
+    assert reader.stats["rows"] == 3
+    assert reader.stats["rows_per_sec"] > 0
+    assert reader.stats["peak_memory_mb"] is not None
+
+
+def test_auto_engine_falls_back_to_openpyxl(monkeypatch):
+    monkeypatch.setattr("src.core.reader._has_calamine", lambda: False)
+
+    assert ExcelReader(engine="auto").engine == "openpyxl"
+
+
+def test_lean_read_converts_in_chunks(work_record_xlsx, monkeypatch):
+    """省メモリモードはチャンクごとに変換して繋ぎ、値・型は通常の読込と同じ"""
+    import src.core.reader as reader_module
+
+    monkeypatch.setattr(reader_module, "LEAN_CHUNK_ROWS", 2)
+
+    expected = ExcelReader(engine="openpyxl").read(work_record_xlsx)
+    df = ExcelReader(engine="openpyxl", lean=True).read(work_record_xlsx)
+
+    assert df.dtypes.to_dict() == expected.dtypes.to_dict()
+    assert df.astype(str).equals(expected.astype(str))
+    assert df["作業者"].cat.categories.tolist() == ["木下", "鈴木"]
+
+
+@pytest.mark.parametrize("engine", ["openpyxl", "calamine"])
+def test_engines_return_same_frame(work_record_xlsx, engine):
+    """どちらのエンジンでも整数は整数のまま読み込まれる（作業IDが"1.0"にならない）"""
+    if engine == "calamine":
+        pytest.importorskip("python_calamine")
+
+    df = ExcelReader(engine=engine).read(work_record_xlsx)
+    expected = ExcelReader(engine="openpyxl").read(work_record_xlsx)
+
+    assert df["作業ID"].tolist() == ["1", "2", "3"]
+    assert df["面積"].tolist()[::2] == [10.5, 3]
+    assert df.dtypes.to_dict() == expected.dtypes.to_dict()
+    assert df.astype(str).equals(expected.astype(str))
+
+
+def test_calamine_whole_floats_become_int():
+    from src.core.reader import _calamine_cell
+
+    assert [_calamine_cell(v) for v in [1.0, 1.5, "1.0", None]] == [1, 1.5, "1.0", None]
+    assert isinstance(_calamine_cell(3.0), int)
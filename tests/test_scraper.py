@@ -66,3 +66,287 @@ def test_extract_excel_from_zip(tmp_path):
     # 3. 検証
     assert os.path.exists(result_path)
     assert "作業者" in result_path
+
+
+def test_extract_excel_streams_large_member_and_cleanup(tmp_path, monkeypatch):
+    """チャンクをまたぐサイズでも内容が一致し、cleanupで解凍先が消える"""
+    import src.core.scraper as scraper_module
+
+    extract_dir = tmp_path / "extracted"
+    monkeypatch.setattr(scraper_module, "EXTRACT_DIR", str(extract_dir))
+    monkeypatch.setattr(scraper_module, "CHUNK_SIZE", 1024)
+    scraper = AgriNoteScraper(MagicMock())
+
+    zip_path = tmp_path / "test.zip"
+    content = os.urandom(10 * 1024 + 7)
+    with zipfile.ZipFile(zip_path, "w") as z:
+        z.writestr("作業記録２ 作業者.xlsx", content)
+
+    result_path = scraper._extract_excel(str(zip_path), target_keyword="作業者")
+
+    with open(result_path, "rb") as f:
+        assert f.read() == content
+
+    scraper.cleanup()
+    assert not extract_dir.exists()
+
+
+def test_extract_workbooks_returns_each_keyword(tmp_path, monkeypatch):
+    """設定したキーワードごとのExcelを抽出し、指定したキーワードが優先される"""
+    import src.core.scraper as scraper_module
+    from benchmarks.synthetic import make_export_zip
+
+    monkeypatch.setattr(scraper_module, "EXTRACT_DIR", str(tmp_path / "extracted"))
+    zip_path = make_export_zip(tmp_path / "export.zip", rows=5, tmp_dir=tmp_path)
+
+    found = AgriNoteScraper(MagicMock())._extract_workbooks(
+        zip_path, ("作業者", "圃場", "存在しない")
+    )
+
+    assert set(found) == {"作業者", "圃場"}
+    assert found["作業者"].endswith("作業記録２ 作業者.xlsx")
+    assert found["圃場"].endswith("作業記録１ 圃場.xlsx")
+    assert all(os.path.exists(p) for p in found.values())
+
+    # 以前は引数に関わらず「作業者」で上書きされていた
+    path = AgriNoteScraper(MagicMock())._extract_excel(zip_path, "資材")
+    assert path.endswith("資材.xlsx")
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _status_response(status, url="https://agri-note.jp/api/export/status?id=1"):
+    response = MagicMock(url=url, headers={"content-type": "application/json"})
+    response.json.return_value = {"status": status}
+    return response
+
+
+def _watcher(monkeypatch, **kwargs):
+    from src.core.scraper import ExportWatcher
+
+    clock = _FakeClock()
+    monkeypatch.setattr("src.core.scraper.time.monotonic", clock)
+    watcher = ExportWatcher(MagicMock(), **kwargs)
+    watcher.start()
+    return watcher, clock
+
+
+def test_export_watcher_waits_with_backoff(monkeypatch):
+    """リンクが出るまで待機時間を延ばしながら待ち、生成時間を返す"""
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    watcher, clock = _watcher(monkeypatch)
+    link = MagicMock()
+    timeouts = []
+
+    def wait_for(state, timeout):
+        timeouts.append(timeout)
+        clock.now += timeout / 1000
+        # 状況確認の通信が届く
+        watcher._on_response(MagicMock(url="https://agri-note.jp/api/export/status"))
+        if len(timeouts) < 4:
+            raise PlaywrightTimeoutError("not yet")
+
+    link.wait_for.side_effect = wait_for
+
+    seconds = watcher.wait(link)
+
+    assert timeouts == [500, 750, 1125, 1687.5]
+    assert seconds == pytest.approx(4.0625)
+    assert watcher.status_responses == 4
+
+
+def test_export_watcher_detects_stall(monkeypatch):
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    from src.utils.error import ScrapeError
+
+    watcher, clock = _watcher(monkeypatch, stall_timeout=10, deadline=300)
+    # 状況確認が2回届いた後に途絶える
+    for _ in range(2):
+        watcher._on_response(_status_response("running"))
+    link = MagicMock()
+
+    def wait_for(state, timeout):
+        clock.now += timeout / 1000
+        raise PlaywrightTimeoutError("not yet")
+
+    link.wait_for.side_effect = wait_for
+
+    with pytest.raises(ScrapeError, match="途絶えました"):
+        watcher.wait(link)
+    assert clock.now < 20
+
+
+def test_export_watcher_deadline_without_status_calls(monkeypatch):
+    """状況確認の通信が無い場合は停止判定をせず全体の期限で打ち切る"""
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    from src.utils.error import ScrapeError
+
+    watcher, clock = _watcher(monkeypatch, stall_timeout=1, deadline=30)
+    link = MagicMock()
+
+    def wait_for(state, timeout):
+        clock.now += timeout / 1000
+        raise PlaywrightTimeoutError("not yet")
+
+    link.wait_for.side_effect = wait_for
+
+    with pytest.raises(ScrapeError, match="30秒以内"):
+        watcher.wait(link)
+
+
+def test_request_then_fetch_in_later_invocation(monkeypatch, tmp_path):
+    """生成要求と取得を別の実行（別のスクレイパー）に分けられる"""
+    import src.core.scraper as scraper_module
+
+    monkeypatch.setattr(scraper_module, "DOWNLOAD_DIR", str(tmp_path))
+    page = MagicMock()
+    pending = AgriNoteScraper(page).request_export()
+
+    assert pending["since"] is None
+    page.get_by_role.assert_called_with("button", name="生成")
+
+    # 後続の実行: エクスポート画面を開き直してリンクを待つ
+    page = MagicMock()
+    download = page.expect_download.return_value.__enter__.return_value.value
+    download.suggested_filename = "export.zip"
+    download.save_as.side_effect = lambda path: open(path, "wb").close()
+    scraper = AgriNoteScraper(page)
+    scraper._extract_excel = MagicMock(return_value="/tmp/extracted/x.xlsx")
+
+    assert scraper.fetch_export(deadline=5) == "/tmp/extracted/x.xlsx"
+    page.goto.assert_called_with("https://agri-note.jp/b/export.html#/top")
+    assert not any(
+        c.kwargs.get("name") == "生成" for c in page.get_by_role.call_args_list
+    )
+    assert not (tmp_path / "export.zip").exists()
+
+
+def test_export_watcher_deadline_is_not_ready_error(monkeypatch):
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    from src.utils.error import ExportNotReadyError
+
+    watcher, clock = _watcher(monkeypatch, stall_timeout=1, deadline=5)
+    link = MagicMock()
+
+    def wait_for(state, timeout):
+        clock.now += timeout / 1000
+        raise PlaywrightTimeoutError("not yet")
+
+    link.wait_for.side_effect = wait_for
+
+    with pytest.raises(ExportNotReadyError):
+        watcher.wait(link)
+
+
+def test_export_watcher_single_matching_response_does_not_arm_stall(monkeypatch):
+    """生成依頼など1回だけpatternsに一致した通信では停止判定をせず期限まで待つ"""
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    from src.utils.error import ExportNotReadyError
+
+    watcher, clock = _watcher(monkeypatch, stall_timeout=10, deadline=120)
+    watcher._on_response(
+        MagicMock(url="https://agri-note.jp/api/export", headers={"content-type": ""})
+    )
+    watcher._on_response(_status_response("running"))
+    link = MagicMock()
+
+    def wait_for(state, timeout):
+        clock.now += timeout / 1000
+        raise PlaywrightTimeoutError("not yet")
+
+    link.wait_for.side_effect = wait_for
+
+    with pytest.raises(ExportNotReadyError):
+        watcher.wait(link)
+    assert clock.now > 120
+
+
+def test_export_watcher_ready_from_status_body(monkeypatch):
+    """状況確認のstatusが"done"になったら、リンクの表示を期限まで1回で待つ"""
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    watcher, clock = _watcher(monkeypatch, deadline=120)
+    link = MagicMock()
+    timeouts = []
+
+    def wait_for(state, timeout):
+        timeouts.append(timeout)
+        clock.now += 1
+        if len(timeouts) == 1:
+            watcher._on_response(_status_response("done"))
+            raise PlaywrightTimeoutError("not yet")
+
+    link.wait_for.side_effect = wait_for
+
+    watcher.wait(link)
+
+    assert watcher.ready
+    assert timeouts[0] == 500
+    assert timeouts[1] == pytest.approx(119000)
+
+
+def test_export_watcher_ignores_other_urls_and_uses_configured_statuses(monkeypatch):
+    """既定では状況確認APIのパスだけを数え、完了のstatusは環境変数で変えられる"""
+    from src.core.scraper import AgriNoteScraper, ExportWatcher
+
+    watcher = ExportWatcher(MagicMock())
+    for url in (
+        "https://agri-note.jp/b/export.html#/top",
+        "https://agri-note.jp/static/export.js",
+        "https://analytics.example.com/collect?page=export",
+    ):
+        watcher._on_response(_status_response("done", url))
+    assert watcher.status_responses == 0
+    assert not watcher.ready
+
+    monkeypatch.setenv("EXPORT_READY_STATUSES", "completed,finished")
+    scraper = AgriNoteScraper(MagicMock())
+    watcher = ExportWatcher(
+        MagicMock(),
+        patterns=scraper.export_status_patterns,
+        ready_statuses=scraper.export_ready_statuses,
+    )
+    watcher._on_response(_status_response("done"))
+    assert not watcher.ready
+    watcher._on_response(_status_response("finished"))
+    assert watcher.ready
+
+
+def test_fetch_export_ignores_links_from_earlier_exports(monkeypatch, tmp_path):
+    """生成を要求する前から表示されていたリンクは今回の生成物として扱わない"""
+    import src.core.scraper as scraper_module
+
+    monkeypatch.setattr(scraper_module, "DOWNLOAD_DIR", str(tmp_path))
+    page = MagicMock()
+    links = page.get_by_role.return_value
+    links.evaluate_all.return_value = ["/download/old.zip"]
+    pending = AgriNoteScraper(page).request_export()
+
+    assert pending["stale_links"] == ["/download/old.zip"]
+
+    # 後続の実行: 以前のリンクを除いたリンクを待つ
+    page = MagicMock()
+    download = page.expect_download.return_value.__enter__.return_value.value
+    download.suggested_filename = "export.zip"
+    download.save_as.side_effect = lambda path: open(path, "wb").close()
+    scraper = AgriNoteScraper(page)
+    scraper._extract = MagicMock(return_value="/tmp/extracted/x.xlsx")
+    scraper.fetch_export(deadline=5, pending=pending)
+
+    page.locator.assert_any_call(
+        'a:not([href="/download/old.zip"]):has-text("ダウンロード")'
+    )
+    link = page.locator.return_value.first
+    link.wait_for.assert_called()
+    link.click.assert_called_once()
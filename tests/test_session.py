@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from src.core.scraper import AgriNoteScraper
+from src.core.session import LocalSessionStore, StateSessionStore
+from src.core.state import LocalStateStore
+
+STATE = {
+    "cookies": [{"name": "sid", "value": "abc", "domain": "agri-note.jp", "path": "/"}],
+    "origins": [],
+}
+
+
+def test_session_store_roundtrip_is_encrypted(tmp_path):
+    path = tmp_path / "session.bin"
+    store = LocalSessionStore(str(path), secret="secret")
+
+    store.save(STATE)
+
+    assert b"abc" not in path.read_bytes()
+    assert LocalSessionStore(str(path), secret="secret").load() == STATE
+    # 鍵が違う場合は読めずに破棄される
+    assert LocalSessionStore(str(path), secret="other").load() is None
+    assert not path.exists()
+
+
+def test_state_session_store_is_shared_through_state_store(tmp_path):
+    """状態ストアの同じキーを読めば別の実行（コンテナ）でも同じセッションを使える"""
+    state_path = str(tmp_path / "state.json")
+    StateSessionStore(LocalStateStore(state_path), secret="secret").save(STATE)
+
+    store = StateSessionStore(LocalStateStore(state_path), secret="secret")
+
+    assert b"abc" not in (tmp_path / "session.bin").read_bytes()
+    assert store.load() == STATE
+    store.clear()
+    assert store.load() is None
+
+
+def test_ensure_login_skips_login_with_valid_session(tmp_path):
+    store = LocalSessionStore(str(tmp_path / "session.bin"), secret="secret")
+    store.save(STATE)
+    page = MagicMock()
+    scraper = AgriNoteScraper(page)
+
+    logged_in = scraper.ensure_login("id", "pass", store=store)
+
+    assert logged_in is False
+    page.context.add_cookies.assert_called_once_with(STATE["cookies"])
+    assert not page.get_by_role.called
+
+
+def test_ensure_login_falls_back_when_session_expired(tmp_path):
+    store = LocalSessionStore(str(tmp_path / "session.bin"), secret="secret")
+    store.save(STATE)
+    page = MagicMock()
+    # 1回目（セッション確認）はタイムアウト、2回目（ログイン後）は成功
+    page.wait_for_selector.side_effect = [PlaywrightTimeoutError("expired"), None]
+    page.context.storage_state.return_value = {"cookies": [], "origins": []}
+    scraper = AgriNoteScraper(page)
+
+    logged_in = scraper.ensure_login("id", "pass", store=store)
+
+    assert logged_in is True
+    assert store.load() == {"cookies": [], "origins": []}
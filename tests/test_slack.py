@@ -12,4 +12,18 @@ def test_app_slack_invalid_signature():
         "body": "payload=..."
     }
     response = handler(event, None)
-    assert response["statusCode"] == 401
\ No newline at end of file
+    assert response["statusCode"] == 401
+
+def test_lambda_client_is_created_once(monkeypatch):
+    """boto3のクライアントはボタン押下ごとではなく1回だけ作る"""
+    from unittest.mock import patch
+
+    import src.app_slack as app_slack
+
+    monkeypatch.setattr(app_slack, "_lambda_client", None)
+    with patch("boto3.client") as mock_client:
+        first = app_slack.get_lambda_client()
+        second = app_slack.get_lambda_client()
+
+    assert first is second
+    assert mock_client.call_count == 1
@@ -0,0 +1,314 @@
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src.app_scraper import PENDING_EXPORT_KEY, run_scraper_workflow
+from src.core.state import LocalStateStore, make_state_store
+from src.utils.error import ExportNotReadyError, ScrapeError
+
+PENDING = {"requested_at": "2026-03-01T06:00:00", "since": None, "until": "2026-03-01"}
+
+
+def test_local_state_store_roundtrip(tmp_path):
+    path = tmp_path / "state.json"
+    store = LocalStateStore(str(path))
+
+    assert store.get("x") is None
+    store.set("x", {"a": 1})
+    assert LocalStateStore(str(path)).get("x") == {"a": 1}
+    store.delete("x")
+    assert store.get("x", "none") == "none"
+
+
+def test_local_state_store_ignores_broken_file(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("{broken")
+
+    assert LocalStateStore(str(path)).get("x") is None
+
+
+def test_make_state_store_defaults_to_local(monkeypatch, tmp_path):
+    monkeypatch.delenv("STATE_BUCKET", raising=False)
+    monkeypatch.setenv("STATE_PATH", str(tmp_path / "state.json"))
+
+    store = make_state_store()
+
+    assert isinstance(store, LocalStateStore)
+    assert store.path == str(tmp_path / "state.json")
+
+
+@pytest.fixture
+def workflow(monkeypatch, tmp_path):
+    """ブラウザ・シートをモックにしてワークフローを動かす"""
+    monkeypatch.setenv("STATE_PATH", str(tmp_path / "state.json"))
+    monkeypatch.setenv("SESSION_PATH", str(tmp_path / "session.bin"))
+    monkeypatch.setenv("HISTORY_PATH", str(tmp_path / "history.pkl"))
+    monkeypatch.delenv("STATE_BUCKET", raising=False)
+    monkeypatch.delenv("EXPORT_WINDOW", raising=False)
+    monkeypatch.delenv("WRITE_MODE", raising=False)
+    monkeypatch.delenv("PARTITION_BY", raising=False)
+    monkeypatch.delenv("EXPORT_API_REQUEST_URL", raising=False)
+    monkeypatch.delenv("EXPORT_API_STATUS_URL", raising=False)
+    with (
+        patch("src.core.browser.BrowserManager"),
+        patch("src.core.scraper.AgriNoteScraper") as MockScraper,
+        patch("src.core.writer.SpreadSheetWriter") as MockWriter,
+        patch("src.core.reader.ExcelReader") as MockReader,
+    ):
+        MockReader.return_value.read.return_value = pd.DataFrame(
+            [{"作業ID": "001", "日付": "2026-02-01", "作業者": "鈴木"}]
+        )
+        # シートごとに別のwriterを返す
+        writers = {}
+
+        def make_writer(worksheet_name="作業記録", spreadsheet_id=None):
+            key = (spreadsheet_id, worksheet_name) if spreadsheet_id else worksheet_name
+            return writers.setdefault(key, MagicMock(worksheet_name=worksheet_name))
+
+        MockWriter.side_effect = make_writer
+        yield MockScraper.return_value, writers
+
+
+def test_request_phase_saves_pending_export(workflow):
+    scraper, writers = workflow
+    scraper.request_export.return_value = PENDING
+
+    result = run_scraper_workflow(phase="request")
+
+    assert result["status"] == "requested"
+    assert LocalStateStore().get(PENDING_EXPORT_KEY) == PENDING
+    # ログインは保存済みセッション経由で行う
+    assert scraper.ensure_login.call_args.kwargs["store"] is not None
+    assert not scraper.fetch_export.called
+    assert not writers
+
+
+def test_download_phase_resumes_and_clears_pending(workflow):
+    scraper, writers = workflow
+    LocalStateStore().set(PENDING_EXPORT_KEY, PENDING)
+    scraper.fetch_export.return_value = {"作業者": "/tmp/extracted/x.xlsx"}
+
+    result = run_scraper_workflow(phase="download")
+
+    assert result["status"] == "completed"
+    assert not scraper.request_export.called
+    assert writers["作業記録"].write_all.called
+    assert LocalStateStore().get(PENDING_EXPORT_KEY) is None
+
+
+def test_download_phase_uses_session_saved_by_request_phase(workflow, monkeypatch):
+    """セッションは参照情報と同じ状態ストアに保存し、次のphaseでも同じものを使う"""
+    monkeypatch.setenv("SESSION_SECRET", "secret")
+    scraper, _ = workflow
+    scraper.request_export.return_value = PENDING
+    run_scraper_workflow(phase="request")
+    store = scraper.ensure_login.call_args.kwargs["store"]
+    store.save({"cookies": [{"name": "sid", "value": "abc"}]})
+
+    scraper.fetch_export.return_value = {"作業者": "/tmp/extracted/x.xlsx"}
+    run_scraper_workflow(phase="download")
+
+    resumed = scraper.ensure_login.call_args.kwargs["store"]
+    assert resumed is not store
+    assert resumed.load() == {"cookies": [{"name": "sid", "value": "abc"}]}
+
+
+def test_download_phase_keeps_pending_when_not_ready(workflow):
+    scraper, writers = workflow
+    LocalStateStore().set(PENDING_EXPORT_KEY, PENDING)
+    scraper.fetch_export.side_effect = ExportNotReadyError("not yet")
+
+    result = run_scraper_workflow(phase="download")
+
+    assert result["status"] == "pending"
+    assert not writers["作業記録"].write_all.called
+    assert LocalStateStore().get(PENDING_EXPORT_KEY) == PENDING
+
+
+def test_download_phase_without_pending_export(workflow):
+    scraper, writers = workflow
+
+    result = run_scraper_workflow(phase="download")
+
+    assert result["status"] == "no_pending_export"
+    assert not scraper.ensure_login.called
+
+
+def test_unknown_phase_is_rejected(workflow):
+    with pytest.raises(ValueError):
+        run_scraper_workflow(phase="other")
+
+
+def test_each_workbook_is_written_to_its_own_sheet(workflow, monkeypatch):
+    scraper, writers = workflow
+    monkeypatch.setenv("EXPORT_WORKBOOKS", "圃場:圃場一覧,資材")
+    scraper.download_report.return_value = {
+        "作業者": "/tmp/extracted/a.xlsx",
+        "圃場": "/tmp/extracted/b.xlsx",
+        "資材": "/tmp/extracted/c.xlsx",
+    }
+
+    result = run_scraper_workflow()
+
+    assert scraper.download_report.call_args.kwargs["keywords"] == (
+        "作業者",
+        "圃場",
+        "資材",
+    )
+    assert set(writers) == {"作業記録", "圃場一覧", "資材"}
+    assert all(w.write_all.called for w in writers.values())
+    assert result["sheets"] == {"作業記録": 1, "圃場一覧": 1, "資材": 1}
+
+
+def test_missing_work_record_workbook_fails(workflow):
+    scraper, writers = workflow
+    scraper.download_report.return_value = {"圃場": "/tmp/extracted/b.xlsx"}
+
+    with pytest.raises(ScrapeError):
+        run_scraper_workflow()
+    assert not writers["作業記録"].write_all.called
+
+
+def test_unchanged_export_skips_parse_and_write(workflow, monkeypatch):
+    scraper, writers = workflow
+    scraper.download_report.return_value = {"作業者": "/tmp/extracted/a.xlsx"}
+    scraper.last_fingerprints = {"作業者": "0badcafe-100"}
+
+    first = run_scraper_workflow()
+    second = run_scraper_workflow()
+    forced = run_scraper_workflow(force_refresh=True)
+
+    assert first["noop"] is False
+    assert second == {
+        "phase": None,
+        "status": "completed",
+        "noop": True,
+        "skipped": "crc",
+    }
+    assert forced["noop"] is False
+    assert writers["作業記録"].write_all.call_count == 2
+
+
+def test_same_content_with_new_crc_skips_write(workflow):
+    """xlsxのメタデータだけが変わった場合は読込後の内容で判定する"""
+    scraper, writers = workflow
+    scraper.download_report.return_value = {"作業者": "/tmp/extracted/a.xlsx"}
+    scraper.last_fingerprints = {"作業者": "0badcafe-100"}
+    run_scraper_workflow()
+
+    scraper.last_fingerprints = {"作業者": "feedface-101"}
+    result = run_scraper_workflow()
+
+    assert result["noop"] is True
+    assert result["skipped"] == "content"
+    # 次回は新しいCRCで読込から省略できる
+    assert run_scraper_workflow()["skipped"] == "crc"
+    assert writers["作業記録"].write_all.call_count == 1
+
+
+def test_partitioned_mode_writes_through_partitions(workflow, monkeypatch):
+    """PARTITION_BYが指定されていれば年ごとのシートに分けて書き込む"""
+    from src.app_scraper import run_scraper_workflow
+
+    scraper, writers = workflow
+    scraper.download_report.return_value = {"作業者": "/tmp/a.xlsx"}
+    monkeypatch.setenv("PARTITION_BY", "year")
+    writers["作業記録"] = MagicMock(worksheet_name="作業記録")
+    writers["作業記録"].write_partitioned.return_value = {
+        "rows": {"作業記録_2026": 1},
+        "rewritten": ["作業記録_2026"],
+    }
+
+    result = run_scraper_workflow()
+
+    assert not writers["作業記録"].write_all.called
+    assert writers["作業記録"].write_partitioned.call_args.kwargs == {"force": False}
+    assert result["sheets"] == {"作業記録_2026": 1}
+    assert result["rewritten"] == ["作業記録_2026"]
+
+
+def test_workflow_reports_memory_growth_per_10k_rows(workflow):
+    """読込前からのピークRSSの増分を行数と合わせて出力する"""
+    from src.app_scraper import run_scraper_workflow
+    from src.utils.metrics import MemorySink, metrics
+
+    scraper, _ = workflow
+    scraper.download_report.return_value = {"作業者": "/tmp/a.xlsx"}
+    sink, original = MemorySink(), metrics.sink
+    metrics.set_sink(sink)
+    try:
+        run_scraper_workflow()
+    finally:
+        metrics.set_sink(original)
+
+    values = sink.values("memory")
+    assert values["Rows"] == 1
+    assert values["PeakRSSGrowth"] < 200
+    assert values["PeakRSSGrowthPer10kRows"] == round(
+        values["PeakRSSGrowth"] * 10000, 1
+    )
+    assert "PeakRSSPer10kRows" not in values
+
+
+def _saved_session(monkeypatch):
+    from src.core.session import StateSessionStore
+
+    monkeypatch.setenv("SESSION_SECRET", "secret")
+    monkeypatch.setenv("EXPORT_API_REQUEST_URL", "https://example.com/export")
+    monkeypatch.setenv("EXPORT_API_STATUS_URL", "https://example.com/export/{id}")
+    StateSessionStore(LocalStateStore()).save(
+        {"cookies": [{"name": "sid", "value": "abc"}]}
+    )
+
+
+def test_saved_session_fetches_without_browser(workflow, monkeypatch):
+    """保存済みセッションがあればChromiumを起動せずにHTTPで取得する"""
+    _saved_session(monkeypatch)
+    scraper, writers = workflow
+    scraper.download_http.return_value = {"作業者": "/tmp/a.xlsx"}
+
+    with patch("src.core.browser.BrowserManager") as MockBrowser:
+        result = run_scraper_workflow()
+
+    assert result["status"] == "completed"
+    MockBrowser.assert_not_called()
+    scraper.ensure_login.assert_not_called()
+    assert scraper.download_http.call_args.args[1] == [{"name": "sid", "value": "abc"}]
+    writers["作業記録"].write_all.assert_called_once()
+
+
+def test_saved_session_http_failure_falls_back_to_browser(workflow, monkeypatch):
+    """保存済みセッションでの取得に失敗したらブラウザでログインし直す"""
+    _saved_session(monkeypatch)
+    scraper, writers = workflow
+    scraper.download_http.side_effect = ScrapeError("401")
+    scraper.download_report.return_value = {"作業者": "/tmp/a.xlsx"}
+
+    with patch("src.core.browser.BrowserManager") as MockBrowser:
+        result = run_scraper_workflow()
+
+    assert result["status"] == "completed"
+    MockBrowser.assert_called_once()
+    scraper.ensure_login.assert_called_once()
+    assert scraper.download_report.call_args.kwargs["http_client"] is not None
+
+
+def test_force_refresh_exports_full_period(workflow, monkeypatch):
+    """force_refreshでは履歴があっても全期間をエクスポートする"""
+    from datetime import date
+
+    from src.core.history import HistorySnapshot
+
+    monkeypatch.setenv("EXPORT_WINDOW", "7")
+    HistorySnapshot(store=LocalStateStore()).save(
+        pd.DataFrame([{"作業ID": "001", "日付": "2026-02-01"}]), date.today()
+    )
+    scraper, _ = workflow
+    scraper.download_report.return_value = {"作業者": "/tmp/a.xlsx"}
+
+    run_scraper_workflow()
+    assert scraper.download_report.call_args.kwargs["since"] is not None
+
+    run_scraper_workflow(force_refresh=True)
+    assert scraper.download_report.call_args.kwargs["since"] is None
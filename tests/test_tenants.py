@@ -0,0 +1,153 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src.app_scraper import handler, run_tenants_workflow
+from src.core.tenants import context_slots, load_tenants, summarize
+from src.utils.error import AgriNoteError, LoginError
+
+TENANTS = [
+    {"name": "farm-a", "user_id": "a", "password": "pa", "spreadsheet_id": "sheet-a"},
+    {"name": "farm-b", "user_id": "b", "password": "pb", "spreadsheet_id": "sheet-b"},
+    {"name": "farm-c", "user_id": "c", "password": "pc", "spreadsheet_id": "sheet-c"},
+]
+
+
+def test_load_tenants_from_env(monkeypatch):
+    monkeypatch.setenv("FARM_B_PASS", "secret")
+    monkeypatch.setenv(
+        "TENANTS",
+        json.dumps(
+            [
+                {"user_id": "a", "password": "pa", "spreadsheet_id": "s1"},
+                {"user_id": "b", "password_env": "FARM_B_PASS", "spreadsheet_id": "s2"},
+            ]
+        ),
+    )
+
+    tenants = load_tenants()
+
+    assert [t["name"] for t in tenants] == ["a", "b"]
+    assert tenants[1]["password"] == "secret"
+
+
+def test_load_tenants_validation(monkeypatch):
+    monkeypatch.delenv("TENANTS", raising=False)
+
+    assert load_tenants() == []
+    with pytest.raises(AgriNoteError, match="spreadsheet_id"):
+        load_tenants([{"user_id": "a", "password": "p"}])
+    with pytest.raises(AgriNoteError, match="重複"):
+        load_tenants([TENANTS[0], TENANTS[0]])
+
+
+def test_context_slots_bounded_by_memory(monkeypatch):
+    monkeypatch.delenv("MAX_CONTEXTS", raising=False)
+    monkeypatch.delenv("BASE_MEMORY_MB", raising=False)
+    monkeypatch.delenv("CONTEXT_MEMORY_MB", raising=False)
+
+    assert context_slots(2048) == 5
+    assert context_slots(512) == 1
+    monkeypatch.setenv("MAX_CONTEXTS", "2")
+    assert context_slots(4096) == 2
+
+
+def test_summarize_reports_each_tenant():
+    text = summarize(
+        [
+            {"name": "farm-a", "status": "completed", "sheets": {"作業記録": 10}},
+            {"name": "farm-b", "status": "failed", "error": "生成要求: ログイン失敗"},
+        ]
+    )
+
+    assert text.splitlines() == [
+        "アグリノート同期結果（成功 1/2）",
+        "✅ farm-a: 作業記録 10行",
+        "❌ farm-b: 生成要求: ログイン失敗",
+    ]
+
+
+@pytest.fixture
+def tenants_env(monkeypatch, tmp_path):
+    """ブラウザ・シートをモックにして複数アカウントの同期を動かす"""
+    monkeypatch.setenv("LOCK_PATH", str(tmp_path / "lock.db"))
+    monkeypatch.setenv("STATE_PATH", str(tmp_path / "state.json"))
+    monkeypatch.delenv("STATE_BUCKET", raising=False)
+    monkeypatch.delenv("LOCK_TABLE", raising=False)
+    monkeypatch.setenv("MAX_CONTEXTS", "2")
+    monkeypatch.delenv("EXPORT_WINDOW", raising=False)
+    monkeypatch.delenv("WRITE_MODE", raising=False)
+    monkeypatch.delenv("EXPORT_WORKBOOKS", raising=False)
+    calls = []
+
+    def ensure_login(user_id, *args, **kwargs):
+        if user_id == "b":
+            raise LoginError("ログイン失敗")
+
+    def make_scraper(page):
+        scraper = MagicMock()
+        scraper.ensure_login.side_effect = ensure_login
+        scraper.request_export.side_effect = lambda **k: calls.append("request")
+        scraper.fetch_export.side_effect = lambda **k: (
+            calls.append("fetch") or {"作業者": "/tmp/extracted/x.xlsx"}
+        )
+        return scraper
+
+    writers = {}
+
+    def make_writer(worksheet_name="作業記録", spreadsheet_id=None):
+        return writers.setdefault(
+            (spreadsheet_id, worksheet_name), MagicMock(worksheet_name=worksheet_name)
+        )
+
+    with (
+        patch("src.core.browser.BrowserManager") as MockBrowser,
+        patch("src.core.scraper.AgriNoteScraper", side_effect=make_scraper),
+        patch("src.core.writer.SpreadSheetWriter", side_effect=make_writer),
+        patch("src.core.reader.ExcelReader") as MockReader,
+    ):
+        MockReader.return_value.read.return_value = pd.DataFrame(
+            [{"作業ID": "001", "日付": "2026-02-01", "作業者": "鈴木"}]
+        )
+        browser = MockBrowser.return_value.__enter__.return_value
+        yield browser, calls, writers
+
+
+def test_tenants_share_one_browser_and_report_failures(tenants_env):
+    browser, calls, writers = tenants_env
+
+    report = run_tenants_workflow(TENANTS)
+
+    assert [r["status"] for r in report] == ["completed", "failed", "completed"]
+    assert "ログイン失敗" in report[1]["error"]
+    assert report[0]["sheets"] == {"作業記録": 1}
+    # 同時2コンテキスト: a,bの生成要求 → aの取得 → cの生成要求 → cの取得
+    assert calls == [
+        "request",
+        "fetch",
+        "request",
+        "fetch",
+    ]
+    # アカウントごとに独立したコンテキスト、すべて閉じる
+    assert browser.new_context.call_count == 3
+    assert browser.new_context.return_value.close.call_count == 3
+    assert writers[("sheet-a", "作業記録")].write_all.called
+    assert not writers[("sheet-b", "作業記録")].write_all.called
+    assert writers[("sheet-c", "作業記録")].write_all.called
+
+
+def test_handler_sends_one_summary(tenants_env, monkeypatch):
+    monkeypatch.setenv("ADMIN_CHANNEL_ID", "C-ADMIN")
+    event = {"source": "eventbridge-scheduled", "tenants": TENANTS}
+
+    with patch("src.app_scraper.send_slack_message") as mock_send:
+        response = handler(event, MagicMock(aws_request_id="req-1"))
+
+    mock_send.assert_called_once()
+    channel, text = mock_send.call_args.args
+    assert channel == "C-ADMIN"
+    assert "成功 2/3" in text
+    body = json.loads(response["body"])
+    assert [t["name"] for t in body["tenants"]] == ["farm-a", "farm-b", "farm-c"]
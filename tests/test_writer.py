@@ -1,11 +1,31 @@
+import json
+import os
 from unittest.mock import MagicMock, patch
+import pytest
 import pandas as pd
 
-from src.adapters.writer import SpreadSheetWriter
+from src.core.formatter import AgriNoteFormatter
+from src.core.writer import SpreadSheetWriter
 from src.utils.logger import logger
 
 
-def test_spreadsheet_writer_interface():
+def _has_credentials():
+    """実際のシートに接続できる環境変数（サービスアカウント）があるか"""
+    try:
+        account = json.loads(os.getenv("SERVICE_ACCOUNT_JSON", ""))
+    except ValueError:
+        return False
+    return bool(os.getenv("SPREADSHEET_ID")) and "client_email" in account
+
+
+@pytest.fixture
+def sheet_env(monkeypatch):
+    """認証をモックにする単体テスト用の環境変数"""
+    monkeypatch.setenv("SPREADSHEET_ID", "dummy")
+    monkeypatch.setenv("SERVICE_ACCOUNT_JSON", "{}")
+
+
+def test_spreadsheet_writer_interface(sheet_env):
     # 1. 初期化のテスト
     writer = SpreadSheetWriter()
 
@@ -13,6 +33,9 @@ def test_spreadsheet_writer_interface():
     assert hasattr(writer, "write_all")
 
 
+@pytest.mark.skipif(
+    not _has_credentials(), reason="実際のシートへの接続情報が無い（結合テスト）"
+)
 def test_spreadsheet_read_all():
     # 1. 初期化のテスト
     writer = SpreadSheetWriter()
@@ -30,7 +53,7 @@ def test_spreadsheet_read_all():
         logger.info("Sheet is empty, but call succeeded.")
 
 
-def test_read_all_empty_sheet_handling():
+def test_read_all_empty_sheet_handling(sheet_env):
     """シートがからの時もエラーにならず空のDFを返す"""
     # patchを使って、gspreadのサービスアカウント認証をバイパス
     with patch("gspread.service_account_from_dict"):
@@ -50,15 +73,16 @@ def test_read_all_empty_sheet_handling():
     pass
 
 
-def test_write_all_logic_with_mock_data():
+def test_write_all_logic_with_mock_data(sheet_env):
     """書き込み実行せずに内部ロジック（クリアと更新の呼び出し）をテスト"""
     # 1. 認証部分をモックに、インスタンス化を空振り
     with patch("gspread.service_account_from_dict"):
         writer = SpreadSheetWriter()
 
-        # 2. ワークシートをモックに差し替え
+        # 2. ワークシートをモックに差し替え（ステージングを使わない直接書込）
         mock_ws = MagicMock()
         writer._ws = mock_ws
+        writer.staging = False
 
         # 3. テスト用データ準備
         test_df = pd.DataFrame([{"作業ID": "T001", "内容": "テスト"}])
@@ -76,3 +100,536 @@ def test_write_all_logic_with_mock_data():
 
         # 第1引数が期待通り
         mock_ws.update.assert_called_with(expected_values)
+
+
+def _make_sync_writer(monkeypatch, sheet_values):
+    monkeypatch.setenv("SPREADSHEET_ID", "dummy")
+    monkeypatch.setenv("SERVICE_ACCOUNT_JSON", "{}")
+    writer = SpreadSheetWriter()
+    mock_ws = MagicMock()
+    mock_ws.get_all_values.return_value = sheet_values
+    mock_ws.row_count = 1000
+    writer._ws = mock_ws
+    writer.staging = False
+    return writer, mock_ws
+
+
+def test_sync_writes_only_changed_rows(monkeypatch):
+    """変更・追加・削除行だけが範囲更新される"""
+    writer, mock_ws = _make_sync_writer(
+        monkeypatch,
+        [
+            ["作業ID", "内容"],
+            ["T001", "剪定"],
+            ["T002", "消毒"],
+            ["T003", "収穫"],
+        ],
+    )
+    # T002を変更、T003を削除、T004を追加
+    df = pd.DataFrame(
+        [
+            {"作業ID": "T001", "内容": "剪定"},
+            {"作業ID": "T002", "内容": "防除"},
+            {"作業ID": "T004", "内容": "出荷"},
+        ]
+    )
+
+    result = writer.sync(df)
+
+    assert result == {"inserted": 1, "updated": 1, "deleted": 1, "rows_touched": 2}
+    assert not mock_ws.clear.called
+    mock_ws.batch_update.assert_called_once_with(
+        [{"range": "A3:B4", "values": [["T002", "防除"], ["T004", "出荷"]]}]
+    )
+    assert not mock_ws.batch_clear.called
+
+
+def test_sync_compacts_deleted_rows(monkeypatch):
+    """削除で空いた行は末尾の行で埋め、余りはクリアする"""
+    writer, mock_ws = _make_sync_writer(
+        monkeypatch,
+        [
+            ["作業ID", "内容"],
+            ["T001", "剪定"],
+            ["T002", "消毒"],
+            ["T003", "収穫"],
+            ["T004", "出荷"],
+        ],
+    )
+    df = pd.DataFrame(
+        [
+            {"作業ID": "T002", "内容": "消毒"},
+            {"作業ID": "T004", "内容": "出荷"},
+        ]
+    )
+
+    result = writer.sync(df)
+
+    assert result["deleted"] == 2
+    assert result["rows_touched"] == 3
+    mock_ws.batch_update.assert_called_once_with(
+        [{"range": "A2:B2", "values": [["T004", "出荷"]]}]
+    )
+    mock_ws.batch_clear.assert_called_once_with(["A4:B5"])
+
+
+def test_sync_falls_back_to_write_all_on_header_mismatch(monkeypatch):
+    """ヘッダーが違う場合は全件書込になる"""
+    writer, mock_ws = _make_sync_writer(monkeypatch, [["旧列"], ["x"]])
+    df = pd.DataFrame([{"作業ID": "T001", "内容": "テスト"}])
+
+    writer.sync(df)
+
+    assert mock_ws.clear.called
+    mock_ws.update.assert_called_with([["作業ID", "内容"], ["T001", "テスト"]])
+
+
+def test_write_all_skips_conversion_for_clean_frame(monkeypatch):
+    """clean_for_sheets済みのDataFrameは再変換せずにそのまま書き込む"""
+    writer, mock_ws = _make_sync_writer(monkeypatch, [])
+    cleaned = AgriNoteFormatter().clean_for_sheets(
+        pd.DataFrame([{"作業ID": "T001", "作業時間": 1.5}])
+    )
+
+    with patch.object(AgriNoteFormatter, "clean_for_sheets") as mock_clean:
+        writer.write_all(cleaned)
+
+    assert not mock_clean.called
+    mock_ws.update.assert_called_with([["作業ID", "作業時間"], ["T001", "1.5"]])
+
+
+def test_worksheet_is_cached_across_writers(monkeypatch):
+    """接続は1回だけで、別インスタンス（次回実行）でも再利用される"""
+    import src.core.writer as writer_module
+
+    monkeypatch.setenv("SPREADSHEET_ID", "cache-test")
+    monkeypatch.setenv("SERVICE_ACCOUNT_JSON", "{}")
+    monkeypatch.setattr(writer_module, "_worksheets", {})
+    monkeypatch.setattr(writer_module, "_spreadsheets", {})
+
+    with patch("gspread.service_account_from_dict") as mock_auth:
+        first = SpreadSheetWriter().connect()
+        ws = first._get_worksheet()
+        second = SpreadSheetWriter()
+
+        assert second._get_worksheet() is ws
+        assert first._get_worksheet() is ws
+        assert mock_auth.call_count == 1
+
+
+def test_sync_uses_prefetched_values(monkeypatch):
+    """先読みしたシートの値を渡した場合は読み直さない"""
+    writer, mock_ws = _make_sync_writer(monkeypatch, [])
+    current = [["作業ID", "内容"], ["T001", "剪定"]]
+    df = pd.DataFrame([{"作業ID": "T001", "内容": "防除"}])
+
+    result = writer.sync(df, current=current)
+
+    assert not mock_ws.get_all_values.called
+    assert result["updated"] == 1
+
+
+def test_other_worksheets_share_connection_and_are_created(monkeypatch):
+    """別シートの書き込みは認証を共有し、シートが無ければ作成する"""
+    import gspread
+
+    import src.core.writer as writer_module
+
+    monkeypatch.setenv("SPREADSHEET_ID", "multi-test")
+    monkeypatch.setenv("SERVICE_ACCOUNT_JSON", "{}")
+    monkeypatch.setattr(writer_module, "_worksheets", {})
+    monkeypatch.setattr(writer_module, "_spreadsheets", {})
+
+    with patch("gspread.service_account_from_dict") as mock_auth:
+        sh = mock_auth.return_value.open_by_key.return_value
+        sh.worksheet.side_effect = lambda name: (
+            MagicMock(title=name)
+            if name == "作業記録"
+            else (_ for _ in ()).throw(gspread.exceptions.WorksheetNotFound(name))
+        )
+
+        records = SpreadSheetWriter()._get_worksheet()
+        fields = SpreadSheetWriter(worksheet_name="圃場")._get_worksheet()
+
+        assert records.title == "作業記録"
+        assert fields is sh.add_worksheet.return_value
+        sh.add_worksheet.assert_called_once_with("圃場", rows=1, cols=1)
+        assert mock_auth.call_count == 1
+
+
+SHEET = [
+    ["作業ID", "日付", "作業者", "面積", "備考"],
+    ["T001", "2026-02-01", "鈴木", "1.5", ""],
+    ["T002", "2026-02-01", "木下", "", "雨"],
+    ["T003", "2026-02-02", "", "0.25", ""],
+    ["T004", "2026-02-03", "佐藤", "2", ""],
+    ["T005", "2026-02-03", "鈴木", "010", ""],
+]
+
+
+def _make_columnar_writer(monkeypatch, values):
+    from benchmarks.fake_sheets import fake_worksheet
+
+    monkeypatch.setenv("SPREADSHEET_ID", "dummy")
+    monkeypatch.setenv("SERVICE_ACCOUNT_JSON", "{}")
+    writer = SpreadSheetWriter()
+    writer._ws = fake_worksheet(values)
+    return writer, writer._ws.client
+
+
+def test_read_columns_pages_in_chunks_as_strings(monkeypatch):
+    writer, client = _make_columnar_writer(monkeypatch, SHEET)
+
+    df = writer.read_columns(chunk_rows=2)
+
+    assert df.columns.tolist() == SHEET[0]
+    assert df.values.tolist() == [row for row in SHEET[1:]]
+    assert all(str(dtype) == "string" for dtype in df.dtypes)
+    # 数値の推定をしない（先頭の0も保持）
+    assert df.loc[4, "面積"] == "010"
+    # ヘッダー1回 + 2行ずつ3回
+    assert len(client.requests) == 4
+
+
+def test_read_columns_subset_uses_one_request_per_chunk(monkeypatch):
+    writer, client = _make_columnar_writer(monkeypatch, SHEET)
+
+    df = writer.read_columns(columns=["備考", "作業ID"])
+
+    assert df.columns.tolist() == ["作業ID", "備考"]
+    assert df["備考"].tolist() == ["", "雨", "", "", ""]
+    assert client.requests[-1] == ("'作業記録'!A2:A20001", "'作業記録'!E2:E20001")
+    assert len(client.requests) == 2
+
+
+def test_read_columns_often_empty_column_reads_past_short_chunks(monkeypatch):
+    """選んだ列が空の範囲があっても、キー列の行数まで読む"""
+    writer, client = _make_columnar_writer(monkeypatch, SHEET)
+
+    df = writer.read_columns(columns=["備考"], chunk_rows=1)
+
+    assert df.columns.tolist() == ["備考"]
+    assert df["備考"].tolist() == ["", "雨", "", "", ""]
+    # キー列も同じリクエストで取得する
+    assert client.requests[1] == ("'作業記録'!A2:A2", "'作業記録'!E2:E2")
+
+
+def test_read_columns_without_key_column_reads_to_row_count(monkeypatch):
+    """キー列の無いシートではシートの行数まで読み、末尾の空行は除く"""
+    values = [["圃場", "備考"], ["A", ""], ["", ""], ["", "雨"], ["", ""]]
+    writer, client = _make_columnar_writer(monkeypatch, values)
+
+    df = writer.read_columns(columns=["備考"], chunk_rows=1)
+
+    assert df["備考"].tolist() == ["", "", "雨"]
+    # ヘッダー1回 + シートの行数（5行）まで1行ずつ4回
+    assert len(client.requests) == 5
+
+
+def test_read_all_columnar_mode(monkeypatch):
+    from src.utils.error import WriteError
+
+    writer, _ = _make_columnar_writer(monkeypatch, SHEET)
+
+    df = writer.read_all(mode="columnar")
+    records = writer.read_all()
+
+    assert len(df) == len(records) == 5
+    assert records.loc[0, "面積"] == 1.5
+    assert df.loc[0, "面積"] == "1.5"
+    with pytest.raises(WriteError):
+        writer.read_columns(columns=["存在しない列"])
+    assert writer.read_all(mode="columnar", columns=["存在しない列"]).empty
+
+
+def test_read_columns_empty_sheet(monkeypatch):
+    writer, _ = _make_columnar_writer(monkeypatch, [["作業ID", "日付"]])
+
+    df = writer.read_columns()
+
+    assert df.columns.tolist() == ["作業ID", "日付"]
+    assert df.empty
+
+
+def _api_error(code):
+    import gspread
+
+    response = MagicMock()
+    response.json.return_value = {
+        "error": {"code": code, "message": "q", "status": "RESOURCE_EXHAUSTED"}
+    }
+    return gspread.exceptions.APIError(response)
+
+
+def test_write_all_splits_large_payload_into_batches(monkeypatch):
+    """セル数の上限を超える書込は範囲ごとのbatch_updateに分かれる"""
+    writer, mock_ws = _make_sync_writer(monkeypatch, [])
+    writer.batch_cells = 4
+    df = pd.DataFrame({"作業ID": [f"T{i}" for i in range(5)], "内容": ["x"] * 5})
+
+    writer.write_all(df)
+
+    assert mock_ws.clear.called
+    assert not mock_ws.update.called
+    batches = [c.args[0][0] for c in mock_ws.batch_update.call_args_list]
+    assert sorted(b["range"] for b in batches) == ["A1", "A3", "A5"]
+    rows = [
+        row for b in sorted(batches, key=lambda b: b["range"]) for row in b["values"]
+    ]
+    assert rows == [["作業ID", "内容"]] + [[f"T{i}", "x"] for i in range(5)]
+
+
+def test_write_retries_on_quota_error(monkeypatch):
+    """429はバックオフして再試行し、それ以外のエラーはそのまま失敗する"""
+    from src.utils.error import WriteError
+
+    writer, mock_ws = _make_sync_writer(monkeypatch, [])
+    mock_ws.update.side_effect = [_api_error(429), _api_error(503), None]
+    df = pd.DataFrame([{"作業ID": "T001"}])
+
+    with patch("src.core.writer.time.sleep") as sleep:
+        writer.write_all(df)
+
+    assert mock_ws.update.call_count == 3
+    assert writer.retries == 2
+    first, second = (c.args[0] for c in sleep.call_args_list)
+    assert 1 <= first <= 2 and 2 <= second <= 4
+
+    # 再試行の回数は書込ごとに数え直す
+    mock_ws.update.side_effect = None
+    writer.write_all(df)
+    assert writer.retries == 0
+
+    mock_ws.update.side_effect = _api_error(400)
+    with patch("src.core.writer.time.sleep"), pytest.raises(WriteError):
+        writer.write_all(df)
+
+
+def test_retries_counted_across_concurrent_batches(monkeypatch):
+    """並行するバッチの再試行も取りこぼさずに数える"""
+    writer, mock_ws = _make_sync_writer(monkeypatch, [])
+    writer.batch_cells = 2
+    writer.concurrency = 4
+    failed = set()
+
+    def batch_update(batch):
+        # 各バッチの1回目だけ429
+        if batch[0]["range"] not in failed:
+            failed.add(batch[0]["range"])
+            raise _api_error(429)
+
+    mock_ws.batch_update.side_effect = batch_update
+    df = pd.DataFrame({"作業ID": [f"T{i}" for i in range(20)]})
+
+    with patch("src.core.writer.time.sleep"):
+        writer.write_all(df)
+
+    assert writer.retries == len(failed) == 11
+
+
+def _make_staged_writer(monkeypatch):
+    import src.core.writer as writer_module
+
+    monkeypatch.setattr(writer_module, "_worksheets", {})
+    writer, live = _make_sync_writer(monkeypatch, [])
+    writer.staging = True
+    live.id = 1
+    live.col_count = 5
+    staging = MagicMock(id=2)
+    # 反映後に取り直した本番シート
+    refreshed = MagicMock(id=1, row_count=2)
+    live.spreadsheet.worksheet.side_effect = lambda name: (
+        staging if name.endswith("__staging") else refreshed
+    )
+    return writer, live, staging
+
+
+def test_write_all_swaps_from_staging_sheet(monkeypatch):
+    """ステージングに書いてから1回のbatchUpdateで本番シートへ値を貼り付ける"""
+    writer, live, staging = _make_staged_writer(monkeypatch)
+    df = pd.DataFrame([{"作業ID": "T001", "内容": "剪定"}])
+
+    writer.write_all(df)
+
+    assert live.spreadsheet.worksheet.call_args_list[0].args == ("作業記録__staging",)
+    staging.resize.assert_called_once_with(rows=2, cols=2)
+    staging.update.assert_called_once_with([["作業ID", "内容"], ["T001", "剪定"]])
+    assert not live.clear.called and not live.update.called
+
+    body = live.spreadsheet.batch_update.call_args.args[0]
+    resize, clear, paste, clear_staging, shrink_staging = body["requests"]
+    assert resize["updateSheetProperties"]["properties"]["gridProperties"] == {
+        "rowCount": 2,
+        "columnCount": 5,
+    }
+    assert clear["updateCells"]["range"] == {"sheetId": 1}
+    assert paste["copyPaste"]["source"]["sheetId"] == 2
+    assert paste["copyPaste"]["destination"]["sheetId"] == 1
+    assert paste["copyPaste"]["destination"]["endRowIndex"] == 2
+    assert paste["copyPaste"]["pasteType"] == "PASTE_VALUES"
+    # 貼り付け後のステージングは空の1x1に戻る
+    assert clear_staging["updateCells"]["range"] == {"sheetId": 2}
+    shrink = shrink_staging["updateSheetProperties"]["properties"]
+    assert shrink == {"sheetId": 2, "gridProperties": {"rowCount": 1, "columnCount": 1}}
+    # 差分同期で使う行数はシートを取り直して合わせる
+    assert live.spreadsheet.worksheet.call_args_list[-1].args == ("作業記録",)
+    assert writer._get_worksheet().row_count == 2
+
+
+def test_failed_staging_write_leaves_live_sheet(monkeypatch):
+    """ステージングへの書込が失敗したら本番シートには触れない"""
+    from src.utils.error import WriteError
+
+    writer, live, staging = _make_staged_writer(monkeypatch)
+    staging.update.side_effect = _api_error(400)
+
+    with pytest.raises(WriteError):
+        writer.write_all(pd.DataFrame([{"作業ID": "T001"}]))
+
+    assert not live.spreadsheet.batch_update.called
+    assert not live.clear.called and not live.update.called
+
+
+def _make_partitioned_writer(monkeypatch):
+    """シート名ごとに別のモックを返すスプレッドシートで分割書込のWriterを作る"""
+    import src.core.writer as writer_module
+
+    monkeypatch.setenv("SPREADSHEET_ID", "dummy")
+    monkeypatch.setenv("SERVICE_ACCOUNT_JSON", "{}")
+    monkeypatch.setenv("WRITE_STAGING", "0")
+    monkeypatch.setenv("PARTITION_BY", "year")
+    sheets = {}
+    sh = MagicMock()
+    sh.worksheet.side_effect = lambda name: sheets.setdefault(name, MagicMock())
+    monkeypatch.setattr(writer_module, "_spreadsheets", {"dummy": sh})
+    monkeypatch.setattr(writer_module, "_worksheets", {})
+    return SpreadSheetWriter(), sheets
+
+
+def test_partition_by_rejects_unknown_mode(monkeypatch):
+    """year以外の指定は年で分割せずエラーにする"""
+    from src.utils.error import WriteError
+
+    monkeypatch.setenv("SPREADSHEET_ID", "dummy")
+    monkeypatch.setenv("SERVICE_ACCOUNT_JSON", "{}")
+    monkeypatch.setenv("PARTITION_BY", "month")
+
+    with pytest.raises(WriteError, match="PARTITION_BY"):
+        SpreadSheetWriter()
+
+
+def test_first_partitioned_write_warns_about_stale_sheet(monkeypatch):
+    """分割に切り替えた最初の書込で、元のシートが更新されなくなることを知らせる"""
+    writer, sheets = _make_partitioned_writer(monkeypatch)
+    sheets["作業記録_index"] = MagicMock()
+    sheets["作業記録_index"].get_all_values.return_value = []
+
+    with patch("src.core.writer.logger") as mock_logger:
+        writer.write_partitioned(_work_records(["2025-01-02"]))
+        sheets["作業記録_index"].get_all_values.return_value = sheets[
+            "作業記録_index"
+        ].update.call_args.args[0]
+        writer.write_partitioned(_work_records(["2025-01-02"]))
+
+    warnings = [c.args[0] for c in mock_logger.warning.call_args_list]
+    assert len(warnings) == 1
+    assert "「作業記録」シートは今後更新されない" in warnings[0]
+
+
+def _work_records(dates):
+    return pd.DataFrame(
+        {"作業ID": [f"T{i}" for i in range(len(dates))], "日付": dates, "内容": "x"}
+    )
+
+
+def test_write_partitioned_rewrites_only_changed_years(monkeypatch):
+    """年ごとのシートに分け、2回目は内容が変わった年だけ書き直す"""
+    writer, sheets = _make_partitioned_writer(monkeypatch)
+    sheets["作業記録_index"] = MagicMock()
+    sheets["作業記録_index"].get_all_values.return_value = []
+    df = _work_records(["2024-05-01", "2025-01-02", "2025-12-31", ""])
+
+    result = writer.write_partitioned(df)
+
+    assert result["rows"] == {
+        "作業記録_2024": 1,
+        "作業記録_2025": 2,
+        "作業記録_日付なし": 1,
+    }
+    assert sorted(result["rewritten"]) == sorted(result["rows"])
+    sheets["作業記録_2025"].update.assert_called_once_with(
+        [
+            ["作業ID", "日付", "内容"],
+            ["T1", "2025-01-02", "x"],
+            ["T2", "2025-12-31", "x"],
+        ]
+    )
+    index_values = sheets["作業記録_index"].update.call_args.args[0]
+    assert index_values[0] == ["シート", "期間", "行数", "指紋", "更新日時"]
+    assert index_values[1][:3] == ["作業記録_2024", "2024-01-01〜2024-12-31", "1"]
+    assert "作業記録" not in sheets
+
+    # 2回目: 2025年の行だけ変わる
+    for sheet in sheets.values():
+        sheet.reset_mock()
+    sheets["作業記録_index"].get_all_values.return_value = index_values
+    df.loc[2, "内容"] = "y"
+
+    result = writer.write_partitioned(df)
+
+    assert result["rewritten"] == ["作業記録_2025"]
+    assert not sheets["作業記録_2024"].update.called
+    assert sheets["作業記録_2025"].update.called
+    assert sheets["作業記録_index"].update.called
+
+    # 変更が無ければ目次も書き直さない
+    index_values = sheets["作業記録_index"].update.call_args.args[0]
+    for sheet in sheets.values():
+        sheet.reset_mock()
+    sheets["作業記録_index"].get_all_values.return_value = index_values
+
+    assert writer.write_partitioned(df)["rewritten"] == []
+    assert not any(sheet.update.called for sheet in sheets.values())
+
+
+def test_write_partitioned_by_season_and_clears_vanished_year(monkeypatch):
+    """作期の開始月で年を分け、行が無くなった分割はヘッダーのみにする"""
+    writer, sheets = _make_partitioned_writer(monkeypatch)
+    writer.season_start = 4
+    sheets["作業記録_index"] = MagicMock()
+    sheets["作業記録_index"].get_all_values.return_value = [
+        ["シート", "期間", "行数", "指紋", "更新日時"],
+        ["作業記録_2022", "2022-04-01〜2023-03-31", "3", "old", "2023-04-01T00:00:00"],
+    ]
+    df = _work_records(["2024-03-31", "2024-04-01"])
+
+    result = writer.write_partitioned(df)
+
+    assert result["rows"] == {
+        "作業記録_2022": 0,
+        "作業記録_2023": 1,
+        "作業記録_2024": 1,
+    }
+    sheets["作業記録_2022"].update.assert_called_once_with([["作業ID", "日付", "内容"]])
+    index_values = sheets["作業記録_index"].update.call_args.args[0]
+    assert index_values[2][1] == "2023-04-01〜2024-03-31"
+
+
+def test_read_all_concatenates_partitions(monkeypatch):
+    """分割時のread_allは目次に載っているシートをまとめて返す"""
+    writer, sheets = _make_partitioned_writer(monkeypatch)
+    sheets["作業記録_index"] = MagicMock()
+    sheets["作業記録_index"].get_all_values.return_value = [
+        ["シート", "期間", "行数", "指紋", "更新日時"],
+        ["作業記録_2024", "", "1", "a", ""],
+        ["作業記録_2025", "", "1", "b", ""],
+    ]
+    for year in ("2024", "2025"):
+        sheets[f"作業記録_{year}"] = MagicMock()
+        sheets[f"作業記録_{year}"].get_all_records.return_value = [
+            {"作業ID": f"T{year}"}
+        ]
+
+    df = writer.read_all(mode="records")
+
+    assert df["作業ID"].tolist() == ["T2024", "T2025"]